@@ -1,56 +1,100 @@
+import contextvars
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from langchain.agents import initialize_agent
-from langchain.agents.agent_types import AgentType
-from langchain_openai import ChatOpenAI
-from langchain.memory import ConversationBufferMemory
+from tools.llm_usage import usage_handler
+from tools.metrics import stage, timed
+from tools.registry import load_tools, tool_output
 
 
 # Load environment variables
 load_dotenv()
 
-# Import your GPT-safe tool functions (already decorated with @tool)
-from tools.sip import run_sip_tool
-from tools.budget import run_budget_tool
-from tools.loan import run_loan_tool
-from tools.stock import run_stock_tool
-from tools.pdf_generator import generate_pdf_summary
-from tools.goal_planner import run_goal_tool  # Make sure this is @tool-decorated
-from tools.email_report import run_email_report_tool  # Make sure this is @tool-decorated
-from tools.expense_categorizer import run_expense_categorizer
-
-# Tool list – use only @tool-decorated functions here
-tools = [
-    run_budget_tool,
-    run_sip_tool,
-    run_loan_tool,
-    run_stock_tool,
-    generate_pdf_summary,
-    run_goal_tool,
-    run_email_report_tool,
-    run_expense_categorizer
-]
-
-# Initialize model (use "gpt-3.5-turbo" for cheaper option, "gpt-4o" for better performance)
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-
-# Memory object is created per session in app.py, not here
-def get_agent(memory):
-    return initialize_agent(
-        tools=tools,
-        llm=llm,
-        agent=AgentType.OPENAI_FUNCTIONS,
-        memory=memory,
-        verbose=True,
-    )
+# LangChain, the OpenAI client and the tool modules are imported on first use
+# (see tools/registry.py), so importing this module stays cheap.
+_llm = None
+_llm_lock = threading.Lock()
 
+SYSTEM_PROMPT = "You are a helpful AI assistant."
+# Model turns per question before giving up (each turn may call several tools).
+AGENT_MAX_TURNS = int(os.getenv("AGENT_MAX_TURNS", "15"))
+# Tool calls from one model turn run side by side on this pool.
+_tool_pool = ThreadPoolExecutor(max_workers=int(os.getenv("AGENT_TOOL_WORKERS", "8")), thread_name_prefix="tool")
+
+
+def get_llm():
+    """The shared chat model, created on first use."""
+    global _llm
+    with _llm_lock:
+        if _llm is None:
+            from langchain_openai import ChatOpenAI
+
+            # Initialize model (use "gpt-3.5-turbo" for cheaper option, "gpt-4o" for better performance)
+            # Token, latency, tool-call and cost accounting per caller (see tools/llm_usage.py)
+            _llm = ChatOpenAI(model="gpt-4o-mini", temperature=0, callbacks=[usage_handler()])
+        return _llm
+
+
+def __getattr__(name):
+    # Keep `from agent import llm` / `agent.tools` working for existing callers.
+    if name == "llm":
+        return get_llm()
+    if name == "tools":
+        return load_tools()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _run_tool_call(tools_by_name: dict, call: dict) -> str:
+    tool = tools_by_name.get(call["name"])
+    if tool is None:
+        return f"Error: unknown tool {call['name']!r}"
+    try:
+        with stage(f"tool.{call['name']}"):
+            return tool_output(tool.invoke(call["args"]))
+    except Exception as e:
+        # Let the model see the failure and answer around it, as a person would
+        return f"Error: {e}"
+
+
+def run_tool_calls(tool_calls: list[dict], tools_by_name: dict) -> list[str]:
+    """Run one model turn's tool calls concurrently; results come back in call order."""
+    if len(tool_calls) == 1:
+        return [_run_tool_call(tools_by_name, tool_calls[0])]
+    # Each call keeps the caller's context (LLM usage tags) in its worker thread
+    futures = [_tool_pool.submit(contextvars.copy_context().run, _run_tool_call, tools_by_name, call)
+               for call in tool_calls]
+    return [future.result() for future in futures]
+
+
+@timed("llm.agent")
 def run_gpt_agent(user_query: str, chat_history=None) -> str:
-    """Run the agent with memory, passing chat history if provided."""
-    memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
-    if chat_history:
+    """
+    Answer `user_query` with the tools, passing chat history if provided.
+
+    The model may request several tools in one turn (parallel function
+    calling); those run concurrently and their trimmed outputs go back in a
+    single follow-up request, so a multi-tool question costs one extra
+    round-trip rather than one per tool.
+    """
+    from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+    tools = load_tools()
+    tools_by_name = {tool.name: tool for tool in tools}
+    llm = get_llm().bind_tools(tools, parallel_tool_calls=True)
+
+    messages = [SystemMessage(content=SYSTEM_PROMPT)]
+    for human, ai in chat_history or []:
         # Restore previous chat history
-        for human, ai in chat_history:
-            memory.chat_memory.add_user_message(human)
-            memory.chat_memory.add_ai_message(ai)
-    agent = get_agent(memory)
-    return agent.run(user_query)
\ No newline at end of file
+        messages += [HumanMessage(content=human), AIMessage(content=ai)]
+    messages.append(HumanMessage(content=user_query))
+
+    for _ in range(AGENT_MAX_TURNS):
+        reply = llm.invoke(messages)
+        messages.append(reply)
+        if not reply.tool_calls:
+            return reply.content
+        outputs = run_tool_calls(reply.tool_calls, tools_by_name)
+        messages += [ToolMessage(content=output, tool_call_id=call["id"])
+                     for call, output in zip(reply.tool_calls, outputs)]
+    return "Agent stopped due to iteration limit or time limit."
@@ -4,16 +4,16 @@ from tools.sip import sip_projection
 from tools.loan import loan_projection
 from tools.budget import budget_projection
 from tools.pdf_generator import generate_pdf_summary
+from tools.report_store import get_or_render
 from tools.stock import stock_summary_and_chart
 from tools.goal_planner import goal_projection
 from tools.portfolio import analyze_portfolio
+from tools.form16_parser import parse_form16
 from agent import run_gpt_agent
 import os
 from datetime import datetime
 import plotly.graph_objects as go
 import openai
-import pdfplumber
-import re
 import json
 
 # --- Initialize OpenAI API Key ---
@@ -112,31 +112,21 @@ with st.sidebar:
 
     # Multi-tool report button
     if st.button("🧾 Generate Multi-Tool Summary Report", use_container_width=True):
-        from fpdf import FPDF
-        def remove_emojis(text):
-            return re.sub(r'[^\x00-\x7F]+', '', text)
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", size=14)
-        pdf.cell(0, 10, "Multi-Tool Financial Summary", ln=True, align='C')
-        pdf.ln(10)
+        # SIP and Budget results are dicts and get their structured layout;
+        # everything else is stored as a markdown summary.
+        templates = {"SIP": "sip", "Budget": "budget"}
+        sections = []
         for tool_name in ["SIP", "Loan", "Budget", "Stock", "Portfolio", "Goal Planner"]:
             if tool_name in st.session_state.tool_results:
-                pdf.set_font("Arial", style="B", size=12)
-                pdf.cell(0, 10, remove_emojis(tool_name + " Analysis"), ln=True)
-                pdf.set_font("Arial", size=11)
-                pdf.multi_cell(0, 8, remove_emojis(st.session_state.tool_results[tool_name]))
-                pdf.ln(5)
-                pdf.set_draw_color(0, 0, 0)
-                pdf.set_line_width(0.3)
-                pdf.line(10, pdf.get_y(), 200, pdf.get_y())
-                pdf.ln(2)
-        output_dir = "generated"
-        os.makedirs(output_dir, exist_ok=True)
-        filename = os.path.join(output_dir, f"summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
-        pdf.output(filename)
+                data = st.session_state.tool_results[tool_name]
+                if isinstance(data, dict) and tool_name in templates:
+                    sections.append({"template": templates[tool_name], "data": data})
+                else:
+                    text = data.get("summary", "") if isinstance(data, dict) else data
+                    sections.append({"title": tool_name + " Analysis", "text": text})
+        filename = get_or_render("Multi-Tool Financial Summary", sections)
         with open(filename, "rb") as f:
-            st.download_button("📥 Download Multi-Tool PDF", data=f, file_name=os.path.basename(filename), mime="application/pdf")
+            st.download_button("📥 Download Multi-Tool PDF", data=f, file_name=f"summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf", mime="application/pdf")
 
     # Last result PDF
     if st.session_state.session_result:
@@ -339,20 +329,12 @@ with st.expander("🧾 Tax Optimization & GPT Summary", expanded=False):
     uploaded_form16 = st.file_uploader("Upload Form 16 or Salary Slip (PDF)", type=["pdf"])
     auto_salary, auto_basic, auto_hra, auto_rent = 0, 0, 0, 0
     if uploaded_form16:
-        with pdfplumber.open(uploaded_form16) as pdf:
-            text = "\n".join(page.extract_text() or "" for page in pdf.pages)
-        match = re.search(r'Gross Salary.*?(\d[\d,]*)', text)
-        if match:
-            auto_salary = int(match.group(1).replace(',', ''))
-        match = re.search(r'Basic.*?(\d[\d,]*)', text)
-        if match:
-            auto_basic = int(match.group(1).replace(',', ''))
-        match = re.search(r'HRA.*?(\d[\d,]*)', text)
-        if match:
-            auto_hra = int(match.group(1).replace(',', ''))
-        match = re.search(r'Rent.*?(\d[\d,]*)', text)
-        if match:
-            auto_rent = int(match.group(1).replace(',', ''))
+        # Cached by file hash, so Streamlit reruns don't re-read the PDF
+        fields = parse_form16(uploaded_form16.getvalue())
+        auto_salary = fields["salary"]
+        auto_basic = fields["basic_salary"]
+        auto_hra = fields["hra_received"]
+        auto_rent = fields["rent"]
         st.success("Auto-filled values from your document. Please review below.")
 
     col1, col2 = st.columns(2)
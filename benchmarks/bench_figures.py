@@ -0,0 +1,57 @@
+# benchmarks/bench_figures.py
+"""
+Per-request cost of building Plotly figures the API throws away.
+
+    python -m benchmarks.bench_figures
+    python -m benchmarks.bench_figures --repeat 500
+
+Compares each tool's numeric core (what the API and agent now call) with the
+UI path that also builds the figure, plus the one-off cost of importing
+Plotly that the API process no longer pays.
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from tools.sip import sip_result, sip_projection
+from tools.loan import loan_summary, loan_projection
+from tools.budget import budget_result, budget_projection
+from tools.goal_planner import goal_summary, goal_projection
+
+CASES = [
+    ("sip", lambda: sip_result(10000, 40, 12), lambda: sip_projection(10000, 40, 12)),
+    ("loan", lambda: loan_summary(500000, 20, 9), lambda: loan_projection(500000, 20, 9)),
+    ("budget", lambda: budget_result(100000, 25000, 10000, 5000, 4000, 6000),
+     lambda: budget_projection(100000, 25000, 10000, 5000, 4000, 6000)),
+    ("goal", lambda: goal_summary(5000000, 30, 150000), lambda: goal_projection(5000000, 30, 150000)),
+]
+
+
+def per_call_ms(func, repeat: int) -> float:
+    func()  # warm up (first figure pays Plotly's import and validator setup)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def import_ms(module: str) -> float:
+    code = f"import time; t = time.perf_counter(); import {module}; print((time.perf_counter() - t) * 1000)"
+    return float(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200, help="calls per measurement")
+    args = parser.parse_args()
+
+    print(f"{'tool':<8}{'core ms':>10}{'with figure ms':>16}{'saved ms':>10}")
+    for name, core, with_figure in CASES:
+        a, b = per_call_ms(core, args.repeat), per_call_ms(with_figure, args.repeat)
+        print(f"{name:<8}{a:>10.3f}{b:>16.3f}{b - a:>10.3f}")
+    print(f"\nimport plotly.graph_objs (cold process): {import_ms('plotly.graph_objs'):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_imports.py
+"""
+Import-time report for the API server (or any module).
+
+    python -m benchmarks.bench_imports                  # import main, top 20 packages
+    python -m benchmarks.bench_imports --module app --top 30
+    python -m benchmarks.bench_imports --max-ms 1500    # exit 1 if start-up regresses past a budget
+
+Runs `python -X importtime -c "import <module>"` in a fresh process (median
+of --runs) and groups the self time of every imported module by top-level
+package, so a new eager dependency shows up as a new line near the top.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_profile(module: str) -> tuple[float, dict]:
+    """(total ms, {top-level package: self ms}) for one cold import of `module`."""
+    env = dict(os.environ, OPENAI_API_KEY=os.getenv("OPENAI_API_KEY", "offline"))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=ROOT, env=env, check=True,
+    )
+    packages, total = defaultdict(float), 0.0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        packages[name.strip().split(".")[0]] += int(self_us) / 1000
+        if name.rstrip() == f" {module}":
+            total = int(cumulative_us) / 1000
+    return total, packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main", help="module to import")
+    parser.add_argument("--runs", type=int, default=3, help="fresh processes to time (median is reported)")
+    parser.add_argument("--top", type=int, default=20, help="packages to list")
+    parser.add_argument("--json", help="also write the report to this file")
+    parser.add_argument("--max-ms", type=float, help="fail if the median import time exceeds this")
+    args = parser.parse_args()
+
+    profiles = [import_profile(args.module) for _ in range(args.runs)]
+    total = statistics.median(t for t, _ in profiles)
+    packages = min(profiles, key=lambda p: abs(p[0] - total))[1]
+    ranked = sorted(packages.items(), key=lambda kv: kv[1], reverse=True)
+
+    print(f"import {args.module}: {total:.0f} ms (median of {args.runs})\n")
+    print(f"{'package':<32}{'self ms':>10}")
+    for name, ms in ranked[:args.top]:
+        print(f"{name:<32}{ms:>10.1f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"module": args.module, "total_ms": round(total, 1),
+                       "packages": {name: round(ms, 1) for name, ms in ranked}}, f, indent=1)
+    if args.max_ms and total > args.max_ms:
+        print(f"\n❌ import time {total:.0f} ms exceeds budget of {args.max_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
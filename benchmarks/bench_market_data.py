@@ -0,0 +1,69 @@
+# benchmarks/bench_market_data.py
+"""
+Quote latency through tools/market_data.py against fake providers.
+
+    python -m benchmarks.bench_market_data
+    python -m benchmarks.bench_market_data --calls 400 --slow-rate 0.05
+
+Three scenarios, each run with hedging off (fallback only after a failure
+or a missed deadline) and on (fallback also fired at the primary's p95):
+  slow tail  - the primary answers in 50 ms but a share of calls hang for 2 s
+  outage     - the primary fails every call (the breaker should open)
+  hung       - the primary hangs past the deadline every call
+"""
+
+import argparse
+import time
+import numpy as np
+from benchmarks.standins import FakeProvider, Market
+from tools.market_data import MarketData
+
+SYMBOL = "RELIANCE.NS"
+
+
+def scenario(name: str, market: Market, slow_rate: float, deadline: float):
+    if name == "slow tail":
+        primary = FakeProvider("yahoo", market, latency=0.05, slow_latency=2.0, slow_rate=slow_rate, seed=1)
+    elif name == "outage":
+        primary = FakeProvider("yahoo", market, latency=0.05, fail_rate=1.0, seed=1)
+    else:
+        primary = FakeProvider("yahoo", market, latency=deadline * 2)
+    fallback = FakeProvider("nse", market, latency=0.08, seed=2)
+    return primary, fallback
+
+
+def run(name: str, hedged: bool, calls: int, slow_rate: float, deadline: float) -> dict:
+    market = Market()
+    primary, fallback = scenario(name, market, slow_rate, deadline)
+    data = MarketData([primary, fallback], deadline=deadline, hedge_delay=0.1, breaker_cooldown=60,
+                      hedge_suffixes=(".NS",) if hedged else ())
+    times = np.empty(calls)
+    for i in range(calls):
+        start = time.perf_counter()
+        price = data.quote(SYMBOL)
+        times[i] = (time.perf_counter() - start) * 1000
+        assert price > 0, "no provider answered"
+    p50, p95, p99 = np.percentile(times, [50, 95, 99])
+    return {"p50": p50, "p95": p95, "p99": p99, "max": times.max(),
+            "primary": primary.calls, "fallback": fallback.calls, "breaker": data.breakers["yahoo"].state}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--slow-rate", type=float, default=0.03, help="share of slow primary calls in 'slow tail'")
+    parser.add_argument("--deadline", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"{'scenario':<12}{'hedged':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+          f"{'primary':>9}{'fallback':>10}  breaker")
+    for name in ("slow tail", "outage", "hung"):
+        calls = args.calls if name == "slow tail" else min(args.calls, 20)
+        for hedged in (False, True):
+            r = run(name, hedged, calls, args.slow_rate, args.deadline)
+            print(f"{name:<12}{'yes' if hedged else 'no':>8}{r['p50']:>9.0f}{r['p95']:>9.0f}{r['p99']:>9.0f}"
+                  f"{r['max']:>9.0f}{r['primary']:>9}{r['fallback']:>10}  {r['breaker']}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
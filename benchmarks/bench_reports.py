@@ -0,0 +1,80 @@
+# benchmarks/bench_reports.py
+"""
+Report rendering benchmark.
+
+    python -m benchmarks.bench_reports                      # one 20-page report
+    python -m benchmarks.bench_reports --batch 2000 --workers 8   # month-end run
+
+Reports are written to a temporary directory that is removed afterwards.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from tools.report_renderer import render_report
+
+
+def sample_sections(holdings: int = 600) -> list[dict]:
+    """One of each section template plus a long holdings table (~20 pages at 600 holdings)."""
+    portfolio = [
+        {
+            "Symbol": f"SYM{i}.NS", "Qty": 10 + i, "Buy ₹": 100.0 + i, "Current ₹": 110.0 + i,
+            "Invested ₹": (10 + i) * (100.0 + i), "Now ₹": (10 + i) * (110.0 + i),
+            "Profit/Loss ₹": (10 + i) * 10.0, "Return %": 10.0,
+        }
+        for i in range(holdings)
+    ]
+    return [
+        {"template": "sip", "data": {"monthly_investment": 10000, "years": 10, "rate": 12, "total_invested": 1200000,
+                                     "projected_value": 2323391, "estimated_gain": 1123391}},
+        {"template": "loan", "data": {"principal": 500000, "years": 5, "rate": 10}},
+        {"template": "budget", "data": {"income": 100000, "total_expenses": 65000, "savings": 35000,
+                                        "savings_percent": 35.0, "advice": "✅ Great! You're saving well."}},
+        {"template": "tax", "data": {"old_regime": {"taxable_income": 620000, "tax_payable": 41600},
+                                     "new_regime": {"taxable_income": 750000, "tax_payable": 39000},
+                                     "best": "New Regime", "suggestions": ["Invest ₹50,000 more in 80C."] * 5}},
+        {"template": "portfolio", "data": portfolio},
+        {"title": "Notes", "text": "📈 **Market outlook** – " + "Diversify across sectors. " * 200},
+    ]
+
+
+def _render(args):
+    sections, path = args
+    return render_report("Monthly Statement", sections, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--holdings", type=int, default=600, help="portfolio rows per report")
+    parser.add_argument("--batch", type=int, default=1, help="number of reports to render")
+    parser.add_argument("--workers", type=int, default=1, help="processes for batch rendering")
+    args = parser.parse_args()
+
+    sections = sample_sections(args.holdings)
+    out_dir = tempfile.mkdtemp(prefix="bench_reports_")
+    try:
+        jobs = [(sections, os.path.join(out_dir, f"client_{i}.pdf")) for i in range(args.batch)]
+        start = time.perf_counter()
+        if args.workers > 1:
+            with ProcessPoolExecutor(args.workers) as pool:
+                list(pool.map(_render, jobs, chunksize=16))
+        else:
+            for job in jobs:
+                _render(job)
+        elapsed = time.perf_counter() - start
+
+        with open(jobs[0][1], "rb") as f:
+            pages = f.read().count(b"/Type /Page\n")
+        size_kb = os.path.getsize(jobs[0][1]) / 1024
+        print(f"{args.batch} report(s), {pages} pages each, {size_kb:.0f} KB each")
+        print(f"total {elapsed:.2f}s, {elapsed / args.batch * 1000:.1f} ms/report, "
+              f"{args.batch / elapsed:.1f} reports/s with {args.workers} worker(s)")
+    finally:
+        shutil.rmtree(out_dir)
+
+
+if __name__ == "__main__":
+    main()
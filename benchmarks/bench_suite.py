@@ -0,0 +1,238 @@
+# benchmarks/bench_suite.py
+"""
+Offline benchmark suite: every tool's core function and every API endpoint,
+run against the stand-ins in benchmarks/standins.py (no Yahoo, GNews or
+OpenAI traffic).
+
+    python -m benchmarks.bench_suite                    # run, compare with the saved baseline
+    python -m benchmarks.bench_suite --save-baseline    # run and store the result as the new baseline
+    python -m benchmarks.bench_suite --only api/ --iterations 200
+
+Each case reports p50/p95/p99 latency over --iterations calls (after
+--warmup calls) and the peak memory allocated by one traced call. With a
+baseline present the run exits 1 when any case's p50 or p95 latency, or its
+peak memory, grows by more than --threshold (ignoring sub-noise changes).
+All files the tools write (price store, ledger, caches, PDFs) go to a
+temporary directory.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baselines", "offline.json")
+# Changes smaller than these are treated as noise whatever the relative change.
+MIN_DELTA_MS = 0.25
+MIN_DELTA_KB = 64
+
+PORTFOLIO = [
+    {"symbol": symbol, "quantity": 10 + i, "buy_price": 1000 + 50 * i}
+    for i, symbol in enumerate(["RELIANCE.NS", "TCS.NS", "INFY.NS", "HDFCBANK.NS", "SBIN.NS",
+                                "ITC.NS", "ICICIBANK.NS", "LT.NS", "HINDUNILVR.NS", "ADANIENT.NS"])
+]
+TAX_INPUT = {"salary": 1500000, "rent": 300000, "deductions_80c": 120000, "deductions_80d": 25000,
+             "hra_received": 240000, "basic_salary": 750000}
+
+
+def statement_csv(rows: int = 1000) -> bytes:
+    """Synthetic bank statement with recurring merchants and a few outliers."""
+    rng = np.random.default_rng(7)
+    merchants = ["UPI/SWIGGY ORDER", "AMAZON PAY", "UBER TRIP", "BIGBASKET GROCERY", "HOUSE RENT",
+                 "STARBUCKS COFFEE", "IRCTC TRAIN", "LOCAL STORE 123", "APOLLO PHARMACY", "SHELL FUEL"]
+    lines = ["Date,Description,Amount"]
+    for i in range(rows):
+        merchant = merchants[rng.integers(len(merchants))]
+        amount = round(float(rng.lognormal(6, 0.6)) * (20 if rng.random() < 0.01 else 1), 2)
+        lines.append(f"2025-{1 + i * 12 // rows:02d}-{1 + i % 28:02d},{merchant} {i % 37},{amount}")
+    return "\n".join(lines).encode()
+
+
+def form16_pdf() -> bytes:
+    """A small text PDF with the Form 16 lines parse_form16 looks for."""
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.set_font("Arial", size=10)
+    for page in range(3):
+        pdf.add_page()
+        for i in range(30):
+            pdf.cell(0, 6, f"Part B line {page}-{i} details of tax deducted 0.00", ln=1)
+    for line in ["Gross Salary 1500000.00", "Basic Salary 750000.00", "House rent allowance 240000.00",
+                 "Total rent paid 300000.00", "80CCD(2) 50000.00", "Section 80C 120000.00", "Section 80D 25000.00"]:
+        pdf.cell(0, 6, line, ln=1)
+    return pdf.output(dest="S").encode("latin-1")
+
+
+def build_cases(client) -> dict:
+    """name -> zero-argument callable. Imports happen here, after the working directory is set."""
+    from tools.sip import sip_result
+    from tools.loan import loan_summary
+    from tools.budget import budget_result
+    from tools.goal_planner import goal_summary
+    from tools.tax_saver import calc_tax_old_regime, calc_tax_new_regime, tax_summary_gpt
+    from tools.portfolio import analyze_portfolio
+    from tools.portfolio_analytics import portfolio_risk
+    from tools.stress_test import stress_test
+    from tools.stock import stock_summary
+    from tools.news_risk import analyze_portfolio_risk
+    from tools.expense_categorizer import process_statement, expense_summary
+    from tools import form16_parser
+    from tools.report_renderer import render_report
+    from agent import run_gpt_agent
+    from benchmarks.bench_reports import sample_sections
+
+    csv = statement_csv()
+    pdf = form16_pdf()
+    summary = analyze_portfolio(PORTFOLIO)
+    statement = process_statement(io.BytesIO(csv))
+    sections = sample_sections(holdings=50)
+    report_path = os.path.join("generated", "bench.pdf")
+    os.makedirs("generated", exist_ok=True)
+
+    def parse_uncached():
+        form16_parser._cache.clear()  # measure parsing, not the digest cache
+        return form16_parser.parse_form16(pdf)
+
+    return {
+        "core/sip_result": lambda: sip_result(10000, 40, 12),
+        "core/loan_summary": lambda: loan_summary(500000, 20, 9),
+        "core/budget_result": lambda: budget_result(100000, 25000, 10000, 5000, 4000, 6000),
+        "core/goal_summary": lambda: goal_summary(5000000, 30, 150000),
+        "core/calc_tax_old_regime": lambda: calc_tax_old_regime(**TAX_INPUT),
+        "core/calc_tax_new_regime": lambda: calc_tax_new_regime(TAX_INPUT["salary"]),
+        "core/tax_summary_gpt": lambda: tax_summary_gpt(**TAX_INPUT),
+        "core/analyze_portfolio": lambda: analyze_portfolio(PORTFOLIO),
+        "core/portfolio_risk": lambda: portfolio_risk(summary),
+        "core/stress_test": lambda: stress_test(PORTFOLIO),
+        "core/stock_summary": lambda: stock_summary("RELIANCE.NS"),
+        "core/analyze_portfolio_risk": lambda: analyze_portfolio_risk([s["symbol"] for s in PORTFOLIO[:5]]),
+        "core/process_statement": lambda: process_statement(io.BytesIO(csv)),
+        "core/expense_summary": lambda: expense_summary(statement),
+        "core/parse_form16": parse_uncached,
+        "core/render_report": lambda: render_report("Benchmark", sections, report_path),
+        "core/run_gpt_agent": lambda: run_gpt_agent("How much should I save each month?", []),
+        "core/run_gpt_agent_tools": lambda: run_gpt_agent(
+            "Compare a 20-year loan EMI, my SIP for 1 crore, and TCS stock", []),
+        "api/sip": lambda: client.post("/api/sip/", json={"amount": 10000, "years": 40, "rate": 12}),
+        "api/loan": lambda: client.post("/api/loan/", json={}),
+        "api/budget": lambda: client.post("/api/budget/", json={}),
+        "api/goal-planner": lambda: client.post("/api/goal-planner/", json={}),
+        "api/tax": lambda: client.post("/api/tax/", json=TAX_INPUT),
+        "api/tax-parse-form16": lambda: client.post(
+            "/api/tax/parse-form16", files={"file": ("form16.pdf", pdf, "application/pdf")}),
+        "api/portfolio": lambda: client.post("/api/portfolio/", json={"stocks": PORTFOLIO}),
+        "api/portfolio-compact-risk": lambda: client.post(
+            "/api/portfolio/", json={"stocks": PORTFOLIO, "format": "compact", "points": 60, "risk": True}),
+        "api/portfolio-stress": lambda: client.post("/api/portfolio/stress", json={"stocks": PORTFOLIO}),
+        "api/stock": lambda: client.post("/api/stock/", json={"symbol": "RELIANCE.NS"}),
+        "api/news-risk": lambda: client.post("/api/news-risk/", json={"symbols": ["TCS.NS", "INFY.NS"]}),
+        "api/chat": lambda: client.post("/api/chat/", json={"query": "Plan my retirement", "history": []}),
+        "api/expense-categorizer": lambda: client.post(
+            "/api/expense-categorizer/", files={"file": ("statement.csv", csv, "text/csv")}, data={"account": "bench"}),
+        "api/expense-breakdown": lambda: client.get("/api/expense-categorizer/breakdown", params={"account": "bench"}),
+        "api/generate-report": lambda: client.post("/api/generate-report/", json={"portfolio_value": 1000000}),
+    }
+
+
+def measure(func, iterations: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        result = func()
+        if getattr(result, "status_code", 200) >= 400:  # an endpoint failing fast is not a speed-up
+            raise RuntimeError(f"HTTP {result.status_code}: {result.text[:200]}")
+    times = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        func()
+        times[i] = (time.perf_counter() - start) * 1000
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    p50, p95, p99 = np.percentile(times, [50, 95, 99])
+    return {"p50_ms": round(p50, 3), "p95_ms": round(p95, 3), "p99_ms": round(p99, 3), "peak_kb": round(peak / 1024, 1)}
+
+
+def regressions(results: dict, baseline: dict, threshold: float) -> list[str]:
+    problems = []
+    for name, now in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        for key, floor in [("p50_ms", MIN_DELTA_MS), ("p95_ms", MIN_DELTA_MS), ("peak_kb", MIN_DELTA_KB)]:
+            if now[key] > before[key] * (1 + threshold) and now[key] - before[key] > floor:
+                problems.append(f"{name}: {key} {before[key]} -> {now[key]} (+{now[key] / before[key] - 1:.0%})")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--only", default="", help="run cases whose name starts with this prefix")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="write this run's results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative regression (0.25 = +25%%)")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    os.environ.setdefault("OPENAI_API_KEY", "offline")
+    workdir = tempfile.mkdtemp(prefix="bench_suite_")
+    os.chdir(workdir)  # data/ and generated/ are relative paths
+    try:
+        from fastapi.testclient import TestClient
+        from benchmarks.standins import installed
+
+        with installed():
+            import main as api
+
+            cases = build_cases(TestClient(api.app))
+            results = {}
+            print(f"{'case':<30}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak KB':>10}")
+            for name, func in cases.items():
+                if not name.startswith(args.only):
+                    continue
+                with contextlib.redirect_stdout(io.StringIO()):  # the agent's verbose chain logging
+                    results[name] = measure(func, args.iterations, args.warmup)
+                r = results[name]
+                print(f"{name:<30}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['peak_kb']:>10.0f}")
+    finally:
+        if "tools.jobs" in sys.modules:
+            sys.modules["tools.jobs"]._executor.shutdown(wait=True)  # report jobs still writing to workdir
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=1, sort_keys=True)
+        print(f"\nbaseline saved to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print("\nno baseline yet; run with --save-baseline to create one")
+        return
+    with open(args.baseline) as f:
+        problems = regressions(results, json.load(f), args.threshold)
+    if problems:
+        print(f"\n❌ {len(problems)} regression(s) beyond {args.threshold:.0%}:")
+        for problem in problems:
+            print("  " + problem)
+        sys.exit(1)
+    print(f"\n✅ no regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+# benchmarks/loadtest.py
+"""
+Load-test the API in main.py with concurrency sweeps, fully offline.
+
+    python -m benchmarks.loadtest                                   # default endpoints and sweep
+    python -m benchmarks.loadtest --endpoints chat,portfolio --concurrency 1,8,32 --duration 15
+    python -m benchmarks.loadtest --llm-latency 1.5 --market-latency 0.3 --compare benchmarks/reports/load-before.json
+    python -m benchmarks.loadtest compare OLD.json NEW.json         # compare two saved runs
+
+A single uvicorn worker is started in a subprocess with the stand-ins from
+benchmarks/standins.py installed (injected latency per service), then each
+endpoint is driven by N concurrent clients for --duration seconds at each
+concurrency level. Throughput, p50/p95/p99 latency and error rate per
+endpoint and level are printed and saved as JSON under benchmarks/reports/.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPORTS_DIR = os.path.join(ROOT, "benchmarks", "reports")
+
+PORTFOLIO = [
+    {"symbol": "RELIANCE.NS", "quantity": 10, "buy_price": 2400},
+    {"symbol": "TCS.NS", "quantity": 5, "buy_price": 3500},
+    {"symbol": "INFY.NS", "quantity": 20, "buy_price": 1400},
+    {"symbol": "HDFCBANK.NS", "quantity": 15, "buy_price": 1500},
+]
+
+ENDPOINTS = {
+    "chat": ("POST", "/api/chat/", {"query": "How much should I invest monthly to retire at 55?", "history": []}),
+    "portfolio": ("POST", "/api/portfolio/", {"stocks": PORTFOLIO}),
+    "portfolio-stress": ("POST", "/api/portfolio/stress", {"stocks": PORTFOLIO}),
+    "news-risk": ("POST", "/api/news-risk/", {"symbols": ["TCS.NS", "INFY.NS"]}),
+    "stock": ("POST", "/api/stock/", {"symbol": "RELIANCE.NS"}),
+    "tax": ("POST", "/api/tax/", {}),
+    "sip": ("POST", "/api/sip/", {"amount": 10000, "years": 20, "rate": 12}),
+    "budget": ("POST", "/api/budget/", {}),
+}
+DEFAULT_ENDPOINTS = "chat,portfolio,news-risk,stock,sip"
+
+
+# ---------------------------------------------------------------------------
+# Server side: the app with stand-ins installed
+# ---------------------------------------------------------------------------
+
+def serve(port: int, market_latency: float, news_latency: float, llm_latency: float):
+    sys.path.insert(0, ROOT)
+    os.environ.setdefault("OPENAI_API_KEY", "offline")
+    import uvicorn
+    from benchmarks.standins import installed
+
+    with installed(market_latency, news_latency, llm_latency):
+        import main
+
+        uvicorn.run(main.app, host="127.0.0.1", port=port, workers=1, log_level="warning", access_log=False)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(args) -> tuple[subprocess.Popen, str, str]:
+    port = _free_port()
+    workdir = tempfile.mkdtemp(prefix="loadtest_")  # data/ and generated/ land here
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.loadtest", "serve", "--port", str(port),
+         "--market-latency", str(args.market_latency), "--news-latency", str(args.news_latency),
+         "--llm-latency", str(args.llm_latency)],
+        cwd=workdir, env=dict(os.environ, PYTHONPATH=ROOT, PYTHONWARNINGS="ignore"), stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("API server exited during start-up")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return proc, f"http://127.0.0.1:{port}", workdir
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("API server did not start within 60s")
+
+
+# ---------------------------------------------------------------------------
+# Client side: closed-loop load at a fixed concurrency
+# ---------------------------------------------------------------------------
+
+async def run_level(base_url: str, endpoint: str, concurrency: int, duration: float, timeout: float) -> dict:
+    import httpx
+
+    method, path, body = ENDPOINTS[endpoint]
+    latencies, errors = [], 0
+    stop_at = time.perf_counter() + duration
+
+    async def user(client):
+        nonlocal errors
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            latencies.append((time.perf_counter() - start) * 1000)
+            errors += not ok
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(user(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if latencies else (0, 0, 0)
+    return {
+        "endpoint": endpoint, "concurrency": concurrency, "requests": len(latencies), "errors": errors,
+        "error_rate": round(errors / len(latencies), 4) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(p50, 1), "p95_ms": round(p95, 1), "p99_ms": round(p99, 1),
+    }
+
+
+def print_header():
+    print(f"{'endpoint':<18}{'conc':>6}{'reqs':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>9}")
+
+
+def print_row(r: dict):
+    print(f"{r['endpoint']:<18}{r['concurrency']:>6}{r['requests']:>8}{r['throughput_rps']:>9.1f}"
+          f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}{r['error_rate']:>9.1%}", flush=True)
+
+
+def compare(old: dict, new: dict):
+    """Per endpoint and concurrency: throughput and p95 change from `old` to `new`."""
+    before = {(r["endpoint"], r["concurrency"]): r for r in old["levels"]}
+    print(f"\ncomparison with {old.get('label') or old['started_at']}")
+    print(f"{'endpoint':<18}{'conc':>6}{'rps old':>10}{'rps new':>10}{'change':>8}"
+          f"{'p95 old':>10}{'p95 new':>10}{'err old':>9}{'err new':>9}")
+    for r in new["levels"]:
+        b = before.get((r["endpoint"], r["concurrency"]))
+        if not b:
+            continue
+        change = r["throughput_rps"] / b["throughput_rps"] - 1 if b["throughput_rps"] else 0
+        print(f"{r['endpoint']:<18}{r['concurrency']:>6}{b['throughput_rps']:>10.1f}{r['throughput_rps']:>10.1f}"
+              f"{change:>+8.0%}{b['p95_ms']:>10.0f}{r['p95_ms']:>10.0f}{b['error_rate']:>9.1%}{r['error_rate']:>9.1%}")
+
+
+def run(args):
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = set(endpoints) - ENDPOINTS.keys()
+    if unknown:
+        sys.exit(f"unknown endpoint(s): {', '.join(sorted(unknown))}; choose from {', '.join(ENDPOINTS)}")
+    levels = [int(c) for c in args.concurrency.split(",")]
+
+    report = {
+        "label": args.label,
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {"duration": args.duration, "market_latency": args.market_latency,
+                   "news_latency": args.news_latency, "llm_latency": args.llm_latency},
+        "levels": [],
+    }
+    proc, base_url, workdir = start_server(args)
+    print_header()
+    try:
+        for endpoint in endpoints:
+            for concurrency in levels:
+                result = asyncio.run(run_level(base_url, endpoint, concurrency, args.duration, args.timeout))
+                report["levels"].append(result)
+                print_row(result)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"\nreport written to {args.out}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command")
+
+    serve_parser = sub.add_parser("serve", help=argparse.SUPPRESS)
+    compare_parser = sub.add_parser("compare", help="compare two saved reports")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+
+    for p in (parser, serve_parser):
+        p.add_argument("--market-latency", type=float, default=0.05, help="seconds added to each yfinance call")
+        p.add_argument("--news-latency", type=float, default=0.1, help="seconds added to each GNews call")
+        p.add_argument("--llm-latency", type=float, default=0.5, help="seconds added to each LLM call")
+    serve_parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--endpoints", default=DEFAULT_ENDPOINTS, help=f"comma-separated, from: {', '.join(ENDPOINTS)}")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per endpoint and level")
+    parser.add_argument("--timeout", type=float, default=60, help="per-request timeout in seconds")
+    parser.add_argument("--label", default="", help="name for this run in comparisons")
+    parser.add_argument("--out", default=os.path.join(REPORTS_DIR, f"load-{time.strftime('%Y%m%d-%H%M%S')}.json"))
+    parser.add_argument("--compare", help="earlier report to compare this run with")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.port, args.market_latency, args.news_latency, args.llm_latency)
+    elif args.command == "compare":
+        with open(args.old) as f_old, open(args.new) as f_new:
+            old, new = json.load(f_old), json.load(f_new)
+        print_header()
+        for r in new["levels"]:
+            print_row(r)
+        compare(old, new)
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+# benchmarks/standins.py
+"""
+Offline stand-ins for the services the tools call: yfinance, GNews and the
+OpenAI chat model.
+
+    python -m benchmarks.standins record RELIANCE.NS TCS.NS ^NSEI   # capture real responses
+
+Market data and headlines are replayed from benchmarks/fixtures/recorded.json
+when a symbol was recorded, otherwise generated deterministically from the
+symbol name, so runs are reproducible with or without a recording. The chat
+model returns canned answers shaped like the real ones (JSON where the caller
+parses JSON). Each stand-in can add a fixed latency to mimic the network.
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+import zlib
+from contextlib import ExitStack, contextmanager
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "recorded.json")
+HISTORY_START = "2007-01-01"
+INFO_KEYS = ["regularMarketPrice", "previousClose", "longName", "marketCap", "trailingPE", "sector", "longBusinessSummary"]
+TIMEZONE = "Asia/Kolkata"
+
+
+def _delay(seconds: float):
+    if seconds:
+        time.sleep(seconds)
+
+
+class Market:
+    """Recorded (or synthetic) closes, quote info and headlines per symbol."""
+
+    def __init__(self, path: str = FIXTURE_PATH):
+        self.recorded = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.recorded = json.load(f).get("symbols", {})
+        self._closes = {}
+
+    def closes(self, symbol: str) -> pd.Series:
+        if symbol not in self._closes:
+            entry = self.recorded.get(symbol)
+            if entry:
+                closes = pd.Series(entry["closes"]["values"], index=pd.to_datetime(entry["closes"]["dates"]), dtype=float)
+            else:
+                closes = synthetic_closes(symbol)
+            self._closes[symbol] = closes
+        return self._closes[symbol]
+
+    def info(self, symbol: str) -> dict:
+        if symbol in self.recorded:
+            return dict(self.recorded[symbol]["info"])
+        closes = self.closes(symbol)
+        return {
+            "regularMarketPrice": float(closes.iloc[-1]),
+            "previousClose": float(closes.iloc[-2]),
+            "longName": f"{symbol.split('.')[0].title()} Limited",
+            "marketCap": int(closes.iloc[-1] * 1e9),
+            "trailingPE": 24.5,
+            "sector": "Industrials",
+            "longBusinessSummary": f"{symbol} operates diversified businesses across India. " * 40,
+        }
+
+    def news(self, symbol: str) -> list[dict]:
+        if symbol in self.recorded and self.recorded[symbol].get("news"):
+            return self.recorded[symbol]["news"]
+        return [{"title": f"{symbol} headline {i}", "description": f"Market update {i} on {symbol}."} for i in range(5)]
+
+
+def synthetic_closes(symbol: str) -> pd.Series:
+    """Geometric random walk over business days, seeded by the symbol name."""
+    rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+    dates = pd.bdate_range(HISTORY_START, pd.Timestamp.today().normalize())
+    returns = rng.normal(0.0004, 0.012 if symbol.startswith("^") else 0.018, len(dates))
+    return pd.Series(rng.uniform(100, 3000) * np.exp(np.cumsum(returns)), index=dates)
+
+
+def _window(closes: pd.Series, start=None, period=None) -> pd.Series:
+    if start is not None:
+        return closes[closes.index >= pd.Timestamp(start)]
+    if period and period != "max":
+        months = {"1mo": 1, "3mo": 3, "6mo": 6, "1y": 12, "2y": 24, "5y": 60, "10y": 120}[period]
+        return closes[closes.index >= closes.index[-1] - pd.DateOffset(months=months)]
+    return closes
+
+
+class FakeTicker:
+    """The subset of yfinance.Ticker the tools use."""
+
+    market = None
+    latency = 0.0
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+
+    @property
+    def info(self) -> dict:
+        _delay(self.latency)
+        return self.market.info(self.symbol)
+
+    def history(self, period=None, start=None, **kwargs) -> pd.DataFrame:
+        _delay(self.latency)
+        closes = _window(self.market.closes(self.symbol), start, period)
+        return pd.DataFrame({"Close": closes.to_numpy()}, index=closes.index.tz_localize(TIMEZONE))
+
+
+def fake_download(tickers, start=None, period=None, **kwargs) -> pd.DataFrame:
+    """yf.download(..., multi_level_index=True): ("Close", symbol) columns."""
+    _delay(FakeTicker.latency)
+    symbols = [tickers] if isinstance(tickers, str) else list(tickers)
+    frame = pd.concat({s: _window(FakeTicker.market.closes(s), start, period) for s in symbols}, axis=1)
+    frame.columns = pd.MultiIndex.from_product([["Close"], frame.columns], names=["Price", "Ticker"])
+    return frame
+
+
+class FakeProvider:
+    """
+    A market-data provider (see tools/market_data.py) answering from Market
+    after `latency` seconds; a `slow_rate` share of calls take `slow_latency`
+    instead and a `fail_rate` share raise, drawn from a seeded generator.
+    """
+
+    def __init__(self, name: str, market: Market, latency: float = 0.05, slow_latency: float = 2.0,
+                 slow_rate: float = 0.0, fail_rate: float = 0.0, suffixes=None, seed: int = 0):
+        self.name, self.market, self.suffixes = name, market, suffixes
+        self.latency, self.slow_latency, self.slow_rate, self.fail_rate = latency, slow_latency, slow_rate, fail_rate
+        self._rng = np.random.default_rng(seed)
+        self.calls = 0
+
+    def supports(self, symbol: str) -> bool:
+        return self.suffixes is None or symbol.upper().endswith(tuple(self.suffixes))
+
+    def quote(self, symbol: str) -> float:
+        self.calls += 1
+        slow, fail = self._rng.random(2)
+        _delay(self.slow_latency if slow < self.slow_rate else self.latency)
+        if fail < self.fail_rate:
+            raise ConnectionError(f"{self.name} unavailable")
+        return float(self.market.closes(symbol).iloc[-1])
+
+
+class FakeResponse:
+    def __init__(self, payload: dict, status_code: int = 200):
+        self.status_code = status_code
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+def fake_news_get(market: Market, latency: float = 0.0):
+    """requests.get replacement answering GNews search URLs."""
+    from tools.news_risk import symbol_to_name
+
+    names = {name: symbol for symbol, name in symbol_to_name.items()}
+
+    def get(url, **kwargs):
+        _delay(latency)
+        query = re.search(r"[?&]q=([^&]*)", url).group(1)
+        return FakeResponse({"articles": market.news(names.get(query, query))})
+    return get
+
+
+def canned_answer(prompt: str) -> str:
+    """Answers shaped like the model's, keyed on which tool wrote the prompt."""
+    if "Classify each bank statement merchant" in prompt:
+        merchants = re.findall(r"^- (.+)$", prompt, re.M)
+        return json.dumps({m: "Other" for m in merchants})
+    stocks = re.findall(r"^Stock: (\S+) \((.*)\)$", prompt, re.M)
+    if stocks:
+        return json.dumps([
+            {"symbol": s, "company_name": name, "risks": ["Market volatility"], "action": "hold",
+             "prediction": "neutral", "probability": 60, "summary": f"{name} looks stable.",
+             "gpt_suggestion": "Hold and review next quarter."}
+            for s, name in stocks
+        ])
+    return "Keep investing regularly, use your 80C limit fully and review the plan every year."
+
+
+def canned_tool_calls(question: str) -> list[dict]:
+    """Tool calls the model would make for a user question, one per tool it mentions."""
+    calls = []
+    if re.search(r"\b(emi|loan)\b", question, re.I):
+        calls.append({"name": "run_loan_tool", "args": {"principal": 5000000, "years": 20, "rate": 8.5}})
+    if re.search(r"\bsip\b", question, re.I):
+        calls.append({"name": "run_goal_tool", "args": {"goal_amount": 10000000, "years": 15, "income": 150000}})
+    for symbol in re.findall(r"\b([A-Z]{2,})\s+stock\b", question):
+        calls.append({"name": "run_stock_tool", "args": {"symbol": f"{symbol}.NS"}})
+    return [dict(call, id=f"call_{i}", type="tool_call") for i, call in enumerate(calls)]
+
+
+def replay_chat_model(latency: float = 0.0):
+    """
+    A LangChain chat model returning canned_answer() after `latency` seconds.
+    With tools bound, a user question naming tools gets canned_tool_calls()
+    in one turn, as with parallel function calling.
+    """
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage, HumanMessage
+    from langchain_core.outputs import ChatGeneration, ChatResult
+
+    class ReplayChatModel(BaseChatModel):
+        delay: float = 0.0
+
+        @property
+        def _llm_type(self) -> str:
+            return "replay"
+
+        def bind_tools(self, tools, **kwargs):
+            return self.bind(tools=[tool.name for tool in tools])
+
+        def _generate(self, messages, stop=None, run_manager=None, tools=None, **kwargs):
+            _delay(self.delay)
+            if tools and isinstance(messages[-1], HumanMessage):
+                calls = [call for call in canned_tool_calls(messages[-1].content) if call["name"] in tools]
+                if calls:
+                    return ChatResult(generations=[ChatGeneration(message=AIMessage(content="", tool_calls=calls))])
+            prompt = "\n".join(str(m.content) for m in messages)
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=canned_answer(prompt)))])
+
+    return ReplayChatModel(delay=latency)
+
+
+@contextmanager
+def installed(market_latency: float = 0.0, news_latency: float = 0.0, llm_latency: float = 0.0, path: str = FIXTURE_PATH):
+    """Patch yfinance, GNews and the agent's chat model for the duration of the block."""
+    import requests
+    import yfinance
+    import agent
+    import tools.news_risk
+
+    market = Market(path)
+    FakeTicker.market, FakeTicker.latency = market, market_latency
+    with ExitStack() as stack:
+        stack.enter_context(mock.patch.object(yfinance, "Ticker", FakeTicker))
+        stack.enter_context(mock.patch.object(yfinance, "download", fake_download))
+        stack.enter_context(mock.patch.object(requests, "get", fake_news_get(market, news_latency)))
+        stack.enter_context(mock.patch.object(tools.news_risk, "GNEWS_API_KEY", "replay"))
+        stack.enter_context(mock.patch.object(agent, "_llm", replay_chat_model(llm_latency)))
+        yield market
+
+
+def record(symbols: list[str], path: str = FIXTURE_PATH):
+    """Fetch real quote info, closes since HISTORY_START and headlines into `path`."""
+    import yfinance as yf
+    from tools.news_risk import fetch_news
+
+    data = {"recorded_at": pd.Timestamp.now().isoformat(), "symbols": {}}
+    for symbol in symbols:
+        ticker = yf.Ticker(symbol)
+        closes = ticker.history(start=HISTORY_START)["Close"].dropna()
+        info = ticker.info
+        data["symbols"][symbol] = {
+            "info": {key: info.get(key) for key in INFO_KEYS},
+            "closes": {"dates": closes.index.tz_localize(None).strftime("%Y-%m-%d").tolist(),
+                       "values": closes.round(4).tolist()},
+            "news": [{"title": h.split(" - ", 1)[0], "description": h.split(" - ", 1)[-1]} for h in fetch_news(symbol)],
+        }
+        print(f"recorded {symbol}: {len(closes)} closes")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["record"])
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--path", default=FIXTURE_PATH)
+    args = parser.parse_args()
+    record(args.symbols, args.path)
+
+
+if __name__ == "__main__":
+    main()
@@ -65,8 +65,23 @@ export default function FinancialReports() {
         throw new Error('Failed to generate and send report');
       }
 
-      const data = await response.json();
-      setResult({ success: data.success, message: data.message, file_path: data.file_path });
+      // The report is generated and emailed in a background job; poll until it finishes
+      const { job_id } = await response.json();
+      let job;
+      do {
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        const jobResponse = await fetch(`http://localhost:8000/api/jobs/${job_id}`);
+        if (!jobResponse.ok) {
+          throw new Error('Failed to fetch report status');
+        }
+        job = await jobResponse.json();
+      } while (job.status === 'queued' || job.status === 'running');
+
+      if (job.status === 'failed') {
+        setResult({ success: false, message: job.error, file_path: undefined });
+      } else {
+        setResult({ success: job.result.success, message: job.result.message, file_path: job.result.file_path });
+      }
     } catch (err) {
       setError('Failed to generate report. Please try again.');
       console.error('Report generation error:', err);
@@ -1,23 +1,50 @@
-from fastapi import FastAPI, UploadFile, File, Form
+from fastapi import FastAPI, UploadFile, File, Form, Header, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from tools.email_report import run_email_report_tool
+from tools.email_delivery import start_outbox_worker
 from agent import run_gpt_agent
-from tools.sip import sip_projection
-from tools.loan import loan_projection
+from tools.sip import sip_result
+from tools.loan import loan_summary
 from tools.tax_saver import tax_summary_gpt
-from tools.news_risk import analyze_portfolio_risk
-from tools.budget import budget_projection
-from tools.goal_planner import goal_projection
-from tools.portfolio import analyze_portfolio
-from tools.stock import stock_summary_and_chart
-from tools.expense_categorizer import run_expense_categorizer
+from tools.form16_parser import parse_form16
+from tools.risk_precompute import portfolio_risk_report, start_risk_scheduler
+from tools.budget import budget_result
+from tools.goal_planner import goal_summary
+from tools.portfolio import analyze_portfolio, fetch_close_history
+from tools.live_portfolio import quote_hub
+from tools.portfolio_analytics import portfolio_risk, BENCHMARK
+from tools.stress_test import stress_test
+from tools.history_codec import ENCODINGS, HISTORY_POINTS, compact_history, history_records
+from utils.chart_utils import CHART_MAX_POINTS
+from tools.stock import cached_stock_summary
+from tools.expense_categorizer import run_expense_categorizer, read_statement, format_expense_report
+from tools.ledger import ingest_statement, monthly_breakdown
 from tools.pdf_generator import generate_pdf_summary
+from tools.jobs import submit_job, get_job
+from tools.registry import warm_up
+from tools.metrics import MetricsMiddleware, render as render_metrics
+from tools import profiling
+from tools.llm_usage import BudgetExceeded, tagged, usage as llm_usage
 import json
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 import os
+import asyncio
+from contextlib import asynccontextmanager
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Retry emails that could not be delivered on the first attempt
+    start_outbox_worker()
+    if os.getenv("NEWS_RISK_SCHEDULER", "0") == "1":
+        # Precompute news-risk for the watchlist at start-up, pre-market and hourly
+        start_risk_scheduler()
+    if os.getenv("WARM_UP", "0") == "1":
+        # Heavy libraries load on first use; pay that before serving instead of on the first requests
+        print("[warm-up]", await asyncio.to_thread(warm_up))
+    yield
+
+app = FastAPI(lifespan=lifespan)
 
 # Ensure output directory exists before mounting
 os.makedirs("generated", exist_ok=True)
@@ -34,13 +61,82 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency histograms, status counts and in-flight requests (see /metrics)
+app.add_middleware(MetricsMiddleware)
+
+# cProfile / stack-sampling of single requests on demand (see /api/admin/profiles)
+app.add_middleware(profiling.ProfilingMiddleware)
+
+@app.get("/metrics")
+async def metrics():
+    # Prometheus text format: request and stage (yfinance, GNews, LLM, ...) latency histograms
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+# ---------------------------------------------------------------------------
+# Request profiling (admin only: X-Profile-Token must match PROFILE_ADMIN_TOKEN)
+# ---------------------------------------------------------------------------
+
+def _forbidden():
+    return JSONResponse({"success": False, "message": "Invalid or missing profiling token."}, status_code=403)
+
+@app.get("/api/admin/profiling")
+async def profiling_settings(x_profile_token: str = Header(None)):
+    if not profiling.authorized(x_profile_token):
+        return _forbidden()
+    return profiling.settings
+
+@app.post("/api/admin/profiling")
+async def update_profiling(request: dict, x_profile_token: str = Header(None)):
+    """Change sampling at runtime, e.g. {"sample_rate": 0.05, "paths": ["/api/portfolio/"], "mode": "sample"}."""
+    if not profiling.authorized(x_profile_token):
+        return _forbidden()
+    try:
+        return profiling.update_settings(request)
+    except (TypeError, ValueError) as e:
+        return JSONResponse({"success": False, "message": str(e)}, status_code=400)
+
+@app.get("/api/admin/profiles")
+async def list_profiles(x_profile_token: str = Header(None)):
+    if not profiling.authorized(x_profile_token):
+        return _forbidden()
+    return {"profiles": profiling.list_profiles()}
+
+@app.get("/api/admin/profiles/{request_id}")
+async def get_profile(request_id: str, format: str = "text", x_profile_token: str = Header(None)):
+    """
+    format=text: pstats report by cumulative time (cprofile mode)
+    format=raw: the .prof file, for snakeviz / flameprof (cprofile mode)
+    format=collapsed: folded stacks for flamegraph.pl / speedscope (sample mode)
+    """
+    if not profiling.authorized(x_profile_token):
+        return _forbidden()
+    if format == "text" and profiling.profile_path(request_id, "prof"):
+        return PlainTextResponse(profiling.profile_text(request_id))
+    kind = {"raw": "prof", "collapsed": "collapsed", "text": "collapsed"}.get(format)
+    path = profiling.profile_path(request_id, kind) if kind else None
+    if path is None:
+        return JSONResponse({"success": False, "message": "No such profile in that format."}, status_code=404)
+    if kind == "prof":
+        return FileResponse(path, media_type="application/octet-stream", filename=f"{request_id}.prof")
+    return FileResponse(path, media_type="text/plain; charset=utf-8")
+
 @app.post("/api/chat/")
 async def chat(request: dict):
     query = request.get("query", "")
     history = request.get("history", [])
-    answer = run_gpt_agent(query, history)
+    try:
+        with tagged("chat", request.get("session_id")):
+            answer = run_gpt_agent(query, history)
+    except BudgetExceeded:
+        answer = ("I've reached my AI usage limit for now, so I can't answer that right now. "
+                  "The SIP, loan, budget, goal and tax calculators still work without it.")
     return {"answer": answer}
 
+@app.get("/api/llm-usage")
+async def llm_usage_report(session_id: str = None):
+    # Prompt/completion tokens, latency, tool calls and cost per caller, or for one chat session
+    return llm_usage(session_id)
+
 @app.post("/api/send-email/")
 async def send_email(
     to_email: str = Form(...),
@@ -60,7 +156,7 @@ async def calculate_sip(request: dict):
     amount = request.get("amount", 10000)
     years = request.get("years", 10)
     rate = request.get("rate", 12)
-    result, _ = sip_projection(amount, years, rate)
+    result = sip_result(amount, years, rate)
     return result
 
 @app.post("/api/loan/")
@@ -68,7 +164,7 @@ async def calculate_loan(request: dict):
     principal = request.get("principal", 500000)
     years = request.get("years", 5)
     rate = request.get("rate", 10)
-    result, _ = loan_projection(principal, years, rate)
+    result = loan_summary(principal, years, rate)
     return {"result": result}
 
 @app.post("/api/tax/")
@@ -86,10 +182,21 @@ async def optimize_tax(request: dict):
     )
     return result
 
+@app.post("/api/tax/parse-form16")
+async def parse_form16_upload(file: UploadFile = File(...)):
+    # Returns salary, basic_salary, hra_received, rent, 80C/80D and employer NPS
+    # as keyword arguments for /api/tax/ (tax_summary_gpt); 0 when not found.
+    try:
+        fields = parse_form16(await file.read())
+    except ValueError as e:
+        return JSONResponse({"success": False, "message": str(e)}, status_code=400)
+    return {"fields": fields}
+
 @app.post("/api/news-risk/")
 async def news_risk_analysis(request: dict):
     symbols = request.get("symbols", [])
-    risk_summary = analyze_portfolio_risk(symbols)
+    # Watchlist symbols come precomputed (see tools/risk_precompute.py); only the rest hit GNews and the LLM
+    risk_summary = portfolio_risk_report(symbols)
     return {"risk_summary": risk_summary}
 
 @app.post("/api/budget/")
@@ -101,7 +208,7 @@ async def analyze_budget(request: dict):
     entertainment = request.get("entertainment", 3000)
     other = request.get("other", 2000)
     
-    result, _ = budget_projection(income, rent, food, transport, entertainment, other)
+    result = budget_result(income, rent, food, transport, entertainment, other)
     return result
 
 @app.post("/api/goal-planner/")
@@ -111,54 +218,153 @@ async def plan_goal(request: dict):
     income = request.get("income", 50000)
     annual_return = request.get("annual_return", 12.0)
     
-    summary, _ = goal_projection(goal_amount, years, income, annual_return)
+    summary = goal_summary(goal_amount, years, income, annual_return)
     return {"summary": summary}
 
 @app.post("/api/portfolio/")
 async def analyze_user_portfolio(request: dict):
     stocks = request.get("stocks", [])
     # stocks should be list of {"symbol": "RELIANCE.NS", "quantity": 10, "buy_price": 2500}
+    encoding = request.get("encoding", "base64")
+    if request.get("format") == "compact" and encoding not in ENCODINGS:
+        return JSONResponse({"success": False, "message": f"Unknown encoding {encoding!r}."}, status_code=422)
     summary = analyze_portfolio(stocks)
-    return {"summary": summary.to_dict('records') if hasattr(summary, 'to_dict') else str(summary)}
+    if request.get("format") == "compact":
+        # One shared date axis + symbol x date float32 matrix instead of per-row lists
+        response = {
+            "summary": summary.to_dict('records'),
+            "history": compact_history(summary.attrs["history"], points=request.get("points"), encoding=encoding),
+        }
+    else:
+        # Per-row sparkline lists, capped at HISTORY_POINTS dates unless "points" is given
+        response = {"summary": history_records(summary, request.get("points") or HISTORY_POINTS)}
+    if request.get("risk"):
+        # Volatility, Sharpe, drawdown, beta and correlations from the history already fetched above
+        response["risk"] = portfolio_risk(summary, fetch_close_history(BENCHMARK),
+                                          points=request.get("points") or CHART_MAX_POINTS)
+    return response
+
+async def _push_deltas(websocket: WebSocket, subscriber):
+    while True:
+        await websocket.send_json(await subscriber.next_delta())
+
+@app.websocket("/ws/portfolio")
+async def live_portfolio(websocket: WebSocket):
+    """
+    Live valuation instead of polling /api/portfolio/. Send
+    {"action": "subscribe", "stocks": [{"symbol", "quantity", "buy_price"}, ...]}
+    to get a "snapshot" message (all rows and totals), then "delta" messages
+    with only the rows whose price moved ({row index: row}) and new totals.
+    Subscribing again replaces the portfolio; {"action": "unsubscribe"} stops updates.
+    """
+    await websocket.accept()
+    hub = quote_hub()
+    subscriber, pusher = None, None
+
+    def stop():
+        nonlocal subscriber, pusher
+        if pusher is not None:
+            pusher.cancel()
+        if subscriber is not None:
+            hub.unsubscribe(subscriber)
+        subscriber, pusher = None, None
+
+    try:
+        while True:
+            message = await websocket.receive_json()
+            action = message.get("action")
+            if action == "subscribe":
+                stocks = message.get("stocks") or []
+                try:
+                    if not all(isinstance(s, dict) and {"symbol", "quantity", "buy_price"} <= s.keys() for s in stocks):
+                        raise ValueError
+                    stocks = [dict(s, quantity=float(s["quantity"]), buy_price=float(s["buy_price"])) for s in stocks]
+                except (TypeError, ValueError):
+                    await websocket.send_json({"type": "error",
+                                               "message": "Each stock needs symbol, numeric quantity and buy_price."})
+                    continue
+                stop()
+                subscriber, snapshot = await hub.subscribe(stocks)
+                await websocket.send_json(snapshot)
+                pusher = asyncio.create_task(_push_deltas(websocket, subscriber))
+            elif action == "unsubscribe":
+                stop()
+            else:
+                await websocket.send_json({"type": "error", "message": f"Unknown action {action!r}."})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        stop()
+
+@app.post("/api/portfolio/stress")
+async def stress_test_portfolio(request: dict):
+    stocks = request.get("stocks", [])
+    horizon_days = request.get("horizon_days", 1)
+    if not isinstance(horizon_days, int) or isinstance(horizon_days, bool) or horizon_days < 1:
+        return JSONResponse({"success": False, "message": "horizon_days must be a positive integer."}, status_code=422)
+    # Historical-simulation VaR/CVaR plus replayed crash windows (2008, 2020, ...)
+    result = stress_test(
+        stocks,
+        confidence=request.get("confidence", [0.95, 0.99]),
+        horizon_days=horizon_days,
+        market_shocks=request.get("market_shocks"),
+    )
+    return result
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+async def _stock_response(symbol: str, if_none_match: str = None):
+    # Quotes are cached for STOCK_CACHE_TTL seconds and concurrent misses share one
+    # fetch; the fetch runs off the event loop so identical requests can overlap.
+    result, etag, max_age = await asyncio.to_thread(cached_stock_summary, symbol)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(result, headers=headers)
 
 @app.post("/api/stock/")
-async def get_stock_info(request: dict):
+async def get_stock_info(request: dict, if_none_match: str = Header(None)):
     symbol = request.get("symbol", "RELIANCE.NS")
-    result, _ = stock_summary_and_chart(symbol)
-    return result
+    return await _stock_response(symbol, if_none_match)
+
+@app.get("/api/stock/{symbol}")
+async def get_stock_info_cached(symbol: str, if_none_match: str = Header(None)):
+    # Cacheable form of POST /api/stock/ for browsers and proxies (conditional GET via If-None-Match)
+    return await _stock_response(symbol, if_none_match)
 
 @app.post("/api/expense-categorizer/")
 async def categorize_expenses(
-    file: UploadFile = File(...)
+    file: UploadFile = File(...),
+    account: str = Form("default")
 ):
     # Save uploaded file temporarily
     temp_path = f"temp_expenses_{file.filename}"
     with open(temp_path, "wb") as f:
         f.write(await file.read())
-    
-    result = run_expense_categorizer(temp_path)
-    return {"result": result}
+    filetype = "pdf" if file.filename.lower().endswith(".pdf") else "csv"
+    try:
+        # Rows seen in an earlier (overlapping) upload are not stored or categorized again
+        df, new_rows = ingest_statement(read_statement(temp_path, filetype), account)
+    finally:
+        os.remove(temp_path)
+
+    result = format_expense_report(df)
+    return {"result": result, "new_rows": new_rows, "duplicate_rows": len(df) - new_rows}
+
+@app.get("/api/expense-categorizer/breakdown")
+async def expense_breakdown(account: str = "default", month: str = None):
+    breakdown = monthly_breakdown(account, month)
+    return {"breakdown": breakdown.to_dict('records')}
 
 # ---------------------------------------------------------------------------
 # NEW: Unified Report Generation + Email Endpoint
 # ---------------------------------------------------------------------------
 
-@app.post("/api/generate-report/")
-async def generate_report(request: dict):
-    """Generate a PDF financial report and email it to the user.
-
-    Expected JSON body:
-    {
-        "email": "user@example.com",
-        "portfolio_value": 1000000,
-        "monthly_income": 80000,
-        "monthly_expenses": 50000,
-        "financial_goals": "Buy a house in 5 years",
-        "risk_tolerance": "moderate",
-        "report_type": "comprehensive"
-    }
-    """
-
+def _generate_and_send_report(request: dict, progress) -> dict:
     email = request.get("email")
     report_type = request.get("report_type", "comprehensive")
     portfolio_value = request.get("portfolio_value", 0)
@@ -177,34 +383,58 @@ async def generate_report(request: dict):
         f"Financial Goals: {financial_goals}\n"
     )
 
-    try:
-        # Generate PDF
-        pdf_path = generate_pdf_summary(summary_text)
-
-        # Send via email (if email provided)
-        if email:
-            subject = f"Your {report_type.title()} Financial Report"
-            body = "Please find your financial report attached."
-            send_status = run_email_report_tool(email, subject, body, pdf_path)
-            success = send_status.startswith("✅")
-            return JSONResponse({
-                "success": success,
-                "message": send_status,
-                "file_path": pdf_path
-            })
-
-        # If no email – just return the path so the frontend can offer a download
-        return JSONResponse({
-            "success": True,
-            "message": "Report generated successfully.",
+    progress(10, "Generating PDF")
+    pdf_path = generate_pdf_summary(summary_text)
+
+    # Send via email (if email provided)
+    if email:
+        progress(60, "Sending email")
+        subject = f"Your {report_type.title()} Financial Report"
+        body = "Please find your financial report attached."
+        send_status = run_email_report_tool(email, subject, body, pdf_path)
+        return {
+            "success": send_status.startswith("✅"),
+            "message": send_status,
             "file_path": pdf_path
-        })
-    except Exception as e:
-        # Capture any unexpected server-side errors so the client gets a
-        # structured response instead of a network failure (which shows up as
-        # "Failed to fetch" in the browser).
-        print("[generate_report] Error:", e)
-        return JSONResponse({
-            "success": False,
-            "message": f"Server error while generating report: {str(e)}"
-        }, status_code=500)
\ No newline at end of file
+        }
+
+    # If no email – just return the path so the frontend can offer a download
+    return {
+        "success": True,
+        "message": "Report generated successfully.",
+        "file_path": pdf_path
+    }
+
+@app.post("/api/generate-report/")
+async def generate_report(request: dict):
+    """Queue a PDF financial report (and optional email) and return a job id.
+
+    Expected JSON body:
+    {
+        "email": "user@example.com",
+        "portfolio_value": 1000000,
+        "monthly_income": 80000,
+        "monthly_expenses": 50000,
+        "financial_goals": "Buy a house in 5 years",
+        "risk_tolerance": "moderate",
+        "report_type": "comprehensive"
+    }
+
+    Poll /api/jobs/{job_id} for progress; the finished job's "result" holds
+    success, message and file_path.
+    """
+    job = submit_job("generate-report", _generate_and_send_report, request)
+    return JSONResponse({
+        "success": True,
+        "message": "Report queued.",
+        "job_id": job["id"],
+        "status": job["status"]
+    }, status_code=202)
+
+@app.get("/api/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = get_job(job_id)
+    if job is None:
+        return JSONResponse({"success": False, "message": "Unknown job id."}, status_code=404)
+    job.pop("key", None)
+    return job
@@ -0,0 +1,7 @@
+# tests/conftest.py
+
+import os
+import sys
+
+# The tools are imported as top-level modules (tools.x, agent, main), as the app does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
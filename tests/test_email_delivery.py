@@ -0,0 +1,156 @@
+# tests/test_email_delivery.py
+
+import socket
+import time
+import pytest
+from aiosmtpd.controller import Controller
+from tools import email_delivery
+from tools.email_delivery import SMTPPool, build_message, deliver_due, enqueue_email
+from tools.email_report import run_email_report_tool
+
+
+class Recorder:
+    """aiosmtpd handler that keeps every message and the connection it came in on."""
+
+    def __init__(self):
+        self.messages = []  # (client port, recipients)
+        self.replies = []  # scripted replies for the next DATA commands; then 250
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.replies:
+            return self.replies.pop(0)
+        self.messages.append((session.peer[1], envelope.rcpt_tos))
+        return "250 OK"
+
+    @property
+    def connections(self) -> int:
+        return len({port for port, _ in self.messages})
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server(tmp_path, monkeypatch):
+    handler = Recorder()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    monkeypatch.setattr(email_delivery, "SMTP_HOST", controller.hostname)
+    monkeypatch.setattr(email_delivery, "SMTP_PORT", controller.port)
+    monkeypatch.setattr(email_delivery, "SMTP_SECURITY", "none")
+    monkeypatch.setattr(email_delivery, "SMTP_USER", "")
+    monkeypatch.setattr(email_delivery, "SMTP_FROM", "reports@example.com")
+    monkeypatch.setattr(email_delivery, "OUTBOX_PATH", str(tmp_path / "outbox.db"))
+    monkeypatch.setattr(email_delivery, "_outbox", None)
+    monkeypatch.setattr(email_delivery, "_pool", None)
+    yield handler
+    if email_delivery._pool is not None:
+        email_delivery._pool.close()
+    if email_delivery._outbox is not None:
+        email_delivery._outbox.close()
+    controller.stop()
+
+
+def messages(count: int) -> list:
+    return [build_message(f"user{i}@example.com", f"Report {i}", "Your report.") for i in range(count)]
+
+
+def outbox_rows() -> list:
+    return email_delivery._outbox_db().execute(
+        "SELECT status, attempts, next_attempt_at, last_error FROM outbox ORDER BY id").fetchall()
+
+
+def test_pool_reuses_one_connection_across_messages(smtp_server):
+    pool = SMTPPool(size=1)
+    for msg in messages(5):
+        pool.send(msg)
+    pool.close()
+    assert len(smtp_server.messages) == 5
+    assert smtp_server.connections == 1
+
+
+def test_send_batch_delivers_every_message(smtp_server):
+    pool = SMTPPool(size=3)
+    results = pool.send_batch(messages(20))
+    pool.close()
+    assert results == [None] * 20
+    assert sorted(rcpt for _, (rcpt,) in smtp_server.messages) == sorted(f"user{i}@example.com" for i in range(20))
+    assert smtp_server.connections <= 3
+
+
+def test_send_batch_reports_per_message_errors(smtp_server):
+    smtp_server.replies = ["550 5.1.1 Mailbox unavailable"]
+    pool = SMTPPool(size=1)
+    results = pool.send_batch(messages(3))
+    pool.close()
+    assert results[0] is not None and not email_delivery.is_transient(results[0])
+    assert results[1:] == [None, None]
+
+
+def test_pool_reconnects_when_idle_connection_was_reset(smtp_server):
+    pool = SMTPPool(size=1)
+    pool.send(messages(1)[0])
+    smtp, _ = pool._idle.get()
+
+    def reset():
+        raise ConnectionResetError("connection reset by peer")
+
+    smtp.noop = reset
+    pool._idle.put((smtp, 0.0))  # long idle, so the next checkout runs NOOP
+    pool.send(messages(1)[0])
+    pool.close()
+    assert len(smtp_server.messages) == 2
+    assert smtp_server.connections == 2
+
+
+def test_outbox_retries_transient_failure_with_backoff(smtp_server):
+    smtp_server.replies = ["451 4.3.0 Try again later"]
+    enqueue_email("user@example.com", "Report", "Your report.")
+
+    assert deliver_due(pool=SMTPPool(size=1)) == {"sent": 0, "retrying": 1, "failed": 0}
+    [(status, attempts, next_attempt_at, error)] = outbox_rows()
+    assert (status, attempts) == ("pending", 1)
+    assert "451" in error
+    delay = next_attempt_at - time.time()
+    assert 0.8 * email_delivery.BACKOFF_BASE_SECONDS - 1 <= delay <= 1.2 * email_delivery.BACKOFF_BASE_SECONDS
+
+    # Not due yet: nothing is sent
+    assert deliver_due(pool=SMTPPool(size=1)) == {"sent": 0, "retrying": 0, "failed": 0}
+
+    with email_delivery._outbox_db() as db:
+        db.execute("UPDATE outbox SET next_attempt_at = 0")
+    assert deliver_due(pool=SMTPPool(size=1)) == {"sent": 1, "retrying": 0, "failed": 0}
+    assert outbox_rows()[0][:2] == ("sent", 2)
+    assert smtp_server.messages == [(smtp_server.messages[0][0], ["user@example.com"])]
+
+
+def test_outbox_gives_up_after_max_attempts(smtp_server, monkeypatch):
+    monkeypatch.setattr(email_delivery, "MAX_ATTEMPTS", 2)
+    smtp_server.replies = ["451 4.3.0 Try again later"] * 2
+    enqueue_email("user@example.com", "Report", "Your report.")
+
+    assert deliver_due(pool=SMTPPool(size=1))["retrying"] == 1
+    with email_delivery._outbox_db() as db:
+        db.execute("UPDATE outbox SET next_attempt_at = 0")
+    assert deliver_due(pool=SMTPPool(size=1))["failed"] == 1
+    assert outbox_rows()[0][:2] == ("failed", 2)
+    assert smtp_server.messages == []
+
+
+def test_report_tool_queues_when_server_is_unavailable(smtp_server, monkeypatch, tmp_path):
+    attachment = tmp_path / "report.pdf"
+    attachment.write_bytes(b"%PDF-1.4 test")
+    port = email_delivery.SMTP_PORT
+    monkeypatch.setattr(email_delivery, "SMTP_PORT", free_port())  # nothing listening
+
+    assert run_email_report_tool("user@example.com", "Report", "Body", str(attachment)).startswith("⏳")
+    assert outbox_rows()[0][:2] == ("pending", 1)
+
+    monkeypatch.setattr(email_delivery, "SMTP_PORT", port)
+    with email_delivery._outbox_db() as db:
+        db.execute("UPDATE outbox SET next_attempt_at = 0")
+    assert deliver_due(pool=SMTPPool(size=1))["sent"] == 1
+    assert smtp_server.messages[0][1] == ["user@example.com"]
@@ -0,0 +1,63 @@
+# tests/test_expense_anomalies.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from tools import ledger
+from tools.expense_anomalies import new_anomaly_state, score_anomalies, update_anomalies
+from tools.expense_classifier import classify_expense
+
+MERCHANTS = ["SWIGGY ORDER", "AMAZON PAY", "UBER TRIP", "BIGBASKET GROCERY", "HOUSE RENT", "STARBUCKS COFFEE"]
+
+
+def statement(rows: int = 400) -> pd.DataFrame:
+    """Dated statement with recurring merchants and about 2% large outliers."""
+    rng = np.random.default_rng(3)
+    dates = pd.date_range("2024-01-01", periods=rows, freq="D").strftime("%Y-%m-%d")
+    amounts = rng.lognormal(6, 0.6, rows) * np.where(rng.random(rows) < 0.02, 20, 1)
+    return pd.DataFrame({
+        "Date": dates,
+        "Description": [f"{MERCHANTS[i]} {n % 37}" for n, i in enumerate(rng.integers(len(MERCHANTS), size=rows))],
+        "Amount": amounts.round(2),
+    })
+
+
+def categorized(df: pd.DataFrame) -> pd.DataFrame:
+    return df.assign(Category=df["Description"].map(classify_expense))
+
+
+@pytest.mark.parametrize("batches", [[300, 100], [100, 100, 100, 100], [50, 350]])
+def test_incremental_scores_equal_full_scoring(batches):
+    df = categorized(statement(sum(batches)))
+    full = score_anomalies(df)
+
+    state, parts, start = new_anomaly_state(), [], 0
+    for size in batches:
+        scored, state = update_anomalies(state, df.iloc[start:start + size])
+        parts.append(scored)
+        start += size
+    incremental = pd.concat(parts)
+
+    assert full["Unusual"].any()
+    for column in ("CategoryZ", "MerchantZ", "Unusual"):
+        assert incremental[column].tolist() == full[column].tolist(), column
+
+
+def test_ledger_upload_is_scored_against_stored_history(tmp_path, monkeypatch):
+    monkeypatch.setattr(ledger, "LEDGER_PATH", str(tmp_path / "ledger.db"))
+    monkeypatch.setattr(ledger, "_conn", None)
+    monkeypatch.setattr(ledger, "classify_expenses", lambda descriptions: descriptions.map(classify_expense))
+    df = statement(400)
+    full = score_anomalies(categorized(df))
+
+    ledger.ingest_statement(df.iloc[:300])
+    second, new_rows = ledger.ingest_statement(df.iloc[300:])
+    assert new_rows == 100
+    assert second["CategoryZ"].tolist() == full["CategoryZ"].iloc[300:].tolist()
+    assert second["Unusual"].tolist() == full["Unusual"].iloc[300:].tolist()
+
+    # A re-upload stores nothing new and reports the scores from the first upload
+    again, new_rows = ledger.ingest_statement(df.iloc[300:])
+    assert new_rows == 0
+    assert again["Unusual"].tolist() == second["Unusual"].tolist()
+    ledger._conn.close()
@@ -0,0 +1,35 @@
+# tests/test_form16_parser.py
+
+import pytest
+from benchmarks.bench_suite import form16_pdf
+from tools import form16_parser
+from tools.form16_parser import match_fields, parse_form16
+
+
+def test_bench_fixture_fields():
+    form16_parser._cache.clear()
+    assert parse_form16(form16_pdf()) == {
+        "salary": 1500000, "basic_salary": 750000, "hra_received": 240000, "rent": 300000,
+        "deductions_80c": 120000, "deductions_80d": 25000, "nps_employer": 50000,
+    }
+
+
+@pytest.mark.parametrize("line, field, amount", [
+    ("Total rent paid 300000.00", "rent", 300000),
+    ("Deduction under section 80C 1,50,000.00", "deductions_80c", 150000),
+    ("(b) Deduction in respect of Section 80D 25000", "deductions_80d", 25000),
+    ("1. Gross Salary 900000", "salary", 900000),
+    ("(a) House rent allowance u/s 10(13A) 240000", "hra_received", 240000),
+    ("Employer contribution under section 80CCD(2) 50000", "nps_employer", 50000),
+])
+def test_label_anywhere_on_the_line(line, field, amount):
+    assert match_fields(line) == {field: amount}
+
+
+def test_labels_inside_words_are_ignored():
+    assert match_fields("Current year tax 5000\nParent company code 80") == {}
+
+
+def test_non_pdf_upload_raises_value_error():
+    with pytest.raises(ValueError):
+        parse_form16(b"Date,Description,Amount\n2025-01-01,RENT,15000\n")
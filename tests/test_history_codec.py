@@ -0,0 +1,47 @@
+# tests/test_history_codec.py
+
+import base64
+import numpy as np
+import pandas as pd
+import pytest
+from tools.history_codec import compact_history, history_matrix, history_records
+
+
+def sample_history() -> dict:
+    dates = pd.date_range("2025-01-01", periods=10, freq="D")
+    return history_matrix({
+        "TCS.NS": pd.Series(np.arange(10, dtype=float) + 100, index=dates),
+        "INFY.NS": pd.Series(np.arange(5, dtype=float) + 50, index=dates[5:]),
+    })
+
+
+def test_base64_round_trip():
+    history = sample_history()
+    payload = compact_history(history)
+    values = np.frombuffer(base64.b64decode(payload["values"]), dtype="<f4").reshape(payload["shape"])
+    np.testing.assert_array_equal(values, history["prices"])
+
+
+def test_columnar_uses_nulls_for_missing_days():
+    payload = compact_history(sample_history(), encoding="columnar")
+    assert payload["encoding"] == "columnar"
+    assert payload["values"][1][:5] == [None] * 5
+
+
+def test_unknown_encoding_is_rejected():
+    with pytest.raises(ValueError, match="bogus"):
+        compact_history(sample_history(), encoding="bogus")
+
+
+def test_history_records_are_capped_to_shared_dates():
+    dates = pd.date_range("2025-01-01", periods=200, freq="D")
+    summary = pd.DataFrame({"Symbol": ["TCS.NS", "INFY.NS"]})
+    summary.attrs["history"] = history_matrix({
+        "TCS.NS": pd.Series(np.sin(np.arange(200) / 9) + 5, index=dates),
+        "INFY.NS": pd.Series(np.cos(np.arange(200) / 7) + 5, index=dates),
+    })
+    tcs, infy = history_records(summary, points=40)
+    assert len(tcs["History"]) == len(infy["History"]) == 40
+    assert tcs["HistoryDates"] == infy["HistoryDates"]
+    assert tcs["HistoryDates"][0] == "2025-01-01" and tcs["HistoryDates"][-1] == dates[-1].strftime("%Y-%m-%d")
+    assert len(history_records(summary, points=None)[0]["History"]) == 200
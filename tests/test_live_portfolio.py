@@ -0,0 +1,29 @@
+# tests/test_live_portfolio.py
+
+import pytest
+from fastapi.testclient import TestClient
+import main
+from tools.live_portfolio import QuoteHub
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "quote_hub", lambda: QuoteHub(interval=60, fetch=lambda symbols: {s: 120.0 for s in symbols}))
+    return TestClient(main.app)
+
+
+@pytest.mark.parametrize("stock", [
+    {"symbol": "TCS.NS", "quantity": "ten", "buy_price": 100},
+    {"symbol": "TCS.NS", "quantity": 10, "buy_price": None},
+    {"symbol": "TCS.NS", "quantity": [10], "buy_price": 100},
+    {"symbol": "TCS.NS", "quantity": 10},
+])
+def test_invalid_holding_gets_an_error_and_the_socket_stays_open(client, stock):
+    with client.websocket_connect("/ws/portfolio") as ws:
+        ws.send_json({"action": "subscribe", "stocks": [stock]})
+        assert ws.receive_json()["type"] == "error"
+
+        ws.send_json({"action": "subscribe", "stocks": [{"symbol": "TCS.NS", "quantity": "10", "buy_price": "100"}]})
+        snapshot = ws.receive_json()
+        assert snapshot["type"] == "snapshot"
+        assert snapshot["totals"] == {"Invested ₹": 1000.0, "Now ₹": 1200.0, "Profit/Loss ₹": 200.0, "Return %": 20.0}
@@ -0,0 +1,43 @@
+# tests/test_market_data.py
+
+import time
+from benchmarks.standins import FakeProvider, Market
+from tools.market_data import MarketData, NSEProvider
+
+
+def providers(primary_latency: float, fail_rate: float = 0.0):
+    market = Market()
+    primary = FakeProvider("yahoo", market, latency=primary_latency, fail_rate=fail_rate)
+    fallback = FakeProvider("nse", market, latency=0.01, suffixes=(".NS",))
+    return primary, fallback
+
+
+def test_slow_nse_listing_is_hedged():
+    primary, fallback = providers(0.5)
+    data = MarketData([primary, fallback], deadline=2, hedge_delay=0.05)
+    start = time.perf_counter()
+    assert data.quote("TCS.NS") > 0
+    assert time.perf_counter() - start < 0.3
+    assert fallback.calls == 1
+
+
+def test_bse_listing_is_not_hedged_to_nse():
+    primary, fallback = providers(0.2)
+    data = MarketData([primary, fallback], deadline=2, hedge_delay=0.05, hedge_suffixes=(".NS", ".BO"))
+    assert data.quote("500325.BO") > 0
+    assert fallback.calls == 0
+    assert primary.calls == 1
+
+
+def test_failed_primary_falls_back_only_when_supported():
+    primary, fallback = providers(0.01, fail_rate=1.0)
+    data = MarketData([primary, fallback], deadline=1, hedge_delay=0.05)
+    assert data.quote("INFY.NS") > 0
+    assert data.quote("500209.BO") == 0
+    assert fallback.calls == 1
+
+
+def test_nse_provider_supports_nse_symbols_only():
+    nse = NSEProvider()
+    assert nse.supports("TCS.NS") and nse.supports("TCS")
+    assert not nse.supports("500325.BO") and not nse.supports("AAPL.L")
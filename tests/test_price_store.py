@@ -0,0 +1,67 @@
+# tests/test_price_store.py
+
+import pandas as pd
+import pytest
+from tools import price_store
+from tools.portfolio import fetch_close_frame
+from tools.price_store import get_closes, get_closes_many
+
+
+def closes_since(symbol: str, start: str) -> pd.Series:
+    dates = pd.bdate_range(start, "2024-06-28")
+    base = 100 + 10 * (sum(map(ord, symbol)) % 7)
+    return pd.Series(base + dates.dayofyear.to_numpy(dtype=float), index=dates.strftime("%Y-%m-%d"))
+
+
+@pytest.fixture
+def downloads(tmp_path, monkeypatch):
+    """Scripted downloads; records every batched and single-symbol request."""
+    monkeypatch.setattr(price_store, "PRICE_STORE_PATH", str(tmp_path / "prices.db"))
+    monkeypatch.setattr(price_store, "_db", None)
+    calls = []
+
+    def download_many(symbols, start):
+        calls.append(("many", list(symbols), start))
+        return {symbol: closes_since(symbol, start) for symbol in symbols if symbol != "GONE.NS"}
+
+    def download(symbol, start):
+        calls.append(("one", [symbol], start))
+        return closes_since(symbol, start)
+
+    monkeypatch.setattr(price_store, "_download_many", download_many)
+    monkeypatch.setattr(price_store, "_download", download)
+    yield calls
+    if price_store._db is not None:
+        price_store._db.close()
+
+
+def test_missing_and_stale_symbols_are_fetched_in_one_batch(downloads, monkeypatch):
+    symbols = [f"S{i}.NS" for i in range(50)]
+    first = get_closes_many(symbols, start="2024-01-01")
+    assert downloads == [("many", symbols, "2024-01-01")]
+    assert all(len(first[s]) == 130 for s in symbols)
+
+    get_closes_many(symbols, start="2024-01-01")
+    assert len(downloads) == 1  # still fresh: served from the store
+
+    monkeypatch.setattr(price_store, "PRICE_REFRESH_SECONDS", 0)
+    again = get_closes_many(symbols + ["NEW.NS"], start="2024-01-01")
+    # Stale symbols only fetch from their last stored bar; the new one from the start
+    assert sorted((kind, len(batch), start) for kind, batch, start in downloads[1:]) == [
+        ("many", 1, "2024-01-01"), ("many", 50, "2024-06-28")]
+    assert all(again[s].equals(first[s]) for s in symbols)
+
+
+def test_matches_get_closes(downloads):
+    many = get_closes_many(["TCS.NS", "INFY.NS", "GONE.NS"], start="2024-03-01")
+    assert many["TCS.NS"].equals(get_closes("TCS.NS", start="2024-03-01"))
+    assert many["GONE.NS"].empty
+    assert [kind for kind, _, _ in downloads] == ["many"]  # get_closes found TCS fresh
+
+
+def test_close_frame_is_served_from_the_store(downloads):
+    frame = fetch_close_frame(["TCS.NS", "^NSEI"], "2024-01-01")
+    assert list(frame.columns) == ["TCS.NS", "^NSEI"]
+    assert frame.shape == (130, 2)
+    fetch_close_frame(["TCS.NS", "^NSEI"], "2024-01-01")
+    assert len(downloads) == 1
@@ -0,0 +1,97 @@
+# tests/test_risk_precompute.py
+
+from datetime import datetime
+import pytest
+from tools import risk_precompute
+from tools.risk_precompute import MARKET_TZ, next_run, portfolio_risk_report
+
+
+def assessment(symbol: str, action: str = "hold") -> dict:
+    return {"symbol": symbol, "company_name": symbol, "risks": [], "action": action,
+            "prediction": "neutral", "probability": 60, "summary": "", "gpt_suggestion": ""}
+
+
+@pytest.fixture
+def llm(tmp_path, monkeypatch):
+    """Scripted analyze_portfolio_risk results; records the symbols each call asked for."""
+    monkeypatch.setattr(risk_precompute, "RISK_STORE_PATH", str(tmp_path / "news_risk.db"))
+    monkeypatch.setattr(risk_precompute, "_db", None)
+    calls, replies = [], []
+
+    def analyze(symbols):
+        calls.append(list(symbols))
+        return replies.pop(0)
+
+    monkeypatch.setattr(risk_precompute, "analyze_portfolio_risk", analyze)
+    yield calls, replies
+    if risk_precompute._db is not None:
+        risk_precompute._db.close()
+
+
+def test_entries_are_keyed_by_the_requested_symbol(llm):
+    calls, replies = llm
+    replies.append([assessment("tcs"), assessment("INFY", "buy")])
+
+    report = portfolio_risk_report(["TCS.NS", "INFY.NS"])
+    assert [(e["symbol"], e["action"]) for e in report] == [("TCS.NS", "hold"), ("INFY.NS", "buy")]
+    assert all("as_of" in e for e in report)
+
+    # Stored under the requested symbols, so the next request is served from the store
+    assert [e["symbol"] for e in portfolio_risk_report(["INFY.NS", "TCS.NS"])] == ["INFY.NS", "TCS.NS"]
+    assert len(calls) == 1
+
+
+def test_unmatched_entries_fall_back_to_position(llm):
+    _, replies = llm
+    replies.append([assessment("Tata Consultancy"), assessment("INFY.NS")])
+    report = portfolio_risk_report(["TCS.NS", "INFY.NS"])
+    assert [e["symbol"] for e in report] == ["TCS.NS", "INFY.NS"]
+    assert report[0]["company_name"] == "Tata Consultancy"
+
+
+def test_missing_symbols_are_reported_unavailable(llm):
+    calls, replies = llm
+    replies.append([assessment("TCS.NS")])
+    report = portfolio_risk_report(["TCS.NS", "INFY.NS"])
+    assert [(e["symbol"], e["action"]) for e in report] == [("TCS.NS", "hold"), ("INFY.NS", "unavailable")]
+
+    # Unavailable entries are not stored: the next request asks again
+    replies.append([assessment("INFY.NS")])
+    assert portfolio_risk_report(["INFY.NS"])[0]["action"] == "hold"
+    assert calls[-1] == ["INFY.NS"]
+
+
+@pytest.mark.parametrize("reply, action", [
+    (assessment("TCS.NS"), "hold"),  # one object instead of a list
+    ({"TCS": {"action": "sell"}}, "sell"),  # an object keyed by symbol
+    ({}, "unavailable"),
+    ("not json", "unavailable"),
+    ([["TCS.NS"]], "unavailable"),
+])
+def test_non_list_results_do_not_raise(llm, reply, action):
+    _, replies = llm
+    replies.append(reply)
+    assert [(e["symbol"], e["action"]) for e in portfolio_risk_report(["TCS.NS"])] == [("TCS.NS", action)]
+
+
+def test_error_shape_is_passed_through(llm):
+    _, replies = llm
+    error = [{**assessment(None, "error"), "summary": "Error parsing GPT response"}]
+    replies.append(error)
+    assert portfolio_risk_report(["TCS.NS"]) == error
+
+
+def at(text: str) -> datetime:
+    return datetime.fromisoformat(text).replace(tzinfo=MARKET_TZ)
+
+
+def test_scheduler_skips_weekends_and_holidays(monkeypatch):
+    monkeypatch.setattr(risk_precompute, "NSE_HOLIDAYS", {"2026-10-20"})
+    friday, saturday = at("2026-10-16 16:00"), at("2026-10-17 10:00")
+    assert next_run(friday, at("2026-10-16 15:00")) == at("2026-10-19 08:45")
+    assert next_run(saturday) == at("2026-10-19 08:45")  # no start-up run on a weekend
+    assert next_run(at("2026-10-19 16:00"), at("2026-10-19 15:30")) == at("2026-10-21 08:45")
+    assert next_run(at("2026-10-20 09:00")) == at("2026-10-21 08:45")
+    # A trading day still starts right away and refreshes within the session
+    assert next_run(at("2026-10-19 10:00")) == at("2026-10-19 10:00")
+    assert next_run(at("2026-10-19 10:00"), at("2026-10-19 09:30")) == at("2026-10-19 10:30")
@@ -0,0 +1,42 @@
+# tests/test_stress_test.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from tools.stress_test import stress_test, var_cvar
+
+HOLDINGS = [{"symbol": "TCS.NS", "quantity": 10, "buy_price": 3000}]
+
+
+def prices(days: int = 600) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range(end="2026-10-16", periods=days)
+    return pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (days, 2)), axis=0)),
+                        index=dates, columns=["TCS.NS", "^NSEI"])
+
+
+def test_empty_prices_and_holdings_return_an_error():
+    assert "error" in stress_test(HOLDINGS, prices=pd.DataFrame(columns=["TCS.NS", "^NSEI"]))
+    assert "error" in stress_test([], prices=prices())
+
+
+@pytest.mark.parametrize("n", [1, 3, 50, 1000])
+def test_cvar_is_never_below_var(n):
+    pnl = np.random.default_rng(n).normal(size=n)
+    var, cvar = var_cvar(pnl, [0.5, 0.95, 0.99, 0.999])
+    assert (cvar >= var).all()
+
+
+def test_multi_day_horizon():
+    result = stress_test(HOLDINGS, horizon_days=5, prices=prices())
+    assert result["horizon_days"] == 5 and result["var"][0]["var"] > 0
+
+
+@pytest.mark.parametrize("horizon", [0, -3, "5", 2.5, True, None])
+def test_endpoint_rejects_invalid_horizon(horizon):
+    import main
+
+    response = TestClient(main.app).post("/api/portfolio/stress", json={"stocks": HOLDINGS, "horizon_days": horizon})
+    assert response.status_code == 422
+    assert response.json()["success"] is False
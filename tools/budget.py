@@ -1,7 +1,3 @@
-from langchain.tools import tool
-import plotly.graph_objs as go
-
-@tool
 def run_budget_tool(income: float, rent: float, food: float, transport: float, entertainment: float, other: float) -> str:
     """Analyze monthly income and expenses to suggest budget optimization."""
     total_expenses = rent + food + transport + entertainment + other
@@ -18,8 +14,8 @@ def run_budget_tool(income: float, rent: float, food: float, transport: float, e
 💡 Advice: {advice}
 """
 
-def budget_projection(income: float, rent: float, food: float, transport: float, entertainment: float, other: float):
-    """Returns budget summary + pie chart for Streamlit UI."""
+def budget_result(income: float, rent: float, food: float, transport: float, entertainment: float, other: float) -> dict:
+    """Budget numbers and text summary, without building a chart."""
     total_expenses = rent + food + transport + entertainment + other
     savings = income - total_expenses
     savings_percent = (savings / income) * 100 if income > 0 else 0
@@ -34,7 +30,7 @@ def budget_projection(income: float, rent: float, food: float, transport: float,
 💡 {advice}
 """
 
-    result = {
+    return {
         "income": income,
         "total_expenses": total_expenses,
         "savings": savings,
@@ -43,6 +39,10 @@ def budget_projection(income: float, rent: float, food: float, transport: float,
         "summary": summary
     }
 
+def budget_figure(rent: float, food: float, transport: float, entertainment: float, other: float, savings: float):
+    """Expense pie chart for the UI. Plotly is only imported when a chart is requested."""
+    import plotly.graph_objs as go
+
     fig = go.Figure(
         data=[
             go.Pie(
@@ -57,5 +57,9 @@ def budget_projection(income: float, rent: float, food: float, transport: float,
         title="💸 Expense Breakdown",
         annotations=[{"text": "₹ Budget", "font": {"size": 20}, "showarrow": False}]
     )
+    return fig
 
-    return result, fig
+def budget_projection(income: float, rent: float, food: float, transport: float, entertainment: float, other: float):
+    """Returns budget summary + pie chart for Streamlit UI."""
+    result = budget_result(income, rent, food, transport, entertainment, other)
+    return result, budget_figure(rent, food, transport, entertainment, other, result["savings"])
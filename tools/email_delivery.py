@@ -0,0 +1,278 @@
+# tools/email_delivery.py
+
+import os
+import queue
+import random
+import smtplib
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from email.message import EmailMessage
+
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "465"))
+# "ssl" (implicit TLS, port 465), "starttls" (port 587) or "none" (local test servers)
+SMTP_SECURITY = os.getenv("SMTP_SECURITY", "ssl")
+SMTP_USER = os.getenv("SMTP_USER", "")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")  # Use a Gmail App Password
+SMTP_FROM = os.getenv("SMTP_FROM", SMTP_USER)
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "4"))
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+
+OUTBOX_PATH = os.getenv("OUTBOX_PATH", os.path.join("data", "outbox.db"))
+MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "6"))
+BACKOFF_BASE_SECONDS = 30
+
+# Connection-level problems and 4xx replies are worth retrying; 5xx are not.
+TRANSIENT_ERRORS = (
+    smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError,
+    ConnectionError, TimeoutError, socket.gaierror,
+)
+
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return isinstance(error, TRANSIENT_ERRORS)
+
+
+def build_message(to_email: str, subject: str, body: str, attachment_path: str = None) -> EmailMessage:
+    msg = EmailMessage()
+    msg["Subject"] = subject
+    msg["From"] = SMTP_FROM
+    msg["To"] = to_email
+    msg.set_content(body)
+    if attachment_path:
+        with open(attachment_path, "rb") as f:
+            msg.add_attachment(f.read(), maintype="application", subtype="pdf", filename="FinancialReport.pdf")
+    return msg
+
+
+def _connect() -> smtplib.SMTP:
+    if SMTP_SECURITY == "ssl":
+        smtp = smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+    else:
+        smtp = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+        if SMTP_SECURITY == "starttls":
+            smtp.starttls()
+    if SMTP_USER:
+        smtp.login(SMTP_USER, SMTP_PASSWORD)
+    return smtp
+
+
+class SMTPPool:
+    """
+    A fixed number of logged-in SMTP connections shared by all senders.
+    Connections are opened lazily, checked with NOOP when idle for a while,
+    and replaced when the server drops them.
+    """
+
+    IDLE_CHECK_SECONDS = 60
+
+    def __init__(self, size: int = SMTP_POOL_SIZE, connect=_connect):
+        self.size = size
+        self._connect = connect
+        self._idle = queue.LifoQueue()
+        for _ in range(size):
+            self._idle.put((None, 0.0))
+
+    @contextmanager
+    def connection(self):
+        smtp, last_used = self._idle.get()
+        try:
+            if smtp is not None and time.monotonic() - last_used > self.IDLE_CHECK_SECONDS:
+                try:
+                    smtp.noop()
+                except (smtplib.SMTPException, OSError):  # dropped, or the socket was reset
+                    self._close(smtp)
+                    smtp = None
+            if smtp is None:
+                smtp = self._connect()
+            yield smtp
+        except Exception as e:
+            if isinstance(e, TRANSIENT_ERRORS) and smtp is not None:
+                self._close(smtp)
+                smtp = None
+            raise
+        finally:
+            self._idle.put((smtp, time.monotonic()))
+
+    def send(self, msg: EmailMessage):
+        with self.connection() as smtp:
+            smtp.send_message(msg)
+
+    def send_batch(self, messages: list) -> list:
+        """
+        Send messages over up to `size` connections in parallel, each
+        connection carrying a run of messages. Returns one exception (or None)
+        per message, in order.
+        """
+        results = [None] * len(messages)
+
+        def worker(indices):
+            with self.connection() as smtp:
+                for i in indices:
+                    try:
+                        smtp.send_message(messages[i])
+                    except smtplib.SMTPServerDisconnected:
+                        raise  # connection is gone; abandon the rest of this run
+                    except Exception as e:
+                        results[i] = e
+
+        runs = [list(range(start, len(messages), self.size)) for start in range(min(self.size, len(messages)))]
+        with ThreadPoolExecutor(max_workers=max(len(runs), 1)) as pool:
+            futures = [pool.submit(worker, run) for run in runs]
+        for run, future in zip(runs, futures):
+            error = future.exception()
+            if error is not None:
+                for i in run:
+                    if results[i] is None:
+                        results[i] = error
+        return results
+
+    def close(self):
+        for _ in range(self.size):
+            smtp, _ = self._idle.get()
+            if smtp is not None:
+                self._close(smtp)
+            self._idle.put((None, 0.0))
+
+    @staticmethod
+    def _close(smtp):
+        try:
+            smtp.quit()
+        except Exception:
+            pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> SMTPPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SMTPPool()
+        return _pool
+
+
+# ---------------------------------------------------------------------------
+# Durable outbox: messages that could not be sent right away are retried
+# with exponential backoff until MAX_ATTEMPTS.
+# ---------------------------------------------------------------------------
+
+_outbox_lock = threading.Lock()
+_outbox = None
+
+
+def _outbox_db():
+    global _outbox
+    if _outbox is None:
+        os.makedirs(os.path.dirname(OUTBOX_PATH) or ".", exist_ok=True)
+        _outbox = sqlite3.connect(OUTBOX_PATH, check_same_thread=False)
+        _outbox.executescript("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id              INTEGER PRIMARY KEY AUTOINCREMENT,
+                to_email        TEXT NOT NULL,
+                subject         TEXT NOT NULL,
+                body            TEXT NOT NULL,
+                attachment_path TEXT,
+                status          TEXT NOT NULL DEFAULT 'pending',
+                attempts        INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                last_error      TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at);
+        """)
+    return _outbox
+
+
+def enqueue_email(to_email: str, subject: str, body: str, attachment_path: str = None, attempts: int = 0, error: str = None) -> int:
+    """Store a message in the outbox; it is sent by the next deliver_due() pass."""
+    delay = _backoff(attempts) if attempts else 0
+    with _outbox_lock:
+        db = _outbox_db()
+        with db:
+            cursor = db.execute(
+                "INSERT INTO outbox (to_email, subject, body, attachment_path, attempts, next_attempt_at, last_error)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (to_email, subject, body, attachment_path, attempts, time.time() + delay, error),
+            )
+    return cursor.lastrowid
+
+
+def _backoff(attempts: int) -> float:
+    return BACKOFF_BASE_SECONDS * 2 ** (attempts - 1) * random.uniform(0.8, 1.2)
+
+
+def deliver_due(limit: int = 500, pool: SMTPPool = None) -> dict:
+    """Send every due outbox message in one batch over the pool. Returns counts."""
+    pool = pool or get_pool()
+    with _outbox_lock:
+        rows = _outbox_db().execute(
+            "SELECT id, to_email, subject, body, attachment_path, attempts FROM outbox"
+            " WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY next_attempt_at LIMIT ?",
+            (time.time(), limit),
+        ).fetchall()
+    if not rows:
+        return {"sent": 0, "retrying": 0, "failed": 0}
+
+    messages, errors = [], {}
+    for row in rows:
+        try:
+            messages.append(build_message(row[1], row[2], row[3], row[4]))
+        except OSError as e:  # attachment gone
+            messages.append(None)
+            errors[row[0]] = e
+    sendable = [m for m in messages if m is not None]
+    results = iter(pool.send_batch(sendable))
+
+    counts = {"sent": 0, "retrying": 0, "failed": 0}
+    updates = []
+    for row, msg in zip(rows, messages):
+        error = errors.get(row[0]) if msg is None else next(results)
+        attempts = row[5] + 1
+        if error is None:
+            updates.append(("sent", attempts, 0, None, row[0]))
+            counts["sent"] += 1
+        elif msg is not None and is_transient(error) and attempts < MAX_ATTEMPTS:
+            updates.append(("pending", attempts, time.time() + _backoff(attempts), str(error), row[0]))
+            counts["retrying"] += 1
+        else:
+            updates.append(("failed", attempts, 0, str(error), row[0]))
+            counts["failed"] += 1
+    with _outbox_lock:
+        db = _outbox_db()
+        with db:
+            db.executemany(
+                "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                updates,
+            )
+    return counts
+
+
+_worker = None
+
+
+def start_outbox_worker(interval: float = 15):
+    """Background thread that drains the outbox every `interval` seconds."""
+    global _worker
+
+    def loop():
+        while True:
+            try:
+                deliver_due()
+            except Exception as e:
+                print("[outbox] delivery pass failed:", e)
+            time.sleep(interval)
+
+    if _worker is None:
+        _worker = threading.Thread(target=loop, name="email-outbox", daemon=True)
+        _worker.start()
+    return _worker
@@ -1,34 +1,25 @@
 # tools/email_report.py
 
-from langchain.tools import tool
-import smtplib
-from email.message import EmailMessage
+from tools.email_delivery import build_message, enqueue_email, get_pool, is_transient
+from tools.metrics import timed
 
+@timed("email.send")
 def send_email_report(to_email: str, subject: str, body: str, attachment_path: str):
     """
-    Send an email with a PDF attachment.
+    Send an email with a PDF attachment over a pooled SMTP connection.
+    SMTP host and credentials come from the SMTP_* environment variables.
     """
-    EMAIL = "your_email@gmail.com"
-    PASSWORD = "your_app_password"  # Use Gmail App Password
+    msg = build_message(to_email, subject, body, attachment_path)
+    get_pool().send(msg)
 
-    msg = EmailMessage()
-    msg["Subject"] = subject
-    msg["From"] = EMAIL
-    msg["To"] = to_email
-    msg.set_content(body)
-
-    with open(attachment_path, "rb") as f:
-        msg.add_attachment(f.read(), maintype="application", subtype="pdf", filename="FinancialReport.pdf")
-
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-        smtp.login(EMAIL, PASSWORD)
-        smtp.send_message(msg)
-
-@tool
 def run_email_report_tool(to_email: str, subject: str, body: str, attachment_path: str) -> str:
     """Send a financial report PDF to the specified email address."""
     try:
         send_email_report(to_email, subject, body, attachment_path)
         return f"✅ Email sent to {to_email}."
     except Exception as e:
+        if is_transient(e):
+            # Hand it to the outbox; start_outbox_worker() retries with backoff
+            enqueue_email(to_email, subject, body, attachment_path, attempts=1, error=str(e))
+            return f"⏳ Mail server unavailable, email to {to_email} queued for retry."
         return f"❌ Failed to send email: {e}"
@@ -0,0 +1,163 @@
+# tools/expense_anomalies.py
+
+import re
+import warnings
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from tools.metrics import timed
+
+# Iglewicz & Hoaglin: a modified z-score above 3.5 is a likely outlier.
+Z_THRESHOLD = 3.5
+# Number of most recent transactions per group kept for rolling statistics.
+DEFAULT_WINDOW = 50
+# A merchant needs this many past rows before its own baseline is trusted.
+MIN_MERCHANT_HISTORY = 3
+
+_NOISE = re.compile(r"[^a-z ]+")
+
+
+def normalize_merchant(description) -> str:
+    """
+    Reduce a raw statement description to a stable merchant key
+    (lowercase, digits/punctuation removed, first three words).
+    """
+    words = _NOISE.sub(" ", str(description).lower()).split()
+    return " ".join(words[:3])
+
+
+def _modified_z(values, median, mad):
+    """Vectorized robust z-score; groups with zero MAD score as 0."""
+    values = np.asarray(values, dtype=float)
+    median = np.asarray(median, dtype=float)
+    mad = np.asarray(mad, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = 0.6745 * (values - median) / mad
+    return np.where(np.isfinite(z), z, 0.0)
+
+
+def _window_stats(prior: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Median and MAD of each row's trailing `window` values of `prior` (NaN
+    where there are none yet). The MAD is taken around that same window's
+    median, so it depends only on those `window` values.
+    """
+    padded = np.concatenate([np.full(window - 1, np.nan), prior])
+    windows = sliding_window_view(padded, window)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN windows: first row of a group
+        median = np.nanmedian(windows, axis=1)
+        mad = np.nanmedian(np.abs(windows - median[:, None]), axis=1)
+    return median, mad
+
+
+def _rolling_scores(df, key: str, window: int) -> pd.DataFrame:
+    """
+    Score every row against the preceding `window` rows of its own group.
+    One (rows x window) NumPy view per group, so there is no Python loop over
+    rows, and a group's last `window` amounts are all the history needed to
+    score its next row.
+    """
+    amount = df["Amount"].abs().to_numpy(dtype=float)
+    median = np.full(len(df), np.nan)
+    mad = np.full(len(df), np.nan)
+    history = np.zeros(len(df), dtype=int)
+    for rows in df.groupby(key, sort=False).indices.values():
+        # prior values only, so a row never contributes to its own baseline
+        prior = np.concatenate([[np.nan], amount[rows[:-1]]])
+        median[rows], mad[rows] = _window_stats(prior, window)
+        history[rows] = np.arange(len(rows))
+    return pd.DataFrame({
+        "median": median,
+        "mad": mad,
+        "history": history,
+        "z": _modified_z(amount, median, mad),
+    }, index=df.index)
+
+
+def _chronological(df) -> pd.DataFrame:
+    # Undated rows (including replayed history) count as the oldest.
+    if "Date" not in df:
+        return df
+    when = pd.to_datetime(df["Date"], errors="coerce")
+    return df.loc[when.sort_values(kind="stable", na_position="first").index]
+
+
+@timed("expenses.anomalies")
+def score_anomalies(df, window: int = DEFAULT_WINDOW) -> pd.DataFrame:
+    """
+    Add robust anomaly scores to a categorized statement.
+
+    Each row is compared against the rolling median/MAD of earlier transactions
+    in the same Category and from the same Merchant. A row is flagged when it is
+    an outlier for its category and, if the merchant has enough history, also for
+    that merchant (so a monthly rent payment is not flagged every month).
+    """
+    original_index = df.index
+    df = df.reset_index(drop=True)
+    if "Merchant" not in df:
+        df["Merchant"] = df["Description"].map(normalize_merchant)
+    df = _chronological(df)
+
+    cat = _rolling_scores(df, "Category", window)
+    merchant = _rolling_scores(df, "Merchant", window)
+    df["CategoryZ"] = cat["z"].round(2)
+    df["MerchantZ"] = merchant["z"].round(2)
+
+    cat_outlier = cat["z"] > Z_THRESHOLD
+    merchant_known = merchant["history"] >= MIN_MERCHANT_HISTORY
+    merchant_outlier = merchant["z"] > Z_THRESHOLD
+    df["Unusual"] = cat_outlier & (~merchant_known | merchant_outlier)
+    df = df.sort_index()
+    df.index = original_index
+    return df
+
+
+def new_anomaly_state(window: int = DEFAULT_WINDOW) -> dict:
+    """Empty incremental state: the last `window` amounts per category and merchant."""
+    return {"window": window, "tails": {"Category": {}, "Merchant": {}}}
+
+
+def update_anomalies(state: dict, new_rows) -> tuple[pd.DataFrame, dict]:
+    """
+    Score a new batch (e.g. one month) against the retained history in `state`.
+
+    Only the last `window` rows per affected group are replayed, so the cost
+    depends on the size of the batch, not on how many years have been seen.
+    Returns (scored new rows, updated state). The state is plain JSON-friendly
+    data and can be persisted between uploads (tools/ledger.py keeps it per
+    account). Scores equal those of score_anomalies over the full history as
+    long as each batch is newer than the rows before it.
+    """
+    window = state.get("window", DEFAULT_WINDOW)
+    new_rows = new_rows.copy()
+    if "Merchant" not in new_rows:
+        new_rows["Merchant"] = new_rows["Description"].map(normalize_merchant)
+
+    # Replay merchant tails under a placeholder category (and vice versa) so each
+    # history row only feeds the baseline of the group it was retained for.
+    history = []
+    for key, other in (("Category", "Merchant"), ("Merchant", "Category")):
+        tails = state["tails"][key]
+        for value in new_rows[key].unique():
+            amounts = tails.get(value, [])
+            if amounts:
+                history.append(pd.DataFrame({
+                    key: value,
+                    other: f"__history_{key}__",
+                    "Amount": amounts,
+                }))
+
+    replay = pd.concat(history, ignore_index=True) if history else new_rows.iloc[:0][["Category", "Merchant", "Amount"]]
+    combined = pd.concat([replay, new_rows.reset_index(drop=True)], ignore_index=True)
+    is_new = np.arange(len(combined)) >= len(replay)
+
+    scored = score_anomalies(combined, window).iloc[is_new]
+    scored.index = new_rows.index
+
+    ordered = _chronological(new_rows)
+    for key in ("Category", "Merchant"):
+        tails = state["tails"][key]
+        for value, amounts in ordered.groupby(key, sort=False)["Amount"]:
+            tails[value] = (tails.get(value, []) + amounts.abs().tolist())[-window:]
+    return scored, state
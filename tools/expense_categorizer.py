@@ -1,10 +1,11 @@
 import pandas as pd
-import pdfplumber
-from langchain.tools import tool
+from tools.expense_anomalies import score_anomalies
+from tools.expense_classifier import CATEGORIES, classify_expense, classify_expenses
 
-CATEGORIES = ["Rent", "Groceries", "Food", "Shopping", "Travel", "Other"]
 
 def extract_transactions_from_pdf(pdf_file):
+    import pdfplumber  # only needed for PDF statements
+
     transactions = []
     with pdfplumber.open(pdf_file) as pdf:
         for page in pdf.pages:
@@ -14,22 +15,8 @@ def extract_transactions_from_pdf(pdf_file):
                     transactions.append(row)
     return transactions
 
-def classify_expense(description, gpt_classifier=None):
-    # Placeholder: Use GPT or simple rules for demo
-    desc = description.lower()
-    if "rent" in desc:
-        return "Rent"
-    if any(word in desc for word in ["grocery", "supermarket"]):
-        return "Groceries"
-    if any(word in desc for word in ["restaurant", "food", "cafe", "pizza", "coffee"]):
-        return "Food"
-    if any(word in desc for word in ["amazon", "flipkart", "shopping", "mall"]):
-        return "Shopping"
-    if any(word in desc for word in ["uber", "flight", "air", "train", "hotel", "travel"]):
-        return "Travel"
-    return "Other"
-
-def process_statement(file, filetype="csv"):
+def read_statement(file, filetype="csv"):
+    """Load a statement into a cleaned Date/Description/Amount frame (no categories)."""
     if filetype == "csv":
         df = pd.read_csv(file)
     else:
@@ -38,19 +25,27 @@ def process_statement(file, filetype="csv"):
         df = pd.DataFrame(transactions, columns=["Date", "Description", "Amount"])
     # Clean and classify
     df["Amount"] = pd.to_numeric(df["Amount"], errors="coerce")
-    df = df.dropna(subset=["Amount"])
-    df["Category"] = df["Description"].apply(classify_expense)
+    return df.dropna(subset=["Amount"])
+
+def process_statement(file, filetype="csv"):
+    df = read_statement(file, filetype)
+    df["Category"] = classify_expenses(df["Description"]).values
     return df
 
 def expense_summary(df):
     summary = df.groupby("Category")["Amount"].sum().reindex(CATEGORIES, fill_value=0)
-    unusual = df[df["Amount"].abs() > df["Amount"].abs().mean() + 2*df["Amount"].abs().std()]
+    # Ledger uploads arrive already scored against the account's history
+    scored = df if "Unusual" in df else score_anomalies(df)
+    unusual = scored[scored["Unusual"]]
     return summary, unusual
 
-@tool
 def run_expense_categorizer(file_path: str, filetype: str = "csv") -> str:
     """Categorize expenses from a bank statement file (csv or pdf) and return a summary."""
     df = process_statement(file_path, filetype)
+    return format_expense_report(df)
+
+def format_expense_report(df) -> str:
+    """Markdown breakdown + unusual expenses for a categorized statement."""
     summary, unusual = expense_summary(df)
     result = "### 🧾 Expense Breakdown\n"
     for cat, amt in summary.items():
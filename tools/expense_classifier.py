@@ -0,0 +1,167 @@
+# tools/expense_classifier.py
+
+import json
+import os
+import threading
+import pandas as pd
+from tools.expense_anomalies import normalize_merchant
+from tools.llm_usage import tagged
+from tools.metrics import timed
+
+CATEGORIES = ["Rent", "Groceries", "Food", "Shopping", "Travel", "Other"]
+
+MERCHANT_CACHE_PATH = os.getenv("MERCHANT_CACHE_PATH", os.path.join("data", "merchant_cache.json"))
+# Minimum model probability to accept a local prediction without asking the LLM.
+MODEL_CONFIDENCE = 0.6
+
+KEYWORDS = {
+    "Rent": ["rent"],
+    "Groceries": ["grocery", "supermarket"],
+    "Food": ["restaurant", "food", "cafe", "pizza", "coffee"],
+    "Shopping": ["amazon", "flipkart", "shopping", "mall"],
+    "Travel": ["uber", "flight", "air", "train", "hotel", "travel"],
+}
+
+# Seed phrases so the local model has something to learn from on a cold cache.
+SEED_EXAMPLES = {
+    "Rent": ["house rent", "rent payment landlord", "monthly rent transfer", "pg rent"],
+    "Groceries": ["big bazaar", "dmart", "grocery store", "supermarket", "reliance fresh", "more retail"],
+    "Food": ["swiggy", "zomato", "dominos pizza", "starbucks coffee", "restaurant bill", "cafe coffee day"],
+    "Shopping": ["amazon", "flipkart", "myntra", "ajio", "shopping mall", "nykaa"],
+    "Travel": ["uber trip", "ola cabs", "indigo flight", "irctc train", "makemytrip hotel", "rapido"],
+    "Other": ["atm withdrawal", "electricity bill", "mobile recharge", "insurance premium", "bank charges"],
+}
+
+_lock = threading.Lock()
+_cache = None
+_model = None
+_model_size = -1
+
+
+def classify_expense(description):
+    """Keyword rules; returns "Other" when nothing matches."""
+    desc = description.lower()
+    for category, words in KEYWORDS.items():
+        if any(word in desc for word in words):
+            return category
+    return "Other"
+
+
+def load_merchant_cache() -> dict:
+    """Normalized merchant name -> category, loaded once from MERCHANT_CACHE_PATH."""
+    global _cache
+    if _cache is None:
+        try:
+            with open(MERCHANT_CACHE_PATH, encoding="utf-8") as f:
+                _cache = json.load(f)
+        except (OSError, ValueError):
+            _cache = {}
+    return _cache
+
+
+def save_merchant_cache(entries: dict):
+    """Merge `entries` into the cache and persist it atomically."""
+    cache = load_merchant_cache()
+    with _lock:
+        cache.update(entries)
+        os.makedirs(os.path.dirname(MERCHANT_CACHE_PATH) or ".", exist_ok=True)
+        tmp_path = MERCHANT_CACHE_PATH + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, MERCHANT_CACHE_PATH)
+
+
+def _local_model():
+    """TF-IDF + logistic regression over seed phrases and cached merchants.
+    Retrained only when the cache has grown since the last fit."""
+    global _model, _model_size
+    try:
+        # Imported on first use; scikit-learn is slow to import.
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import make_pipeline
+    except ImportError:
+        # The classifier still works without scikit-learn; rows the cache and
+        # keyword rules miss simply go straight to the LLM tier.
+        if _model is None:
+            print("⚠️  scikit-learn not installed – local expense model disabled.")
+            _model = False
+        return None
+    cache = load_merchant_cache()
+    if _model is None or len(cache) != _model_size:
+        texts, labels = [], []
+        for category, examples in SEED_EXAMPLES.items():
+            texts += examples
+            labels += [category] * len(examples)
+        texts += list(cache.keys())
+        labels += list(cache.values())
+        model = make_pipeline(
+            TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 4)),
+            LogisticRegression(C=10, max_iter=1000),
+        )
+        model.fit(texts, labels)
+        _model, _model_size = model, len(cache)
+    return _model
+
+
+@timed("llm.classify")
+def llm_classify_merchants(merchants: list[str]) -> dict:
+    """Classify many merchants with a single LLM call. Returns {merchant: category}."""
+    from agent import get_llm  # deferred: keeps LangChain out of import time
+
+    prompt = (
+        "Classify each bank statement merchant into exactly one of these categories: "
+        f"{', '.join(CATEGORIES)}.\n"
+        "Respond with only a JSON object mapping each merchant string to its category.\n\n"
+        "Merchants:\n" + "\n".join(f"- {m}" for m in merchants)
+    )
+    with tagged("expenses.classify"):
+        response = get_llm().invoke(prompt).content.strip()
+    if response.startswith("```"):
+        response = response.strip("`").removeprefix("json").strip()
+    answers = json.loads(response)
+    return {m: answers[m] for m in merchants if answers.get(m) in CATEGORIES}
+
+
+@timed("expenses.classify")
+def classify_expenses(descriptions, llm_classifier=llm_classify_merchants) -> pd.Series:
+    """
+    Tiered, batch classification of statement descriptions:
+    1. exact merchant cache, 2. keyword rules, 3. local text model scored on the
+    whole batch at once, 4. one deduplicated LLM prompt for the low-confidence
+    remainder. LLM answers are written back to the merchant cache so each
+    merchant is paid for at most once. Pass `llm_classifier=None` to stay offline.
+    """
+    descriptions = pd.Series(descriptions).astype(str)
+    merchants = descriptions.map(normalize_merchant)
+    cache = load_merchant_cache()
+
+    categories = merchants.map(cache).astype(object)
+    pending = categories.isna()
+    if pending.any():
+        rules = descriptions[pending].map(classify_expense)
+        categories.loc[rules.index] = rules.where(rules != "Other")
+        pending = categories.isna()
+
+    model = _local_model() if pending.any() else None
+    if model is not None:
+        unique = merchants[pending].unique()
+        proba = model.predict_proba(unique)
+        best = proba.argmax(axis=1)
+        confident = proba.max(axis=1) >= MODEL_CONFIDENCE
+        predicted = dict(zip(unique[confident], model.classes_[best[confident]].tolist()))
+        categories.loc[pending] = merchants[pending].map(predicted)
+        pending = categories.isna()
+
+    if pending.any() and llm_classifier is not None:
+        unique = sorted(set(merchants[pending]))
+        try:
+            answers = llm_classifier(unique)
+        except Exception as e:
+            print("[classify_expenses] LLM fallback failed:", e)
+            answers = {}
+        if answers:
+            save_merchant_cache(answers)
+            categories.loc[pending] = merchants[pending].map(answers)
+
+    return categories.fillna("Other")
@@ -0,0 +1,77 @@
+# tools/form16_parser.py
+
+import hashlib
+import io
+import re
+from collections import OrderedDict
+from tools.metrics import timed
+
+# One line-anchored pattern for every field. The label is the first known
+# label on the line, as a whole word ("Total rent paid", "Deduction under
+# section 80C"), and the amount is the last number on that same line, so
+# matching never scans across the document.
+FIELD_PATTERN = re.compile(
+    r"^[^\n]*?\b"
+    r"(?:(?P<salary>gross\s+salary)"
+    r"|(?P<basic_salary>basic(?:\s+salary|\s+pay)?)"
+    r"|(?P<hra_received>hra|house\s+rent\s+allowance)"
+    r"|(?P<rent>rent(?:\s+paid)?)"
+    r"|(?P<nps_employer>(?:section\s+)?80\s*ccd\s*\(2\))"
+    r"|(?P<deductions_80c>(?:section\s+)?80\s*c)"
+    r"|(?P<deductions_80d>(?:section\s+)?80\s*d))(?!\w)"
+    r"[^\n]*?(?P<amount>\d[\d,]*(?:\.\d+)?)[ \t]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+FIELDS = ["salary", "basic_salary", "hra_received", "rent", "deductions_80c", "deductions_80d", "nps_employer"]
+# The fields above that every Form 16 / salary slip has; once these are
+# found the remaining pages are not extracted.
+REQUIRED_FIELDS = {"salary", "basic_salary", "hra_received"}
+
+_CACHE_SIZE = 128
+_cache = OrderedDict()
+
+
+def match_fields(text: str, found: dict = None) -> dict:
+    """Single pass over `text`; the first amount seen for each field wins."""
+    found = {} if found is None else found
+    for match in FIELD_PATTERN.finditer(text):
+        field = next(name for name in FIELDS if match.group(name))
+        if field not in found:
+            found[field] = int(float(match.group("amount").replace(",", "")))
+    return found
+
+
+@timed("form16.parse")
+def parse_form16(data: bytes) -> dict:
+    """
+    Extract salary fields from a Form 16 / salary slip PDF.
+
+    Pages are read in order and extraction stops as soon as the core salary
+    fields are found. Results are cached by SHA-256 of the file, so re-parsing
+    the same upload (e.g. on a Streamlit rerun) is free. Returns keyword
+    arguments for `tax_summary_gpt`; fields not found are 0. Raises
+    ValueError when `data` is not a readable PDF.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    if digest in _cache:
+        _cache.move_to_end(digest)
+        return dict(_cache[digest])
+
+    import pdfplumber  # slow to import; loaded on first use
+    from pdfplumber.utils.exceptions import PdfminerException
+
+    found = {}
+    try:
+        with pdfplumber.open(io.BytesIO(data)) as pdf:
+            for page in pdf.pages:
+                match_fields(page.extract_text() or "", found)
+                if REQUIRED_FIELDS <= found.keys():
+                    break
+    except PdfminerException as e:
+        raise ValueError(f"Not a readable PDF: {e}") from e
+
+    result = {field: found.get(field, 0) for field in FIELDS}
+    _cache[digest] = result
+    if len(_cache) > _CACHE_SIZE:
+        _cache.popitem(last=False)
+    return dict(result)
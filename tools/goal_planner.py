@@ -1,8 +1,7 @@
 # tools/goal_planner.py
 
-import plotly.graph_objects as go
 from math import ceil
-from langchain.tools import tool
+from utils.chart_utils import downsample
 
 def calculate_required_sip(goal_amount: float, years: int, annual_return: float = 12.0) -> float:
     """
@@ -13,12 +12,13 @@ def calculate_required_sip(goal_amount: float, years: int, annual_return: float
     sip = goal_amount * r / (((1 + r) ** n - 1))
     return round(sip, 2)
 
-def goal_projection(goal_amount: float, years: int, income: float, annual_return: float = 12.0):
+def goal_summary(goal_amount: float, years: int, income: float, annual_return: float = 12.0) -> str:
+    """Text plan with the required SIP and whether it fits the income."""
     required_sip = calculate_required_sip(goal_amount, years, annual_return)
 
     can_afford = required_sip <= income * 0.4  # max 40% of income for investment
 
-    summary = f"""
+    return f"""
 🎯 **Goal-Based Plan**
 
 - 🧾 Goal Amount: ₹{int(goal_amount):,}
@@ -31,31 +31,39 @@ def goal_projection(goal_amount: float, years: int, income: float, annual_return
 (Current income: ₹{int(income):,}/month)
 """
 
-    # Plot future value growth
+def goal_values(goal_amount: float, years: int, annual_return: float = 12.0) -> list:
+    """Investment value at the end of each year when paying the required SIP."""
     values = []
     r = annual_return / 100 / 12
-    sip = required_sip
+    sip = calculate_required_sip(goal_amount, years, annual_return)
     total = 0
 
     for i in range(1, years * 12 + 1):
         total = total * (1 + r) + sip
         if i % 12 == 0:
             values.append(round(total))
+    return values
+
+def goal_figure(goal_amount: float, years: int, annual_return: float = 12.0):
+    """Growth chart for the UI. Plotly is only imported when a chart is requested."""
+    import plotly.graph_objects as go
 
+    labels, values = downsample([f"Year {i+1}" for i in range(years)], goal_values(goal_amount, years, annual_return))
     fig = go.Figure()
     fig.add_trace(go.Scatter(
-        x=[f"Year {i+1}" for i in range(years)],
+        x=labels,
         y=values,
         mode="lines+markers",
         name="Investment Growth",
         line=dict(color="green")
     ))
     fig.update_layout(title="📈 SIP Investment Growth Towards Goal", xaxis_title="Year", yaxis_title="Value (₹)")
+    return fig
 
-    return summary, fig
+def goal_projection(goal_amount: float, years: int, income: float, annual_return: float = 12.0):
+    summary = goal_summary(goal_amount, years, income, annual_return)
+    return summary, goal_figure(goal_amount, years, annual_return)
 
-@tool
 def run_goal_tool(goal_amount: float, years: int, income: float, annual_return: float = 12.0) -> str:
     """Generate SIP plan for a future goal based on target amount, years, income, and expected return."""
-    summary, _ = goal_projection(goal_amount, years, income, annual_return)
-    return summary
+    return goal_summary(goal_amount, years, income, annual_return)
@@ -0,0 +1,99 @@
+# tools/history_codec.py
+
+import base64
+import os
+import warnings
+import numpy as np
+import pandas as pd
+from utils.chart_utils import lttb_indices
+
+ENCODINGS = ("base64", "columnar")
+# Dates kept per holding in the default row format (drawn as sparklines).
+HISTORY_POINTS = int(os.getenv("HISTORY_POINTS", "60"))
+
+
+def history_matrix(histories: dict) -> dict:
+    """
+    {symbol: pd.Series of closes indexed by date} -> one shared date axis and a
+    symbol x date float32 matrix (NaN where a symbol has no close that day).
+    """
+    series = {symbol: s for symbol, s in histories.items() if len(s)}
+    if not series:
+        return {"dates": pd.DatetimeIndex([]), "symbols": [], "prices": np.empty((0, 0), dtype=np.float32)}
+    frame = pd.concat(series, axis=1).sort_index()
+    return {
+        "dates": frame.index,
+        "symbols": list(frame.columns),
+        "prices": frame.to_numpy(dtype=np.float32).T.copy(),
+    }
+
+
+def empty_history() -> dict:
+    return history_matrix({})
+
+
+def downsample_indices(prices: np.ndarray, points: int = None) -> np.ndarray:
+    """
+    Date indices shared by every symbol, picked with LTTB on the equal-weighted
+    average of each symbol's prices relative to its first close, so the
+    common moves survive downsampling.
+    """
+    length = prices.shape[1]
+    if not points or points >= length or not len(prices):
+        return np.arange(length)
+    first = pd.DataFrame(prices.T).bfill().iloc[0].to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN dates
+        average = np.nanmean(prices / first[:, None], axis=0)
+    average = pd.Series(average).ffill().bfill().to_numpy()
+    return lttb_indices(np.arange(length), average, points)
+
+
+def history_records(summary: pd.DataFrame, points: int = HISTORY_POINTS) -> list[dict]:
+    """
+    The legacy row format: every row carries its own History/HistoryDates
+    lists, rebuilt from the shared matrix in summary.attrs["history"] and
+    downsampled to at most `points` shared dates (LTTB; None keeps all).
+    """
+    history = summary.attrs.get("history") or empty_history()
+    row_of = {symbol: i for i, symbol in enumerate(history["symbols"])}
+    idx = downsample_indices(history["prices"], points)
+    dates = np.asarray(history["dates"][idx].strftime("%Y-%m-%d"), dtype=object)
+    records = summary.to_dict("records")
+    for record in records:
+        row = row_of.get(record["Symbol"])
+        if row is None:
+            record["History"], record["HistoryDates"] = [], []
+            continue
+        prices = history["prices"][row, idx]
+        present = ~np.isnan(prices)
+        record["History"] = prices[present].astype(float).tolist()
+        record["HistoryDates"] = dates[present].tolist()
+    return records
+
+
+def compact_history(history: dict, points: int = None, encoding: str = "base64") -> dict:
+    """
+    Columnar payload: one shared `dates` axis plus a symbols x dates float32
+    matrix, optionally downsampled to `points` dates (LTTB). With encoding="base64"
+    the matrix is little-endian float32, row-major (one row per symbol),
+    NaN for missing days; with "columnar" it is a list of lists with nulls.
+    Raises ValueError for any other encoding.
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown encoding {encoding!r}; expected one of {', '.join(ENCODINGS)}.")
+    idx = downsample_indices(history["prices"], points)
+    prices = history["prices"][:, idx]
+    payload = {
+        "dates": history["dates"][idx].strftime("%Y-%m-%d").tolist(),
+        "symbols": history["symbols"],
+        "shape": list(prices.shape),
+        "encoding": encoding,
+    }
+    if encoding == "base64":
+        payload["dtype"] = "float32"
+        payload["values"] = base64.b64encode(prices.astype("<f4").tobytes()).decode("ascii")
+    else:
+        rounded = np.round(prices.astype(np.float64), 2)
+        payload["values"] = np.where(np.isnan(rounded), None, rounded).tolist()
+    return payload
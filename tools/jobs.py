@@ -0,0 +1,120 @@
+# tools/jobs.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Max jobs running at once; the rest wait in the executor's queue.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# Set to a file path to keep job status across restarts (e.g. data/jobs.db).
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH")
+
+# Finished jobs are kept in memory this long for polling.
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", "3600"))
+
+ACTIVE = ("queued", "running")
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+_lock = threading.Lock()
+_jobs = {}      # job id -> job dict
+_inflight = {}  # dedup key -> job id, while queued/running
+_db = None
+
+
+def _store():
+    global _db
+    if JOBS_DB_PATH and _db is None:
+        os.makedirs(os.path.dirname(JOBS_DB_PATH) or ".", exist_ok=True)
+        _db = sqlite3.connect(JOBS_DB_PATH, check_same_thread=False)
+        _db.execute("CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, data TEXT NOT NULL)")
+    return _db
+
+
+def _save(job):
+    """Persist a snapshot of `job`; caller holds _lock."""
+    db = _store()
+    if db is not None:
+        with db:
+            db.execute("INSERT OR REPLACE INTO jobs VALUES (?, ?)", (job["id"], json.dumps(job, default=str)))
+
+
+def _update(job_id, **fields):
+    with _lock:
+        job = _jobs[job_id]
+        job.update(fields, updated_at=time.time())
+        if job["status"] not in ACTIVE:
+            _inflight.pop(job["key"], None)
+        _save(job)
+
+
+def _run(job_id, func, payload):
+    _update(job_id, status="running")
+
+    def progress(percent, message=""):
+        _update(job_id, progress=percent, message=message)
+
+    try:
+        result = func(payload, progress)
+        _update(job_id, status="done", progress=100, message="Completed", result=result)
+    except Exception as e:
+        print(f"[jobs] {job_id} failed:", e)
+        _update(job_id, status="failed", error=str(e))
+
+
+def _prune(now):
+    """Forget finished jobs past their TTL; caller holds _lock."""
+    expired = [
+        job_id for job_id, job in _jobs.items()
+        if job["status"] not in ACTIVE and now - job["updated_at"] > JOB_TTL_SECONDS
+    ]
+    for job_id in expired:
+        del _jobs[job_id]
+
+
+def submit_job(kind: str, func, payload: dict) -> dict:
+    """
+    Queue `func(payload, progress)` on the worker pool and return the job.
+
+    Identical requests (same kind and payload) that arrive while one is still
+    queued or running share that job instead of starting another.
+    """
+    key = kind + ":" + hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+    with _lock:
+        job_id = _inflight.get(key)
+        if job_id:
+            return dict(_jobs[job_id])
+        now = time.time()
+        _prune(now)
+        job = {
+            "id": uuid.uuid4().hex, "kind": kind, "key": key, "status": "queued",
+            "progress": 0, "message": "", "result": None, "error": None,
+            "created_at": now, "updated_at": now,
+        }
+        _jobs[job["id"]] = job
+        _inflight[key] = job["id"]
+        _save(job)
+    _executor.submit(_run, job["id"], func, payload)
+    return dict(job)
+
+
+def get_job(job_id: str):
+    """Current job status, or None if unknown."""
+    with _lock:
+        if job_id in _jobs:
+            return dict(_jobs[job_id])
+        db = _store()
+        if db is None:
+            return None
+        row = db.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    job = json.loads(row[0])
+    if job["status"] in ACTIVE:
+        # The process that owned it is gone
+        job["status"], job["error"] = "failed", "Server restarted before the job finished."
+    return job
@@ -0,0 +1,207 @@
+# tools/ledger.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import pandas as pd
+from tools.metrics import timed
+from tools.expense_anomalies import DEFAULT_WINDOW, new_anomaly_state, normalize_merchant, update_anomalies
+from tools.expense_classifier import classify_expenses
+
+LEDGER_PATH = os.getenv("LEDGER_PATH", os.path.join("data", "ledger.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    hash        TEXT PRIMARY KEY,
+    account     TEXT NOT NULL,
+    date        TEXT NOT NULL,
+    month       TEXT NOT NULL,
+    description TEXT NOT NULL,
+    merchant    TEXT NOT NULL,
+    amount      REAL NOT NULL,
+    category    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_account_month
+    ON transactions (account, month, category);
+
+CREATE TABLE IF NOT EXISTS monthly_category_totals (
+    account  TEXT NOT NULL,
+    month    TEXT NOT NULL,
+    category TEXT NOT NULL,
+    total    REAL NOT NULL,
+    count    INTEGER NOT NULL,
+    PRIMARY KEY (account, month, category)
+) WITHOUT ROWID;
+
+-- Last DEFAULT_WINDOW amounts per category and merchant (oldest first), the
+-- state update_anomalies needs to score the next upload without a rescan.
+CREATE TABLE IF NOT EXISTS anomaly_tails (
+    account TEXT NOT NULL,
+    kind    TEXT NOT NULL,
+    key     TEXT NOT NULL,
+    amounts TEXT NOT NULL,
+    PRIMARY KEY (account, kind, key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS anomaly_scores (
+    hash       TEXT PRIMARY KEY,
+    category_z REAL NOT NULL,
+    merchant_z REAL NOT NULL,
+    unusual    INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+_lock = threading.Lock()
+_conn = None
+
+
+def get_connection():
+    """Shared connection to the ledger database, created on first use."""
+    global _conn
+    if _conn is None:
+        os.makedirs(os.path.dirname(LEDGER_PATH) or ".", exist_ok=True)
+        conn = sqlite3.connect(LEDGER_PATH, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        _conn = conn
+    return _conn
+
+
+def transaction_hashes(df, account: str = "default") -> pd.Series:
+    """
+    Stable id per row from (account, date, amount, normalized description).
+    Identical rows inside one statement get an occurrence number, so two
+    same-day coffees are kept while an overlapping re-upload is not.
+    """
+    dates = pd.to_datetime(df["Date"], errors="coerce").dt.strftime("%Y-%m-%d").fillna(df["Date"].astype(str))
+    keys = (
+        account + "|" + dates + "|" + df["Amount"].round(2).map("{:.2f}".format)
+        + "|" + df["Description"].map(normalize_merchant)
+    )
+    occurrence = keys.groupby(keys).cumcount().astype(str)
+    return (keys + "|" + occurrence).map(lambda k: hashlib.sha1(k.encode()).hexdigest())
+
+
+def _existing(conn, hashes) -> dict:
+    """hash -> category for hashes already in the ledger."""
+    found = {}
+    hashes = list(hashes)
+    for i in range(0, len(hashes), 500):  # stay under SQLite's variable limit
+        chunk = hashes[i:i + 500]
+        placeholders = ",".join("?" * len(chunk))
+        rows = conn.execute(f"SELECT hash, category FROM transactions WHERE hash IN ({placeholders})", chunk)
+        found.update(rows)
+    return found
+
+
+def _anomaly_state(conn, account: str, rows) -> dict:
+    """Stored tails for the categories and merchants in `rows`."""
+    state = new_anomaly_state(DEFAULT_WINDOW)
+    for kind in ("Category", "Merchant"):
+        keys = list(rows[kind].unique())
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            found = conn.execute(
+                f"SELECT key, amounts FROM anomaly_tails WHERE account = ? AND kind = ? AND key IN ({placeholders})",
+                [account, kind, *chunk],
+            )
+            state["tails"][kind].update((key, json.loads(amounts)) for key, amounts in found)
+    return state
+
+
+def _scores(conn, hashes) -> pd.DataFrame:
+    """Stored anomaly scores, indexed by hash."""
+    found = []
+    hashes = list(hashes)
+    for i in range(0, len(hashes), 500):
+        chunk = hashes[i:i + 500]
+        placeholders = ",".join("?" * len(chunk))
+        found += conn.execute(f"SELECT * FROM anomaly_scores WHERE hash IN ({placeholders})", chunk).fetchall()
+    return pd.DataFrame(found, columns=["Hash", "CategoryZ", "MerchantZ", "Unusual"]).set_index("Hash")
+
+
+def _with_scores(conn, df) -> pd.DataFrame:
+    scores = _scores(conn, df["Hash"]).reindex(df["Hash"])
+    df["CategoryZ"] = scores["CategoryZ"].fillna(0.0).values
+    df["MerchantZ"] = scores["MerchantZ"].fillna(0.0).values
+    df["Unusual"] = scores["Unusual"].fillna(0).astype(bool).values
+    return df.drop(columns=["Hash", "Month"])
+
+
+@timed("ledger.ingest")
+def ingest_statement(df, account: str = "default"):
+    """
+    Store a cleaned statement (Date, Description, Amount) in the ledger.
+
+    Rows already present are skipped; only new rows are categorized and
+    scored for anomalies (against the account's stored per-category and
+    per-merchant history). Monthly per-category totals and the anomaly
+    history are updated incrementally in the same transaction. Returns (all
+    rows of this statement with Category, CategoryZ, MerchantZ and Unusual,
+    number of new rows).
+    """
+    df = df.copy()
+    df["Hash"] = transaction_hashes(df, account).values
+    dates = pd.to_datetime(df["Date"], errors="coerce")
+    df["Month"] = dates.dt.strftime("%Y-%m").fillna("unknown")
+
+    conn = get_connection()
+    with _lock:
+        existing = _existing(conn, df["Hash"])
+    df["Category"] = df["Hash"].map(existing).astype(object)
+    new_rows = df[df["Category"].isna()].copy()
+    if new_rows.empty:
+        with _lock:
+            return _with_scores(conn, df), 0
+
+    # Classify outside the lock: this may involve an LLM round-trip.
+    new_rows["Category"] = classify_expenses(new_rows["Description"]).values
+    new_rows["Merchant"] = new_rows["Description"].map(normalize_merchant)
+    df.loc[new_rows.index, "Category"] = new_rows["Category"]
+
+    with _lock, conn:
+        # A concurrent upload may have stored some of these rows meanwhile.
+        new_rows = new_rows[~new_rows["Hash"].isin(_existing(conn, new_rows["Hash"]).keys())]
+        totals = new_rows.groupby(["Month", "Category"])["Amount"].agg(["sum", "count"]).reset_index()
+        conn.executemany(
+            "INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            zip(new_rows["Hash"], [account] * len(new_rows), new_rows["Date"].astype(str),
+                new_rows["Month"], new_rows["Description"].astype(str), new_rows["Merchant"],
+                new_rows["Amount"].astype(float), new_rows["Category"]),
+        )
+        conn.executemany(
+            """INSERT INTO monthly_category_totals VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT (account, month, category)
+               DO UPDATE SET total = total + excluded.total, count = count + excluded.count""",
+            ((account, m, c, float(s), int(n)) for m, c, s, n in totals.itertuples(index=False)),
+        )
+        if not new_rows.empty:
+            scored, state = update_anomalies(_anomaly_state(conn, account, new_rows), new_rows)
+            conn.executemany(
+                "INSERT OR REPLACE INTO anomaly_scores VALUES (?, ?, ?, ?)",
+                zip(scored["Hash"], scored["CategoryZ"].astype(float), scored["MerchantZ"].astype(float),
+                    scored["Unusual"].astype(int)),
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO anomaly_tails VALUES (?, ?, ?, ?)",
+                ((account, kind, key, json.dumps(state["tails"][kind][key]))
+                 for kind in ("Category", "Merchant") for key in scored[kind].unique()),
+            )
+        df = _with_scores(conn, df)
+    return df, len(new_rows)
+
+
+def monthly_breakdown(account: str = "default", month: str = None) -> pd.DataFrame:
+    """Per-month, per-category totals served from the materialized aggregate table."""
+    query = "SELECT month, category, total, count FROM monthly_category_totals WHERE account = ?"
+    params = [account]
+    if month:
+        query += " AND month = ?"
+        params.append(month)
+    query += " ORDER BY month, category"
+    with _lock:
+        rows = get_connection().execute(query, params).fetchall()
+    return pd.DataFrame(rows, columns=["Month", "Category", "Total", "Count"])
@@ -0,0 +1,138 @@
+# tools/live_portfolio.py
+
+import asyncio
+import os
+import time
+from tools.market_data import market_data
+from tools.metrics import Counter, Gauge
+from tools.portfolio import holding_row
+
+# Seconds between quote refreshes for the symbols anyone is subscribed to.
+LIVE_QUOTE_INTERVAL = float(os.getenv("LIVE_QUOTE_INTERVAL", "5"))
+
+SUBSCRIBERS = Gauge("live_portfolio_subscribers", "Portfolios subscribed over WebSocket.")
+SYMBOLS = Gauge("live_portfolio_symbols", "Distinct symbols the live poller refreshes.")
+QUOTES_FETCHED = Counter("live_portfolio_quotes_total", "Symbol quotes fetched by the live poller.")
+
+
+class Subscriber:
+    """
+    One client's portfolio. Rows and totals are updated in place for the
+    holdings whose price moved; the changes collect in `pending` until the
+    client's sender takes them, so a slow client gets one merged delta
+    instead of a backlog.
+    """
+
+    def __init__(self, stocks: list[dict]):
+        self.stocks = stocks
+        self.rows = [None] * len(stocks)
+        self.positions = {}  # symbol -> row indexes (a symbol may be held in several lots)
+        for i, stock in enumerate(stocks):
+            self.positions.setdefault(stock["symbol"], []).append(i)
+        self.invested = sum(stock["quantity"] * stock["buy_price"] for stock in stocks)
+        self.value = 0.0
+        self.pending = {}
+        self._changed = asyncio.Event()
+
+    def totals(self) -> dict:
+        gain = self.value - self.invested
+        return {
+            "Invested ₹": round(self.invested, 2),
+            "Now ₹": round(self.value, 2),
+            "Profit/Loss ₹": round(gain, 2),
+            "Return %": round(gain / self.invested * 100, 2) if self.invested else 0,
+        }
+
+    def snapshot(self, prices: dict) -> dict:
+        self.rows = [holding_row(stock, prices.get(stock["symbol"], 0)) for stock in self.stocks]
+        self.value = sum(row["Now ₹"] for row in self.rows)
+        return {"type": "snapshot", "rows": self.rows, "totals": self.totals(), "ts": time.time()}
+
+    def update(self, symbol: str, price: float):
+        for i in self.positions.get(symbol, ()):
+            row = holding_row(self.stocks[i], price)
+            self.value += row["Now ₹"] - self.rows[i]["Now ₹"]
+            self.rows[i] = self.pending[i] = row
+        self._changed.set()
+
+    async def next_delta(self) -> dict:
+        """Wait for price moves, then return the rows changed since the last delta."""
+        await self._changed.wait()
+        self._changed.clear()
+        rows, self.pending = self.pending, {}
+        return {"type": "delta", "rows": {str(i): row for i, row in rows.items()}, "totals": self.totals(),
+                "ts": time.time()}
+
+
+class QuoteHub:
+    """
+    Shares quotes between all live subscribers: one poller refreshes each
+    distinct symbol once per `interval`, however many portfolios hold it,
+    and only portfolios holding a symbol whose price moved are recomputed.
+    The poller runs while there is at least one subscriber.
+    """
+
+    def __init__(self, interval: float = LIVE_QUOTE_INTERVAL, fetch=None):
+        self.interval = interval
+        self.fetch = fetch or (lambda symbols: market_data().quotes(symbols))
+        self.prices = {}
+        self.holders = {}  # symbol -> subscribers holding it
+        self._poller = None
+
+    async def _quotes(self, symbols: list[str]) -> dict:
+        QUOTES_FETCHED.inc(amount=len(symbols))
+        quotes = await asyncio.to_thread(self.fetch, symbols)
+        return {symbol: price for symbol, price in quotes.items() if price}  # 0 = no answer; keep the last price
+
+    async def subscribe(self, stocks: list[dict]) -> tuple[Subscriber, dict]:
+        """Register a portfolio; returns the subscriber and its initial snapshot message."""
+        subscriber = Subscriber(stocks)
+        missing = [symbol for symbol in subscriber.positions if symbol not in self.prices]
+        if missing:
+            self.prices.update(await self._quotes(missing))
+        for symbol in subscriber.positions:
+            self.holders.setdefault(symbol, set()).add(subscriber)
+        SUBSCRIBERS.add(1)
+        SYMBOLS.set(len(self.holders))
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll())
+        return subscriber, subscriber.snapshot(self.prices)
+
+    def unsubscribe(self, subscriber: Subscriber):
+        for symbol in subscriber.positions:
+            holders = self.holders.get(symbol)
+            if holders is not None:
+                holders.discard(subscriber)
+                if not holders:
+                    del self.holders[symbol]
+                    self.prices.pop(symbol, None)
+        SUBSCRIBERS.add(-1)
+        SYMBOLS.set(len(self.holders))
+
+    async def _poll(self):
+        while self.holders:
+            await asyncio.sleep(self.interval)
+            symbols = list(self.holders)
+            if not symbols:
+                break
+            try:
+                fresh = await self._quotes(symbols)
+            except Exception as e:
+                print("[live_portfolio] quote refresh failed:", e)
+                continue
+            for symbol, price in fresh.items():
+                if symbol in self.holders and price != self.prices.get(symbol):
+                    self.prices[symbol] = price
+                    for subscriber in self.holders[symbol]:
+                        subscriber.update(symbol, price)
+
+
+_hub = None
+
+
+def quote_hub() -> QuoteHub:
+    """The process-wide hub; created on first use inside the running event loop."""
+    global _hub
+    if _hub is None:
+        _hub = QuoteHub()
+    return _hub
@@ -0,0 +1,149 @@
+# tools/llm_usage.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# USD per million tokens; defaults are gpt-4o-mini list prices.
+LLM_PRICE_INPUT_PER_1M = float(os.getenv("LLM_PRICE_INPUT_PER_1M", "0.15"))
+LLM_PRICE_OUTPUT_PER_1M = float(os.getenv("LLM_PRICE_OUTPUT_PER_1M", "0.60"))
+# Spend allowed per UTC day across the process; 0 disables the limit.
+LLM_DAILY_BUDGET_USD = float(os.getenv("LLM_DAILY_BUDGET_USD", "0"))
+# Tokens (prompt + completion) allowed per session; 0 disables the limit.
+LLM_SESSION_TOKEN_BUDGET = int(os.getenv("LLM_SESSION_TOKEN_BUDGET", "0"))
+# Sessions tracked in memory; the least recently used are dropped first.
+LLM_MAX_SESSIONS = int(os.getenv("LLM_MAX_SESSIONS", "1000"))
+
+_caller = ContextVar("llm_caller", default="other")
+_session = ContextVar("llm_session", default=None)
+
+_lock = threading.Lock()
+_by_caller = {}
+_by_session = OrderedDict()
+_day = {"date": None, "cost_usd": 0.0}
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised before an LLM call that would run over a configured budget."""
+
+
+@contextmanager
+def tagged(caller: str, session: str = None):
+    """Attribute LLM calls made inside the block to `caller` (and `session`, if given)."""
+    caller_token = _caller.set(caller)
+    session_token = _session.set(session) if session else None
+    try:
+        yield
+    finally:
+        _caller.reset(caller_token)
+        if session_token is not None:
+            _session.reset(session_token)
+
+
+def _empty() -> dict:
+    return {"calls": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0, "tool_calls": 0,
+            "latency_seconds": 0.0, "cost_usd": 0.0}
+
+
+def _today() -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime())
+
+
+def cost(prompt_tokens: int, completion_tokens: int) -> float:
+    return (prompt_tokens * LLM_PRICE_INPUT_PER_1M + completion_tokens * LLM_PRICE_OUTPUT_PER_1M) / 1e6
+
+
+def check_budget(session: str = None):
+    """Raise BudgetExceeded when the daily spend or `session`'s token budget is used up."""
+    with _lock:
+        spent = _day["cost_usd"] if _day["date"] == _today() else 0.0
+        used = _by_session.get(session)
+    if LLM_DAILY_BUDGET_USD and spent >= LLM_DAILY_BUDGET_USD:
+        raise BudgetExceeded(f"daily LLM budget of ${LLM_DAILY_BUDGET_USD:g} used up")
+    if LLM_SESSION_TOKEN_BUDGET and used and used["prompt_tokens"] + used["completion_tokens"] >= LLM_SESSION_TOKEN_BUDGET:
+        raise BudgetExceeded(f"session token budget of {LLM_SESSION_TOKEN_BUDGET:,} used up")
+
+
+def record(caller: str, session, seconds: float, prompt_tokens: int = 0, completion_tokens: int = 0,
+           tool_calls: int = 0, error: bool = False):
+    spent = cost(prompt_tokens, completion_tokens)
+    with _lock:
+        if _day["date"] != _today():
+            _day.update(date=_today(), cost_usd=0.0)
+        _day["cost_usd"] += spent
+        targets = [_by_caller.setdefault(caller, _empty())]
+        if session:
+            targets.append(_by_session.setdefault(session, _empty()))
+            _by_session.move_to_end(session)
+            while len(_by_session) > LLM_MAX_SESSIONS:
+                _by_session.popitem(last=False)
+        for stats in targets:
+            stats["calls"] += 1
+            stats["errors"] += error
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+            stats["tool_calls"] += tool_calls
+            stats["latency_seconds"] += seconds
+            stats["cost_usd"] += spent
+
+
+def _rounded(stats: dict) -> dict:
+    return dict(stats, latency_seconds=round(stats["latency_seconds"], 3), cost_usd=round(stats["cost_usd"], 6))
+
+
+def usage(session: str = None) -> dict:
+    """Totals per caller (and for one session when given) since the process started."""
+    with _lock:
+        if session is not None:
+            return {"session": session, **_rounded(_by_session.get(session, _empty()))}
+        spent_today = _day["cost_usd"] if _day["date"] == _today() else 0.0
+        return {
+            "by_caller": {name: _rounded(stats) for name, stats in sorted(_by_caller.items())},
+            "sessions": len(_by_session),
+            "today_cost_usd": round(spent_today, 6),
+            "daily_budget_usd": LLM_DAILY_BUDGET_USD or None,
+            "session_token_budget": LLM_SESSION_TOKEN_BUDGET or None,
+        }
+
+
+def usage_handler():
+    """LangChain callback handler recording every chat-model call made through the shared client."""
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class UsageHandler(BaseCallbackHandler):
+        # Let BudgetExceeded from on_chat_model_start stop the call instead of being logged and ignored
+        raise_error = True
+
+        def __init__(self):
+            self._runs = {}  # run id -> (caller, session, start)
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+            session = _session.get()
+            check_budget(session)
+            self._runs[run_id] = (_caller.get(), session, time.perf_counter())
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            caller, session, start = self._runs.pop(run_id, (_caller.get(), _session.get(), time.perf_counter()))
+            usage = (response.llm_output or {}).get("token_usage") or {}
+            tool_calls = 0
+            for generations in response.generations:
+                for generation in generations:
+                    message = getattr(generation, "message", None)
+                    if message is None:
+                        continue
+                    tool_calls += len(getattr(message, "tool_calls", None) or [])
+                    tool_calls += "function_call" in message.additional_kwargs
+                    if not usage and getattr(message, "usage_metadata", None):
+                        usage = {"prompt_tokens": message.usage_metadata["input_tokens"],
+                                 "completion_tokens": message.usage_metadata["output_tokens"]}
+            record(caller, session, time.perf_counter() - start, usage.get("prompt_tokens", 0),
+                   usage.get("completion_tokens", 0), tool_calls)
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            caller, session, start = self._runs.pop(run_id, (_caller.get(), _session.get(), time.perf_counter()))
+            record(caller, session, time.perf_counter() - start, error=True)
+
+    return UsageHandler()
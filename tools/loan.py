@@ -1,9 +1,10 @@
-from langchain.tools import tool
-import plotly.graph_objs as go
+from typing import TYPE_CHECKING
 
-# 📋 UI summary function (text only)
-def loan_summary(principal: float, years: int, rate: float) -> str:
-    """Calculate EMI, total payment, and interest for UI use."""
+if TYPE_CHECKING:
+    import plotly.graph_objs as go
+
+def loan_breakdown(principal: float, years: int, rate: float) -> dict:
+    """EMI, total payment and total interest for a fixed-rate loan."""
     annual_rate = rate / 100
     r = annual_rate / 12
     n = years * 12
@@ -11,6 +12,13 @@ def loan_summary(principal: float, years: int, rate: float) -> str:
     emi = principal * r * ((1 + r) ** n) / ((1 + r) ** n - 1)
     total_payment = emi * n
     total_interest = total_payment - principal
+    return {"emi": emi, "total_payment": total_payment, "total_interest": total_interest}
+
+# 📋 UI summary function (text only)
+def loan_summary(principal: float, years: int, rate: float) -> str:
+    """Calculate EMI, total payment, and interest for UI use."""
+    b = loan_breakdown(principal, years, rate)
+    emi, total_payment, total_interest = b["emi"], b["total_payment"], b["total_interest"]
 
     return f"""🏦 **Loan EMI Breakdown**
 - Principal: ₹{int(principal):,}
@@ -23,32 +31,15 @@ def loan_summary(principal: float, years: int, rate: float) -> str:
 """
 
 # 🧠 LangChain tool (GPT only)
-@tool
 def run_loan_tool(principal: float, years: int, rate: float) -> str:
     """LangChain agent tool to calculate EMI, interest, and total payment."""
     return loan_summary(principal, years, rate)
 
-# 📊 UI function with plotly visualization
-def loan_projection(principal: float, years: int, rate: float) -> tuple[str, go.Figure]:
-    """Returns loan summary with pie chart visualization for Streamlit UI."""
-    annual_rate = rate / 100
-    r = annual_rate / 12
-    n = years * 12
-
-    emi = principal * r * ((1 + r) ** n) / ((1 + r) ** n - 1)
-    total_payment = emi * n
-    total_interest = total_payment - principal
-
-    summary = f"""🏦 **Loan EMI Breakdown**
-- Principal: ₹{int(principal):,}
-- Interest Rate: {rate:.2f}%
-- Term: {years} years
-
-💰 EMI: ₹{int(emi):,}/month
-📈 Total Payment: ₹{int(total_payment):,}
-📉 Total Interest: ₹{int(total_interest):,}
-"""
+# 📊 Plotly pie chart, built only for the UI
+def loan_figure(principal: float, years: int, rate: float) -> "go.Figure":
+    import plotly.graph_objs as go
 
+    total_interest = loan_breakdown(principal, years, rate)["total_interest"]
     fig = go.Figure(
         data=[
             go.Pie(
@@ -65,5 +56,9 @@ def loan_projection(principal: float, years: int, rate: float) -> tuple[str, go.
         annotations=[{"text": "Loan", "font": {"size": 20}, "showarrow": False}],
         showlegend=True
     )
+    return fig
 
-    return summary, fig
+# 📊 UI function with plotly visualization
+def loan_projection(principal: float, years: int, rate: float) -> tuple[str, "go.Figure"]:
+    """Returns loan summary with pie chart visualization for Streamlit UI."""
+    return loan_summary(principal, years, rate), loan_figure(principal, years, rate)
@@ -0,0 +1,241 @@
+# tools/market_data.py
+
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from tools.metrics import Counter, stage
+
+# Longest a single provider call may take before it counts as failed.
+MARKET_DEADLINE_SECONDS = float(os.getenv("MARKET_DEADLINE_SECONDS", "5"))
+# Hedge delay used until a provider has enough latency samples for a p95.
+MARKET_HEDGE_DELAY = float(os.getenv("MARKET_HEDGE_DELAY", "0.5"))
+MARKET_HEDGE_MIN_SAMPLES = 20
+# Consecutive failures that open a provider's breaker, and how long it stays open.
+MARKET_BREAKER_FAILURES = int(os.getenv("MARKET_BREAKER_FAILURES", "5"))
+MARKET_BREAKER_COOLDOWN = float(os.getenv("MARKET_BREAKER_COOLDOWN", "30"))
+# Suffixes of listings NSE can answer in Yahoo's place. BSE (".BO") tickers are
+# not NSE symbols, so they only get Yahoo.
+HEDGED_SUFFIXES = (".NS",)
+
+PROVIDER_CALLS = Counter("market_provider_calls_total", "Quote calls by provider and outcome.", ["provider", "outcome"])
+HEDGES = Counter("market_hedges_total", "Fallback requests fired because the primary was slow.", ["provider"])
+
+# Calls that miss their deadline keep running here (threads cannot be cancelled),
+# so the pool is sized for a few hung calls per provider.
+_pool = ThreadPoolExecutor(max_workers=int(os.getenv("MARKET_WORKERS", "16")), thread_name_prefix="market")
+
+
+class ProviderError(Exception):
+    """A provider had no usable quote for the symbol."""
+
+
+class YahooProvider:
+    name = "yahoo"
+
+    def supports(self, symbol: str) -> bool:
+        return True
+
+    def quote(self, symbol: str) -> float:
+        import yfinance as yf  # slow to import; loaded on first use
+
+        with stage("yfinance.info"):
+            price = yf.Ticker(symbol).info.get("regularMarketPrice")
+        if not price:
+            raise ProviderError(f"no regularMarketPrice for {symbol}")
+        return float(price)
+
+
+class NSEProvider:
+    name = "nse"
+
+    def supports(self, symbol: str) -> bool:
+        return symbol.upper().endswith(".NS") or "." not in symbol
+
+    def quote(self, symbol: str) -> float:
+        from nsepy import get_quote
+
+        # NSE symbols are usually uppercase and without ".NS"
+        with stage("nse.quote"):
+            price = get_quote(symbol.upper().removesuffix(".NS")).get("lastPrice")
+        if not price:
+            raise ProviderError(f"no lastPrice for {symbol}")
+        return float(price)
+
+
+class CircuitBreaker:
+    """
+    Closed until `failures` calls in a row fail; then open (calls skipped) for
+    `cooldown` seconds, after which one trial call is let through. A success
+    closes it again, a failure re-opens it.
+    """
+
+    def __init__(self, failures: int = MARKET_BREAKER_FAILURES, cooldown: float = MARKET_BREAKER_COOLDOWN):
+        self.failures, self.cooldown = failures, cooldown
+        self._lock = threading.Lock()
+        self._failed = 0
+        self._opened_at = None
+        self._trial = False
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or time.monotonic() - self._opened_at < self.cooldown:
+                return False
+            self._trial = True
+            return True
+
+    def success(self):
+        with self._lock:
+            self._failed, self._opened_at, self._trial = 0, None, False
+
+    def failure(self):
+        with self._lock:
+            self._failed += 1
+            if self._trial or self._failed >= self.failures:
+                self._opened_at, self._trial = time.monotonic(), False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half-open" if self._trial or time.monotonic() - self._opened_at >= self.cooldown else "open"
+
+
+class _Latency:
+    """Recent successful call latencies of one provider."""
+
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def p95(self):
+        with self._lock:
+            if len(self._samples) < MARKET_HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+class MarketData:
+    """
+    Latest prices from an ordered list of providers (primary first).
+
+    Every provider call runs under `deadline` seconds and behind its own
+    circuit breaker. For `hedge_suffixes` symbols the next provider that
+    supports the symbol is also fired when the current one has not answered
+    within its p95 latency (a hedged request) and the first good answer wins;
+    otherwise it is only tried after the previous one failed. Symbols no
+    other provider supports are never hedged. Pass fake providers (any object
+    with `name`, `supports(symbol)` and `quote(symbol)`) to test offline.
+    """
+
+    def __init__(self, providers=None, deadline: float = MARKET_DEADLINE_SECONDS, hedge_delay: float = MARKET_HEDGE_DELAY,
+                 breaker_failures: int = MARKET_BREAKER_FAILURES, breaker_cooldown: float = MARKET_BREAKER_COOLDOWN,
+                 hedge_suffixes=HEDGED_SUFFIXES):
+        self.providers = list(providers) if providers is not None else [YahooProvider(), NSEProvider()]
+        self.deadline, self.hedge_delay, self.hedge_suffixes = deadline, hedge_delay, tuple(hedge_suffixes)
+        self.breakers = {p.name: CircuitBreaker(breaker_failures, breaker_cooldown) for p in self.providers}
+        self._latency = {p.name: _Latency() for p in self.providers}
+
+    def _hedge_after(self, provider) -> float:
+        p95 = self._latency[provider.name].p95()
+        return min(p95 if p95 is not None else self.hedge_delay, self.deadline)
+
+    def _settle(self, provider, ticket: dict, outcome: str):
+        # Each call's outcome is counted once: by the call when it ends in time,
+        # or by quote() at the deadline (then a late answer changes nothing)
+        if ticket.pop("open", False):
+            if outcome == "ok":
+                self.breakers[provider.name].success()
+            else:
+                self.breakers[provider.name].failure()
+            PROVIDER_CALLS.inc(provider.name, outcome)
+
+    def _call(self, provider, symbol: str, ticket: dict) -> float:
+        start = time.perf_counter()
+        try:
+            price = provider.quote(symbol)
+        except Exception:
+            self._settle(provider, ticket, "error")
+            raise
+        elapsed = time.perf_counter() - start
+        self._latency[provider.name].add(elapsed)
+        self._settle(provider, ticket, "ok" if elapsed <= self.deadline else "timeout")
+        return price
+
+    def quote(self, symbol: str) -> float:
+        """Latest price for `symbol`, or 0 when no provider could answer in time."""
+        remaining = deque(p for p in self.providers if p.supports(symbol))
+        hedged = len(remaining) > 1 and bool(self.hedge_suffixes) and symbol.upper().endswith(self.hedge_suffixes)
+        running = {}  # future -> (provider, started_at, ticket)
+
+        def launch() -> bool:
+            while remaining:
+                provider = remaining.popleft()
+                if self.breakers[provider.name].allow():
+                    ticket = {"open": True}
+                    future = _pool.submit(self._call, provider, symbol, ticket)
+                    running[future] = (provider, time.monotonic(), ticket)
+                    return True
+                PROVIDER_CALLS.inc(provider.name, "skipped")
+            return False
+
+        launch()
+        while running:
+            # Wake at the earliest call deadline or, when hedging, when the newest call passes its p95
+            newest, newest_start, _ = max(running.values(), key=lambda item: item[1])
+            wake = min(started + self.deadline for _, started, _ in running.values())
+            if hedged and remaining:
+                wake = min(wake, newest_start + self._hedge_after(newest))
+            done, _ = wait(list(running), timeout=max(0.0, wake - time.monotonic()), return_when=FIRST_COMPLETED)
+
+            launched = False
+            for future in done:
+                running.pop(future)
+                if future.exception() is None:
+                    return future.result()
+                launched |= launch()  # failed fast: go straight to the next provider
+
+            now = time.monotonic()
+            for future, (provider, started, ticket) in list(running.items()):
+                if now - started >= self.deadline:
+                    del running[future]  # left to finish in the background; its answer is ignored
+                    self._settle(provider, ticket, "timeout")
+                    launched |= launch()
+
+            if hedged and remaining and not launched and any(p is newest for p, _, _ in running.values()):
+                if now - newest_start >= self._hedge_after(newest) and launch():
+                    HEDGES.inc(newest.name)
+        return 0
+
+    def quotes(self, symbols: list[str]) -> dict:
+        """quote() for many symbols at once; {symbol: price}."""
+        unique = list(dict.fromkeys(symbols))
+        with ThreadPoolExecutor(max_workers=min(8, len(unique) or 1), thread_name_prefix="quotes") as pool:
+            return dict(zip(unique, pool.map(self.quote, unique)))
+
+    def status(self) -> dict:
+        """Breaker state and p95 latency (seconds, None while warming up) per provider."""
+        return {p.name: {"breaker": self.breakers[p.name].state, "p95_seconds": self._latency[p.name].p95()}
+                for p in self.providers}
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def market_data() -> MarketData:
+    """The shared Yahoo -> NSE provider chain, created on first use."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = MarketData()
+        return _default
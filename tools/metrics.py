@@ -0,0 +1,187 @@
+# tools/metrics.py
+
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Upper bounds in seconds; covers in-memory calculators up to slow LLM calls.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+REGISTRY = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels=()):
+        self.name, self.help, self.label_names = name, help_text, tuple(labels)
+        self._series = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._series.items())
+        for values, value in items:
+            lines += self._render_series(values, value)
+        return lines
+
+    def _render_series(self, values, value):
+        return [f"{self.name}{_labels(self.label_names, values)} {value}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def add(self, amount: float, *labels):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def set(self, value: float, *labels):
+        with self._lock:
+            self._series[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, seconds: float, *labels):
+        i = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += seconds
+
+    def _render_series(self, values, value):
+        counts, total = value
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + ("+Inf",), counts):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{_labels(self.label_names, values, [('le', bound)])} {cumulative}")
+        lines.append(f"{self.name}_sum{_labels(self.label_names, values)} {round(total, 6)}")
+        lines.append(f"{self.name}_count{_labels(self.label_names, values)} {cumulative}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Request latency by route.", ["endpoint", "method"])
+REQUESTS = Counter("http_requests_total", "Requests by route and status.", ["endpoint", "method", "status"])
+IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being handled.", ["endpoint"])
+STAGE_SECONDS = Histogram("stage_duration_seconds", "Time spent in each instrumented stage.", ["stage"])
+STAGE_ERRORS = Counter("stage_errors_total", "Stages that raised.", ["stage"])
+
+
+@contextmanager
+def stage(name: str):
+    """Time a block as stage `name`; exceptions are counted and re-raised."""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(name)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, name)
+
+
+def timed(name: str):
+    """Decorator form of stage()."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                STAGE_ERRORS.inc(name)
+                raise
+            finally:
+                STAGE_SECONDS.observe(time.perf_counter() - start, name)
+        return wrapper
+    return decorate
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware (no BaseHTTPMiddleware task/queue overhead) recording
+    per-route latency, status counts and in-flight requests. Metrics are per
+    process; with several workers, scrape each one.
+    """
+
+    def __init__(self, app):
+        from starlette.routing import Match
+
+        self.app = app
+        self._full = Match.FULL
+        self._templates = {}
+
+    def _route_template(self, scope) -> str:
+        # The route's path template ("/api/jobs/{job_id}"), so labels stay bounded.
+        # Matching walks every route, so results are cached per (method, path).
+        key = (scope["method"], scope["path"])
+        template = self._templates.get(key)
+        if template is None:
+            template = "unmatched"
+            for route in getattr(scope.get("app"), "routes", ()):
+                match, _ = route.matches(scope)
+                if match == self._full:
+                    template = route.path
+                    break
+            if len(self._templates) >= 4096:  # paths with ids in them
+                self._templates.clear()
+            self._templates[key] = template
+        return template
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        endpoint, method, status = self._route_template(scope), scope["method"], 500
+        start = time.perf_counter()
+        IN_FLIGHT.add(1, endpoint)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT.add(-1, endpoint)
+            REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint, method)
+            REQUESTS.inc(endpoint, method, str(status))
@@ -1,8 +1,9 @@
 import os
 import requests
 import pandas as pd
-import yfinance as yf
-from agent import run_gpt_agent
+from tools.llm_usage import BudgetExceeded, tagged
+from tools.metrics import stage, timed
+from tools.price_store import get_closes
 
 GNEWS_API_KEY = os.getenv("GNEWS_API_KEY")
 if not GNEWS_API_KEY:
@@ -25,6 +26,7 @@ symbol_to_name = {
     # Add more as needed
 }
 
+@timed("gnews")
 def fetch_news(symbol):
     """Fetch up to 5 recent news headlines for the provided stock symbol.
 
@@ -50,17 +52,32 @@ def fetch_news(symbol):
         pass  # Fail silently – we'll fallback to an empty list below.
     return []
 
+@timed("market.price_trend")
 def fetch_price_trend(symbol):
-    try:
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period="6mo")
-        if not hist.empty:
-            return hist["Close"].tolist()
-    except Exception:
-        pass
-    return []
+    return get_closes(symbol).tolist()
+
+def trend_only_risk(stock_data, reason):
+    """Deterministic per-stock entries from the price trend alone, used when the LLM budget is exhausted."""
+    entries = []
+    for stock in stock_data:
+        trend = stock["price_trend"]
+        change = (trend[-1] / trend[0] - 1) * 100 if len(trend) > 1 and trend[0] else 0.0
+        prediction = "up" if change > 5 else "down" if change < -5 else "neutral"
+        entries.append({
+            **stock,
+            "risks": ["Price fell more than 5% over six months"] if prediction == "down" else [],
+            "action": "hold",
+            "prediction": prediction,
+            "probability": 50,
+            "summary": f"{stock['company_name']} moved {change:+.1f}% over six months.",
+            "gpt_suggestion": f"AI analysis unavailable ({reason}); this is based on the price trend only.",
+            "source": "price_trend",
+        })
+    return entries
 
 def analyze_portfolio_risk(symbols):
+    from agent import run_gpt_agent  # deferred: keeps LangChain out of import time
+
     stock_data = []
     for symbol in symbols:
         news = fetch_news(symbol)
@@ -109,10 +126,15 @@ Example:
 
 Here is the data:
 """
-    for stock in stock_data:
-        prompt += f"\nStock: {stock['symbol']} ({stock['company_name']})\nNews: {stock['news']}\nPrice Trend: {stock['price_trend']}\n"
-    prompt += "\nRespond in valid JSON as a list of objects, one per stock."
-    gpt_response = run_gpt_agent(prompt, [])
+    with stage("news_risk.prompt"):
+        for stock in stock_data:
+            prompt += f"\nStock: {stock['symbol']} ({stock['company_name']})\nNews: {stock['news']}\nPrice Trend: {stock['price_trend']}\n"
+        prompt += "\nRespond in valid JSON as a list of objects, one per stock."
+    try:
+        with tagged("news_risk"):
+            gpt_response = run_gpt_agent(prompt, [])
+    except BudgetExceeded as e:
+        return trend_only_risk(stock_data, str(e))
     import json
     try:
         if isinstance(gpt_response, str) and gpt_response.strip().startswith('```json'):
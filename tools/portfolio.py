@@ -1,8 +1,9 @@
 # tools/portfolio.py
 
-import yfinance as yf
 import pandas as pd
-from nsepy import get_quote
+from tools.history_codec import history_matrix
+from tools.market_data import NSEProvider, market_data
+from tools.price_store import SIX_MONTHS, get_closes, get_closes_many
 
 
 def get_nse_price(symbol):
@@ -10,58 +11,67 @@ def get_nse_price(symbol):
     Try to fetch the latest price from NSE using nsepy. Returns 0 if fails.
     """
     try:
-        # NSE symbols are usually uppercase and without ".NS"
-        nse_symbol = symbol.replace(".NS", "").upper()
-        quote = get_quote(nse_symbol)
-        return quote.get("lastPrice", 0) or 0
+        return NSEProvider().quote(symbol)
     except Exception:
         return 0
 
 
-def analyze_portfolio(stocks: list[dict]):
+def fetch_close_history(symbol, days=SIX_MONTHS):
     """
-    Takes list of {symbol, quantity, buy_price} and returns summary DataFrame.
+    Daily closes as a pd.Series indexed by (timezone-naive) date, served from
+    the local price store; empty on failure.
+    """
+    return get_closes(symbol, days)
+
+
+def fetch_close_frame(symbols, start):
+    """
+    Daily closes for many symbols since `start` as a date x symbol DataFrame
+    (NaN before a symbol listed or where it did not trade), served from the
+    local price store; only missing or stale days are downloaded, in batches.
+    Empty when nothing could be fetched.
     """
-    results = []
+    closes = {symbol: series for symbol, series in get_closes_many(symbols, start=start).items() if len(series)}
+    if not closes:
+        return pd.DataFrame(columns=list(symbols), dtype=float)
+    return pd.concat(closes, axis=1).sort_index().reindex(columns=list(symbols))
 
-    for stock in stocks:
-        current_price = 0
-        try:
-            ticker = yf.Ticker(stock["symbol"])
-            info = ticker.info
-            current_price = info.get("regularMarketPrice", 0)
-            # Fetch 6-month historical close prices
-            hist = ticker.history(period="6mo")
-            # Use only the closing prices, convert to list for JSON serialization
-            history_prices = hist["Close"].tolist() if not hist.empty else []
-            history_dates = pd.Series(hist.index).dt.strftime('%Y-%m-%d').tolist() if not hist.empty else []
-        except Exception:
-            current_price = 0
-            history_prices = []
-            history_dates = []
 
-        # If yfinance fails, try NSE as fallback (for Indian stocks)
-        if not current_price:
-            current_price = get_nse_price(stock["symbol"])
+def holding_row(stock: dict, current_price: float) -> dict:
+    """One summary row for a {symbol, quantity, buy_price} holding at `current_price`."""
+    quantity = stock["quantity"]
+    buy_price = stock["buy_price"]
+    investment = quantity * buy_price
+    current_value = quantity * current_price
+    gain_loss = current_value - investment
+    pct_change = (gain_loss / investment) * 100 if investment else 0
 
-        quantity = stock["quantity"]
-        buy_price = stock["buy_price"]
-        investment = quantity * buy_price
-        current_value = quantity * current_price
-        gain_loss = current_value - investment
-        pct_change = (gain_loss / investment) * 100 if investment else 0
+    return {
+        "Symbol": stock["symbol"],
+        "Qty": quantity,
+        "Buy ₹": buy_price,
+        "Current ₹": round(current_price, 2),
+        "Invested ₹": round(investment, 2),
+        "Now ₹": round(current_value, 2),
+        "Profit/Loss ₹": round(gain_loss, 2),
+        "Return %": round(pct_change, 2)
+    }
+
+
+def analyze_portfolio(stocks: list[dict]):
+    """
+    Takes list of {symbol, quantity, buy_price} and returns summary DataFrame.
+    The 6-month closes are kept out of the rows: summary.attrs["history"] holds
+    one shared date axis and a symbol x date float32 matrix (see history_codec).
+    """
+    # Latest prices for all holdings at once: Yahoo first, NSE as a hedged fallback
+    # for Indian symbols, each call under a deadline and a circuit breaker
+    prices = market_data().quotes([stock["symbol"] for stock in stocks])
 
-        results.append({
-            "Symbol": stock["symbol"],
-            "Qty": quantity,
-            "Buy ₹": buy_price,
-            "Current ₹": round(current_price, 2),
-            "Invested ₹": round(investment, 2),
-            "Now ₹": round(current_value, 2),
-            "Profit/Loss ₹": round(gain_loss, 2),
-            "Return %": round(pct_change, 2),
-            "History": history_prices,
-            "HistoryDates": history_dates
-        })
+    # 6-month closes, stale or missing symbols refreshed in one batched download
+    histories = get_closes_many([stock["symbol"] for stock in stocks])
+    results = [holding_row(stock, prices[stock["symbol"]]) for stock in stocks]
 
-    return pd.DataFrame(results)
\ No newline at end of file
+    summary = pd.DataFrame(results)
+    summary.attrs["history"] = history_matrix(histories)
+    return summary
\ No newline at end of file
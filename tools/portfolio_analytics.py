@@ -0,0 +1,139 @@
+# tools/portfolio_analytics.py
+
+import numpy as np
+import pandas as pd
+from tools.metrics import timed
+from utils.chart_utils import CHART_MAX_POINTS, lttb_indices
+
+TRADING_DAYS = 252
+# Annual risk-free rate used for Sharpe ratios (roughly the Indian 1-year T-bill).
+RISK_FREE_RATE = 0.065
+BENCHMARK = "^NSEI"
+
+
+def price_matrix(frame: pd.DataFrame) -> tuple[pd.DatetimeIndex, list, np.ndarray]:
+    """
+    Turn a date x symbol frame of closes into aligned arrays. Gaps (holidays
+    on one exchange, late listings) are forward- then back-filled so every
+    column has a price on every row.
+    """
+    frame = frame.sort_index().ffill().bfill()
+    return frame.index, list(frame.columns), frame.to_numpy(dtype=np.float64)
+
+
+def history_frame(summary: pd.DataFrame) -> pd.DataFrame:
+    """Date x symbol closes from the matrix analyze_portfolio stores in summary.attrs["history"]."""
+    history = summary.attrs.get("history")
+    if not history or not history["symbols"]:
+        return pd.DataFrame()
+    return pd.DataFrame(history["prices"].T.astype(np.float64), index=history["dates"], columns=history["symbols"])
+
+
+def max_drawdown(values: np.ndarray) -> np.ndarray:
+    """Largest peak-to-trough fall per column (as a negative fraction)."""
+    peaks = np.maximum.accumulate(values, axis=0)
+    return (values / peaks - 1).min(axis=0)
+
+
+def risk_metrics(prices: np.ndarray, weights: np.ndarray, benchmark: np.ndarray = None) -> dict:
+    """
+    Per-holding and portfolio risk statistics from a T x N price matrix.
+
+    `weights` are portfolio weights per column (summing to 1), `benchmark` an
+    optional length-T price series aligned to the same dates. Every statistic
+    is a whole-matrix NumPy operation, so cost grows with T x N, not with a
+    Python loop per holding.
+    """
+    returns = prices[1:] / prices[:-1] - 1
+    mean = returns.mean(axis=0)
+    std = returns.std(axis=0, ddof=1)
+    vol = std * np.sqrt(TRADING_DAYS)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = (mean * TRADING_DAYS - RISK_FREE_RATE) / vol
+        corr = np.corrcoef(returns, rowvar=False)
+
+    portfolio_returns = returns @ weights
+    portfolio_value = np.concatenate([[1.0], np.cumprod(1 + portfolio_returns)])
+    p_vol = portfolio_returns.std(ddof=1) * np.sqrt(TRADING_DAYS)
+    metrics = {
+        "volatility": vol,
+        "sharpe": sharpe,
+        "max_drawdown": max_drawdown(prices),
+        "correlation": np.atleast_2d(corr),
+        "portfolio": {
+            "volatility": p_vol,
+            "sharpe": (portfolio_returns.mean() * TRADING_DAYS - RISK_FREE_RATE) / p_vol if p_vol else 0.0,
+            "max_drawdown": max_drawdown(portfolio_value[:, None])[0],
+            "total_return": portfolio_value[-1] - 1,
+            "returns": portfolio_returns,
+        },
+    }
+
+    if benchmark is not None:
+        bench_returns = benchmark[1:] / benchmark[:-1] - 1
+        centered = returns - mean
+        bench_centered = bench_returns - bench_returns.mean()
+        bench_var = bench_centered @ bench_centered
+        metrics["beta"] = centered.T @ bench_centered / bench_var if bench_var else np.zeros(len(weights))
+        metrics["portfolio"]["beta"] = float(metrics["beta"] @ weights)
+    return metrics
+
+
+def _clean(values, digits=4):
+    """NumPy -> JSON-safe lists, NaN/inf as None."""
+    values = np.round(np.asarray(values, dtype=float), digits)
+    return np.where(np.isfinite(values), values, None).tolist()
+
+
+@timed("portfolio.risk")
+def portfolio_risk(summary: pd.DataFrame, benchmark_history: pd.Series = None, points: int = CHART_MAX_POINTS) -> dict:
+    """
+    Risk analytics for the DataFrame returned by analyze_portfolio, weighted
+    by current value. Returns plain JSON-serializable data. Statistics use
+    every date; the daily "returns" series returned for charting is
+    downsampled to at most `points` dates (LTTB; None keeps all).
+    """
+    frame = history_frame(summary)
+    if frame.empty:
+        return {"error": "No price history available for these holdings."}
+    if benchmark_history is not None and len(benchmark_history) and BENCHMARK not in frame:
+        frame = frame.join(benchmark_history.rename(BENCHMARK), how="left")
+    dates, symbols, prices = price_matrix(frame)
+    if len(dates) < 3:
+        return {"error": "Not enough price history to compute risk metrics."}
+
+    benchmark = None
+    if BENCHMARK in symbols and BENCHMARK not in set(summary["Symbol"]):
+        # Benchmark dates are joined onto the holdings' dates only
+        col = symbols.index(BENCHMARK)
+        benchmark = prices[:, col]
+        prices = np.delete(prices, col, axis=1)
+        symbols = symbols[:col] + symbols[col + 1:]
+
+    values = summary.set_index("Symbol")["Now ₹"].groupby(level=0).sum().reindex(symbols).fillna(0).to_numpy(dtype=float)
+    weights = values / values.sum() if values.sum() else np.full(len(symbols), 1 / len(symbols))
+    m = risk_metrics(prices, weights, benchmark)
+    returns = m["portfolio"]["returns"]
+    shown = lttb_indices(np.arange(len(returns)), returns, points)
+
+    result = {
+        "symbols": symbols,
+        "weights": _clean(weights),
+        "volatility": _clean(m["volatility"]),
+        "sharpe": _clean(m["sharpe"]),
+        "max_drawdown": _clean(m["max_drawdown"]),
+        "correlation": _clean(m["correlation"], 3),
+        "portfolio": {
+            "volatility": _clean(m["portfolio"]["volatility"]),
+            "sharpe": _clean(m["portfolio"]["sharpe"]),
+            "max_drawdown": _clean(m["portfolio"]["max_drawdown"]),
+            "total_return": _clean(m["portfolio"]["total_return"]),
+            "dates": dates[1:][shown].strftime("%Y-%m-%d").tolist(),
+            "returns": _clean(returns[shown], 5),
+        },
+    }
+    if "beta" in m:
+        result["beta"] = _clean(m["beta"])
+        result["portfolio"]["beta"] = _clean(m["portfolio"]["beta"])
+        result["benchmark"] = BENCHMARK
+    return result
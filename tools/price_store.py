@@ -0,0 +1,183 @@
+# tools/price_store.py
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+from tools.metrics import timed
+
+PRICE_STORE_PATH = os.getenv("PRICE_STORE_PATH", os.path.join("data", "prices.db"))
+# How long the stored latest bar is trusted before an incremental refresh.
+PRICE_REFRESH_SECONDS = int(os.getenv("PRICE_REFRESH_SECONDS", "900"))
+SIX_MONTHS = 183
+
+_lock = threading.Lock()
+_db = None
+
+
+def _store():
+    global _db
+    if _db is None:
+        os.makedirs(os.path.dirname(PRICE_STORE_PATH) or ".", exist_ok=True)
+        db = sqlite3.connect(PRICE_STORE_PATH, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA mmap_size=268435456")  # reads served from the page cache via mmap
+        db.executescript("""
+            CREATE TABLE IF NOT EXISTS closes (
+                symbol TEXT NOT NULL,
+                date   TEXT NOT NULL,
+                close  REAL NOT NULL,
+                PRIMARY KEY (symbol, date)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS coverage (
+                symbol       TEXT PRIMARY KEY,
+                covered_from TEXT NOT NULL,
+                last_date    TEXT,
+                refreshed_at REAL NOT NULL
+            );
+        """)
+        _db = db
+    return _db
+
+
+@timed("yfinance.history")
+def _download(symbol: str, start: str) -> pd.Series:
+    import yfinance as yf  # slow to import; loaded on first use
+
+    hist = yf.Ticker(symbol).history(start=start)
+    if hist.empty:
+        return pd.Series(dtype=float)
+    closes = hist["Close"].dropna()
+    closes.index = closes.index.tz_localize(None).strftime("%Y-%m-%d")
+    return closes
+
+
+@timed("yfinance.download")
+def _download_many(symbols: list[str], start: str) -> dict:
+    """Closes for many symbols in one batched request, as {symbol: Series indexed by date string}."""
+    import yfinance as yf  # slow to import; loaded on first use
+
+    data = yf.download(list(symbols), start=start, progress=False, auto_adjust=True, multi_level_index=True)
+    if data.empty:
+        return {symbol: pd.Series(dtype=float) for symbol in symbols}
+    closes = data["Close"].reindex(columns=list(symbols))
+    closes.index = pd.DatetimeIndex(closes.index).tz_localize(None).strftime("%Y-%m-%d")
+    return {symbol: closes[symbol].dropna() for symbol in symbols}
+
+
+def _stale(symbols: list[str], start: str) -> dict:
+    """
+    {symbol: (covered_from, fetch_from)} for the symbols whose stored closes
+    need a refresh. A symbol seen for the first time (or asked for older data
+    than stored) is downloaded once from `start`; afterwards only the days
+    from the last stored bar are fetched, and that bar is overwritten since
+    it may have been an intraday value.
+    """
+    coverage = {}
+    with _lock:
+        for i in range(0, len(symbols), 500):  # stay under SQLite's variable limit
+            chunk = symbols[i:i + 500]
+            coverage.update((row[0], row[1:]) for row in _store().execute(
+                f"SELECT symbol, covered_from, last_date, refreshed_at FROM coverage "
+                f"WHERE symbol IN ({','.join('?' * len(chunk))})", chunk))
+    stale = {}
+    now = time.time()
+    for symbol in symbols:
+        row = coverage.get(symbol)
+        if row and row[0] <= start:
+            covered_from, last_date, refreshed_at = row
+            if now - refreshed_at >= PRICE_REFRESH_SECONDS:
+                stale[symbol] = (covered_from, last_date or start)
+        else:
+            stale[symbol] = (start, start)
+    return stale
+
+
+def _save(closes: dict, covered_from: dict):
+    """Store downloaded closes ({symbol: Series}) and mark the symbols refreshed."""
+    with _lock:
+        db = _store()
+        with db:
+            for symbol, series in closes.items():
+                db.executemany(
+                    "INSERT OR REPLACE INTO closes VALUES (?, ?, ?)",
+                    zip([symbol] * len(series), series.index, series.astype(float)),
+                )
+                last = db.execute("SELECT MAX(date) FROM closes WHERE symbol = ?", (symbol,)).fetchone()[0]
+                db.execute(
+                    "INSERT OR REPLACE INTO coverage VALUES (?, ?, ?, ?)",
+                    (symbol, covered_from[symbol], last, time.time()),
+                )
+
+
+def _refresh(symbol: str, start: str):
+    """Bring the stored closes for `symbol` up to date from `start` onwards (see _stale)."""
+    stale = _stale([symbol], start)
+    if symbol in stale:
+        covered_from, fetch_from = stale[symbol]
+        _save({symbol: _download(symbol, fetch_from)}, {symbol: covered_from})
+
+
+def get_closes(symbol: str, days: int = SIX_MONTHS, start: str = None) -> pd.Series:
+    """
+    Daily closes for `symbol` since `start` (YYYY-MM-DD) or the last `days`
+    calendar days, as a float Series indexed by date. Served from the local
+    store, refreshing it first if stale. Returns an empty Series if the
+    symbol cannot be fetched and nothing is stored.
+    """
+    start = start or (date.today() - timedelta(days=days)).isoformat()
+    try:
+        _refresh(symbol, start)
+    except Exception as e:
+        print(f"[price_store] refresh failed for {symbol}:", e)
+    with _lock:
+        rows = _store().execute(
+            "SELECT date, close FROM closes WHERE symbol = ? AND date >= ? ORDER BY date", (symbol, start)
+        ).fetchall()
+    if not rows:
+        return pd.Series(dtype=float)
+    dates, values = zip(*rows)
+    return pd.Series(np.fromiter(values, dtype=np.float64, count=len(values)),
+                     index=pd.to_datetime(dates, format="%Y-%m-%d"), name=symbol)
+
+
+def get_closes_many(symbols: list[str], days: int = SIX_MONTHS, start: str = None) -> dict:
+    """
+    get_closes() for many symbols, as {symbol: Series}. Every stale or
+    missing symbol is refreshed with one batched download per distinct
+    fetch date (usually one or two), then all symbols are read from the
+    store in one query.
+    """
+    start = start or (date.today() - timedelta(days=days)).isoformat()
+    symbols = list(dict.fromkeys(symbols))
+    stale = _stale(symbols, start)
+    batches = {}
+    for symbol, (_, fetch_from) in stale.items():
+        batches.setdefault(fetch_from, []).append(symbol)
+    for fetch_from, batch in batches.items():
+        try:
+            closes = _download_many(batch, fetch_from)
+        except Exception as e:
+            print(f"[price_store] refresh failed for {len(batch)} symbols:", e)
+            continue
+        _save(closes, {symbol: stale[symbol][0] for symbol in batch})
+
+    rows = []
+    with _lock:
+        for i in range(0, len(symbols), 500):
+            chunk = symbols[i:i + 500]
+            rows += _store().execute(
+                f"SELECT symbol, date, close FROM closes WHERE date >= ? "
+                f"AND symbol IN ({','.join('?' * len(chunk))}) ORDER BY symbol, date", [start, *chunk]
+            ).fetchall()
+    result = {symbol: pd.Series(dtype=float) for symbol in symbols}
+    if rows:
+        frame = pd.DataFrame(rows, columns=["symbol", "date", "close"])
+        frame["date"] = pd.to_datetime(frame["date"], format="%Y-%m-%d")
+        for symbol, group in frame.groupby("symbol", sort=False):
+            result[symbol] = pd.Series(group["close"].to_numpy(dtype=np.float64), index=pd.DatetimeIndex(group["date"].to_numpy()),
+                                       name=symbol)
+    return result
@@ -0,0 +1,198 @@
+# tools/profiling.py
+
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+# Shared secret for the X-Profile header and the /api/admin/profil* endpoints;
+# profiling on demand is off while this is empty.
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN", "")
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join("data", "profiles"))
+# Only the newest profiles are kept on disk.
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))
+# Sampling interval of the "sample" profiler, in seconds.
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.005"))
+
+# Changed at runtime through POST /api/admin/profiling.
+settings = {
+    # Fraction of matching requests profiled without being asked to (0 = only on request)
+    "sample_rate": float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+    # "cprofile" (deterministic, exact call counts) or "sample" (stack sampling, flame-graph ready)
+    "mode": os.getenv("PROFILE_MODE", "cprofile"),
+    # Path prefixes eligible for sampling; empty means every route
+    "paths": [p for p in os.getenv("PROFILE_PATHS", "").split(",") if p],
+}
+MODES = ("cprofile", "sample")
+
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+# One profiler per process at a time: cProfile hooks the whole event-loop thread.
+_busy = threading.Lock()
+
+
+def authorized(token) -> bool:
+    return bool(PROFILE_ADMIN_TOKEN) and hmac.compare_digest(str(token or ""), PROFILE_ADMIN_TOKEN)
+
+
+def update_settings(changes: dict) -> dict:
+    """Apply the admin toggle; unknown keys are ignored, bad values raise ValueError."""
+    if "sample_rate" in changes:
+        rate = float(changes["sample_rate"])
+        if not 0 <= rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        settings["sample_rate"] = rate
+    if "mode" in changes:
+        if changes["mode"] not in MODES:
+            raise ValueError(f"mode must be one of {', '.join(MODES)}")
+        settings["mode"] = changes["mode"]
+    if "paths" in changes:
+        settings["paths"] = [str(p) for p in changes["paths"] or []]
+    return dict(settings)
+
+
+class _Sampler:
+    """Samples one thread's Python stack every PROFILE_INTERVAL into collapsed-stack counts."""
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_INTERVAL):
+        self.thread_id, self.interval = thread_id, interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def enable(self):
+        self._thread.start()
+
+    def disable(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def _save(request_id: str, meta: dict, profiler):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, request_id)
+    if meta["mode"] == "cprofile":
+        profiler.dump_stats(base + ".prof")
+    else:
+        with open(base + ".collapsed", "w", encoding="utf-8") as f:
+            f.writelines(f"{stack} {count}\n" for stack, count in profiler.counts.most_common())
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+    # Prune by age, keeping the newest PROFILE_KEEP
+    metas = sorted((e for e in os.scandir(PROFILE_DIR) if e.name.endswith(".json")), key=lambda e: e.stat().st_mtime)
+    for entry in metas[:max(0, len(metas) - PROFILE_KEEP)]:
+        stem = entry.path[:-len(".json")]
+        for suffix in (".json", ".prof", ".collapsed"):
+            if os.path.exists(stem + suffix):
+                os.remove(stem + suffix)
+
+
+def list_profiles() -> list[dict]:
+    """Stored profiles' metadata, newest first."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for entry in os.scandir(PROFILE_DIR):
+        if entry.name.endswith(".json"):
+            with open(entry.path, encoding="utf-8") as f:
+                profiles.append(json.load(f))
+    return sorted(profiles, key=lambda p: p["started_at"], reverse=True)
+
+
+def profile_path(request_id: str, kind: str):
+    """Path of a stored profile file ("json", "prof" or "collapsed"), or None."""
+    if not _REQUEST_ID.match(request_id):
+        return None
+    path = os.path.join(PROFILE_DIR, f"{request_id}.{kind}")
+    return path if os.path.exists(path) else None
+
+
+def profile_text(request_id: str, limit: int = 40):
+    """pstats report sorted by cumulative time for a cProfile profile, or None."""
+    path = profile_path(request_id, "prof")
+    if path is None:
+        return None
+    out = io.StringIO()
+    pstats.Stats(path, stream=out).sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
+
+
+class ProfilingMiddleware:
+    """
+    Profiles single requests, chosen by an `X-Profile: 1` header carrying the
+    admin token in `X-Profile-Token`, or at random at settings["sample_rate"].
+    The profile is stored under the request id (the X-Request-ID header, or a
+    generated one) and returned in the X-Profile-Id response header.
+
+    Handlers run on the event-loop thread, which is what gets profiled, so a
+    request interleaving with the profiled one on the loop can show up in its
+    profile. Requests arriving while another is being profiled are not.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _wanted(self, scope, headers) -> bool:
+        if headers.get(b"x-profile") == b"1" and authorized(headers.get(b"x-profile-token", b"").decode("latin-1")):
+            return True
+        rate, paths = settings["sample_rate"], settings["paths"]
+        return rate > 0 and random.random() < rate and (not paths or scope["path"].startswith(tuple(paths)))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        if not self._wanted(scope, headers) or not _busy.acquire(blocking=False):
+            return await self.app(scope, receive, send)
+
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1")
+        if not _REQUEST_ID.match(request_id) or profile_path(request_id, "json"):
+            request_id = uuid.uuid4().hex
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", request_id.encode())]
+            await send(message)
+
+        mode = settings["mode"]
+        if mode == "cprofile":
+            import cProfile
+            profiler = cProfile.Profile()
+        else:
+            profiler = _Sampler(threading.get_ident())
+        started_at, start = time.time(), time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            try:
+                _save(request_id, {
+                    "request_id": request_id, "mode": mode, "method": scope["method"], "path": scope["path"],
+                    "status": status, "started_at": started_at,
+                    "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+                }, profiler)
+            finally:
+                _busy.release()
@@ -0,0 +1,94 @@
+# tools/registry.py
+
+import importlib
+import json
+import os
+import threading
+import time
+
+# Functions exposed to the agent, as "module:function". The function's name,
+# signature and docstring become the LangChain tool schema. Nothing here is
+# imported until the agent first runs (or warm_up() is called), so modules
+# that only need the numeric cores never pay for LangChain.
+AGENT_TOOLS = [
+    "tools.budget:run_budget_tool",
+    "tools.sip:run_sip_tool",
+    "tools.loan:run_loan_tool",
+    "tools.stock:run_stock_tool",
+    "tools.pdf_generator:generate_pdf_summary",
+    "tools.goal_planner:run_goal_tool",
+    "tools.email_report:run_email_report_tool",
+    "tools.expense_categorizer:run_expense_categorizer",
+]
+
+# Third-party modules that tools import on first use; warm_up() loads them up front.
+HEAVY_MODULES = ["pandas", "yfinance", "nsepy", "pdfplumber", "fpdf", "sklearn.linear_model", "langchain_openai"]
+
+# Tool results are cut to about this many tokens before going back to the model.
+TOOL_OUTPUT_MAX_TOKENS = int(os.getenv("TOOL_OUTPUT_MAX_TOKENS", "600"))
+# Rough size of a token in characters for English/JSON text; avoids a tokenizer download.
+CHARS_PER_TOKEN = 4
+
+_lock = threading.Lock()
+_tools = {}
+
+
+def trim_to_tokens(text: str, max_tokens: int = TOOL_OUTPUT_MAX_TOKENS) -> str:
+    """Cut `text` to roughly `max_tokens` tokens, at a word boundary, marking the cut."""
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    space = cut.rfind(" ")
+    return (cut[:space] if space > limit // 2 else cut) + " … [truncated]"
+
+
+def tool_output(result) -> str:
+    """A tool's return value as trimmed text for the model (dicts and lists as JSON)."""
+    if not isinstance(result, str):
+        result = json.dumps(result, default=str, ensure_ascii=False)
+    return trim_to_tokens(result)
+
+
+def resolve(spec: str):
+    """Import "module:function" and return the function."""
+    module, name = spec.split(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def load_tools(specs: list[str] = None) -> list:
+    """LangChain tools for `specs` (default AGENT_TOOLS), built once and cached."""
+    specs = specs or AGENT_TOOLS
+    with _lock:
+        missing = [spec for spec in specs if spec not in _tools]
+        if missing:
+            from langchain.tools import tool
+
+            for spec in missing:
+                _tools[spec] = tool(resolve(spec))
+        return [_tools[spec] for spec in specs]
+
+
+def warm_up() -> dict:
+    """
+    Import heavy dependencies, build the agent tools and the LLM client ahead
+    of the first request. Returns the seconds spent per step; a step that
+    fails (e.g. an optional package is missing) is reported, not raised.
+    """
+    steps = {f"import {name}": (lambda name=name: importlib.import_module(name)) for name in HEAVY_MODULES}
+    steps["agent tools"] = load_tools
+
+    def llm():
+        from agent import get_llm
+        get_llm()
+
+    steps["llm client"] = llm
+    timings = {}
+    for label, step in steps.items():
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            print(f"[warm-up] {label} failed:", e)
+        timings[label] = round(time.perf_counter() - start, 3)
+    return timings
@@ -0,0 +1,223 @@
+# tools/report_renderer.py
+# type: ignore
+
+import os
+import re
+import tempfile
+import uuid
+from fpdf import FPDF
+from tools.loan import loan_breakdown
+from tools.metrics import timed
+
+OUTPUT_DIR = "generated"
+
+FONT = "Arial"
+# Core PDF fonts are built into every reader, so nothing is embedded or parsed
+# per report. They only cover Latin-1, hence the translation below.
+_LATIN1 = str.maketrans({"₹": "Rs.", "–": "-", "—": "-", "•": "-", "’": "'", "“": '"', "”": '"'})
+_NON_LATIN1 = re.compile(r"[^\x00-\xff]+")
+_MARKDOWN = re.compile(r"\*\*|__|^#+\s*", re.MULTILINE)
+
+
+def clean_text(text) -> str:
+    """Make arbitrary tool output printable with the core fonts (₹ -> Rs., emojis dropped)."""
+    text = _MARKDOWN.sub("", str(text).translate(_LATIN1))
+    return _NON_LATIN1.sub("", text).strip()
+
+
+class ReportPDF(FPDF):
+    """FPDF with the report's page chrome and the building blocks used by section templates."""
+
+    def __init__(self, title: str):
+        super().__init__()
+        self.report_title = clean_text(title)
+        self.set_auto_page_break(True, margin=15)
+        self.alias_nb_pages()
+
+    def header(self):
+        self.set_font(FONT, "B", 10)
+        self.set_text_color(100, 116, 139)
+        self.cell(0, 8, txt=self.report_title, ln=True, align="R")
+        self.set_text_color(0, 0, 0)
+
+    def footer(self):
+        self.set_y(-12)
+        self.set_font(FONT, "", 8)
+        self.cell(0, 8, txt=f"Page {self.page_no()}/{{nb}}", align="C")
+
+    def heading(self, text: str):
+        self.set_font(FONT, "B", 13)
+        self.cell(0, 10, txt=clean_text(text), ln=True)
+        self.set_draw_color(37, 99, 235)
+        self.set_line_width(0.4)
+        self.line(10, self.get_y(), 200, self.get_y())
+        self.ln(3)
+
+    def paragraph(self, text: str):
+        self.set_font(FONT, "", 11)
+        self.multi_cell(0, 6, txt=clean_text(text))
+        self.ln(2)
+
+    def key_values(self, pairs):
+        """Two-column label/value rows."""
+        self.set_font(FONT, "", 11)
+        for label, value in pairs:
+            self.cell(70, 7, txt=clean_text(label), border="B")
+            self.cell(0, 7, txt=clean_text(value), border="B", ln=True, align="R")
+        self.ln(3)
+
+    def table(self, headers, rows, widths=None):
+        """Simple grid; the header row is repeated after a page break."""
+        widths = widths or [190 / len(headers)] * len(headers)
+        headers = [clean_text(h) for h in headers]
+
+        def header_row():
+            self.set_font(FONT, "B", 10)
+            self.set_fill_color(219, 234, 254)
+            for w, h in zip(widths, headers):
+                self.cell(w, 7, txt=h, border=1, fill=1, align="C")
+            self.ln()
+            self.set_font(FONT, "", 10)
+
+        header_row()
+        for row in rows:
+            if self.get_y() + 7 > self.page_break_trigger:
+                self.add_page()
+                header_row()
+            for i, (w, value) in enumerate(zip(widths, row)):
+                text = f"{value:,.2f}" if isinstance(value, float) else clean_text(value)
+                self.cell(w, 7, txt=text, border=1, align="L" if i == 0 else "R")
+            self.ln()
+        self.ln(3)
+
+    def chart(self, image, width: float = 180):
+        """Embed a chart image given as a file path or PNG bytes (e.g. fig.to_image())."""
+        if isinstance(image, bytes):
+            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
+                f.write(image)
+            try:
+                self.image(f.name, w=width)
+            finally:
+                os.remove(f.name)
+        else:
+            self.image(image, w=width)
+        self.ln(3)
+
+
+def _money(value) -> str:
+    return f"Rs. {float(value):,.0f}"
+
+
+def sip_section(pdf, data):
+    pdf.heading("SIP Projection")
+    pdf.key_values([
+        ("Monthly Investment", _money(data["monthly_investment"])),
+        ("Duration", f"{data['years']} years"),
+        ("Expected Return", f"{data['rate']}%"),
+        ("Total Invested", _money(data["total_invested"])),
+        ("Projected Value", _money(data["projected_value"])),
+        ("Estimated Gain", _money(data["estimated_gain"])),
+    ])
+
+
+def loan_section(pdf, data):
+    """`data` needs principal, years and rate; EMI figures are derived if absent."""
+    if "emi" not in data:
+        data = {**data, **loan_breakdown(data["principal"], data["years"], data["rate"])}
+    pdf.heading("Loan EMI Breakdown")
+    pdf.key_values([
+        ("Principal", _money(data["principal"])),
+        ("Interest Rate", f"{data['rate']:.2f}%"),
+        ("Term", f"{data['years']} years"),
+        ("EMI", _money(data["emi"]) + "/month"),
+        ("Total Payment", _money(data["total_payment"])),
+        ("Total Interest", _money(data["total_interest"])),
+    ])
+
+
+def budget_section(pdf, data):
+    pdf.heading("Budget Summary")
+    pdf.key_values([
+        ("Income", _money(data["income"])),
+        ("Total Expenses", _money(data["total_expenses"])),
+        ("Savings", f"{_money(data['savings'])} ({data['savings_percent']:.1f}%)"),
+    ])
+    pdf.paragraph(data["advice"])
+
+
+def tax_section(pdf, data):
+    pdf.heading("Tax Optimization")
+    pdf.table(
+        ["Regime", "Taxable Income", "Tax Payable"],
+        [
+            ["Old Regime", _money(data["old_regime"]["taxable_income"]), _money(data["old_regime"]["tax_payable"])],
+            ["New Regime", _money(data["new_regime"]["taxable_income"]), _money(data["new_regime"]["tax_payable"])],
+        ],
+        widths=[70, 60, 60],
+    )
+    pdf.paragraph(f"Best for you: {data['best']}")
+    for suggestion in data.get("suggestions", []):
+        pdf.paragraph(f"- {suggestion}")
+
+
+def portfolio_section(pdf, data):
+    """`data` is the list of row dicts produced by analyze_portfolio(...).to_dict('records')."""
+    pdf.heading("Portfolio")
+    columns = ["Symbol", "Qty", "Buy ₹", "Current ₹", "Invested ₹", "Now ₹", "Profit/Loss ₹", "Return %"]
+    pdf.table(columns, [[row.get(c, "") for c in columns] for row in data],
+              widths=[30, 14, 22, 24, 26, 26, 28, 20])
+    invested = sum(row.get("Invested ₹", 0) for row in data)
+    now = sum(row.get("Now ₹", 0) for row in data)
+    pct = (now - invested) / invested * 100 if invested else 0
+    pdf.key_values([
+        ("Total Invested", _money(invested)),
+        ("Current Value", _money(now)),
+        ("Overall Return", f"{pct:.2f}%"),
+    ])
+
+
+SECTION_TEMPLATES = {
+    "sip": sip_section,
+    "loan": loan_section,
+    "budget": budget_section,
+    "tax": tax_section,
+    "portfolio": portfolio_section,
+}
+
+
+@timed("report.render")
+def render_report(title: str, sections: list[dict], output_path: str = None) -> str:
+    """
+    Render a multi-section PDF report and return its path.
+
+    Each section is a dict with either:
+    - "template": one of SECTION_TEMPLATES plus "data" (the tool's result), or
+    - "title" and "text" for free-form content.
+    Any section may also carry "table": {"headers": [...], "rows": [[...]]}
+    and "charts": [image path or PNG bytes, ...].
+    """
+    pdf = ReportPDF(title)
+    pdf.add_page()
+    pdf.set_font(FONT, "B", 16)
+    pdf.cell(0, 12, txt=clean_text(title), ln=True, align="C")
+    pdf.ln(4)
+
+    for section in sections:
+        template = SECTION_TEMPLATES.get(section.get("template"))
+        if template and not isinstance(section.get("data"), str):
+            template(pdf, section["data"])
+        else:
+            heading = section.get("title") or str(section.get("template", "")).title()
+            if heading:
+                pdf.heading(heading)
+            pdf.paragraph(section.get("text") or section.get("data", ""))
+        if section.get("table"):
+            pdf.table(section["table"]["headers"], section["table"]["rows"], section["table"].get("widths"))
+        for image in section.get("charts", []):
+            pdf.chart(image)
+
+    if output_path is None:
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        output_path = os.path.join(OUTPUT_DIR, f"report_{uuid.uuid4().hex[:6]}.pdf")
+    pdf.output(output_path)
+    return output_path
@@ -0,0 +1,115 @@
+# tools/report_store.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from tools.report_renderer import OUTPUT_DIR, render_report
+
+REPORTS_DIR = os.path.join(OUTPUT_DIR, "reports")
+# The index lives outside generated/ because that directory is served publicly.
+REPORT_INDEX_PATH = os.getenv("REPORT_INDEX_PATH", os.path.join("data", "report_index.db"))
+REPORT_TTL_SECONDS = int(os.getenv("REPORT_TTL_SECONDS", str(7 * 24 * 3600)))
+REPORT_STORE_MAX_BYTES = int(os.getenv("REPORT_STORE_MAX_BYTES", str(500 * 1024 * 1024)))
+# Bump when the renderer's output changes so old files are not served for new requests.
+RENDERER_VERSION = "1"
+
+_lock = threading.Lock()
+_db = None
+
+
+def _index():
+    global _db
+    if _db is None:
+        os.makedirs(os.path.dirname(REPORT_INDEX_PATH) or ".", exist_ok=True)
+        _db = sqlite3.connect(REPORT_INDEX_PATH, check_same_thread=False)
+        _db.executescript("""
+            CREATE TABLE IF NOT EXISTS reports (
+                key         TEXT PRIMARY KEY,
+                path        TEXT NOT NULL,
+                size        INTEGER NOT NULL,
+                created_at  REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_reports_last_access ON reports (last_access);
+        """)
+    return _db
+
+
+def _default(value):
+    if isinstance(value, bytes):  # e.g. chart PNGs
+        return hashlib.sha256(value).hexdigest()
+    return str(value)
+
+
+def report_key(title: str, sections: list[dict]) -> str:
+    """SHA-256 of the canonical JSON of everything that affects the rendered PDF."""
+    payload = json.dumps([RENDERER_VERSION, title, sections], sort_keys=True, default=_default)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_or_render(title: str, sections: list[dict]) -> str:
+    """
+    Return the path of the report for these inputs, rendering it only if an
+    identical report is not already stored. Runs garbage collection after
+    adding a new file.
+    """
+    key = report_key(title, sections)
+    now = time.time()
+    with _lock:
+        row = _index().execute("SELECT path, created_at FROM reports WHERE key = ?", (key,)).fetchone()
+        if row and now - row[1] <= REPORT_TTL_SECONDS and os.path.exists(row[0]):
+            with _db:
+                _db.execute("UPDATE reports SET last_access = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    path = os.path.join(REPORTS_DIR, f"{key}.pdf")
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    render_report(title, sections, tmp_path)
+    os.replace(tmp_path, path)  # atomic, so readers never see a partial file
+
+    with _lock:
+        with _index():
+            _db.execute(
+                "INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?)",
+                (key, path, os.path.getsize(path), now, now),
+            )
+        collect_garbage(now, keep=key)
+    return path
+
+
+def collect_garbage(now: float = None, keep: str = None):
+    """
+    Delete reports older than REPORT_TTL_SECONDS, then least-recently-used
+    reports until the store fits in REPORT_STORE_MAX_BYTES. Works from the
+    index alone; the directory is never listed. `keep` (the report just
+    returned to a caller) is never evicted. Caller holds _lock.
+    """
+    now = now or time.time()
+    db = _index()
+    expired = db.execute(
+        "SELECT key, path, size FROM reports WHERE created_at < ?", (now - REPORT_TTL_SECONDS,)
+    ).fetchall()
+    total = db.execute("SELECT COALESCE(SUM(size), 0) FROM reports").fetchone()[0]
+    total -= sum(size for _, _, size in expired)
+    victims = [(key, path) for key, path, _ in expired]
+    if total > REPORT_STORE_MAX_BYTES:
+        for key, path, size in db.execute(
+            "SELECT key, path, size FROM reports WHERE created_at >= ? AND key != ? ORDER BY last_access",
+            (now - REPORT_TTL_SECONDS, keep or ""),
+        ):
+            if total <= REPORT_STORE_MAX_BYTES:
+                break
+            victims.append((key, path))
+            total -= size
+    for _, path in victims:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    with db:
+        db.executemany("DELETE FROM reports WHERE key = ?", [(key,) for key, _ in victims])
+    return len(victims)
@@ -0,0 +1,223 @@
+# tools/risk_precompute.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+from tools.news_risk import analyze_portfolio_risk, symbol_to_name
+
+RISK_STORE_PATH = os.getenv("RISK_STORE_PATH", os.path.join("data", "news_risk.db"))
+# Symbols assessed ahead of requests; defaults to the companies news_risk knows by name.
+NEWS_RISK_WATCHLIST = [s.strip().upper() for s in os.getenv("NEWS_RISK_WATCHLIST", ",".join(symbol_to_name)).split(",")
+                       if s.strip()]
+# Daily pre-market run (exchange local time), then a refresh every NEWS_RISK_REFRESH_MINUTES
+# until the close (0 disables the refresh).
+NEWS_RISK_PREMARKET = os.getenv("NEWS_RISK_PREMARKET", "08:45")
+NEWS_RISK_CLOSE = os.getenv("NEWS_RISK_CLOSE", "15:30")
+NEWS_RISK_REFRESH_MINUTES = int(os.getenv("NEWS_RISK_REFRESH_MINUTES", "60"))
+# Stored assessments older than this are recomputed live on request.
+NEWS_RISK_MAX_AGE_MINUTES = int(os.getenv("NEWS_RISK_MAX_AGE_MINUTES", "120"))
+# Symbols per LLM call when precomputing; keeps each prompt (and a failed call) small.
+NEWS_RISK_BATCH = int(os.getenv("NEWS_RISK_BATCH", "5"))
+MARKET_TZ = ZoneInfo("Asia/Kolkata")
+# Exchange holidays (YYYY-MM-DD, comma-separated); weekends are always skipped.
+NSE_HOLIDAYS = {d.strip() for d in os.getenv("NSE_HOLIDAYS", "").split(",") if d.strip()}
+
+_lock = threading.Lock()
+_db = None
+
+
+def _store():
+    global _db
+    if _db is None:
+        os.makedirs(os.path.dirname(RISK_STORE_PATH) or ".", exist_ok=True)
+        db = sqlite3.connect(RISK_STORE_PATH, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("""
+            CREATE TABLE IF NOT EXISTS assessments (
+                symbol      TEXT PRIMARY KEY,
+                entry       TEXT NOT NULL,
+                computed_at REAL NOT NULL
+            )
+        """)
+        _db = db
+    return _db
+
+
+def _save(entries: list[dict], computed_at: float) -> int:
+    # Error and unavailable entries and price-trend-only fallbacks are not worth keeping
+    rows = [(e["symbol"].upper(), json.dumps(e), computed_at) for e in entries
+            if e.get("symbol") and e.get("action") not in ("error", "unavailable") and "source" not in e]
+    with _lock:
+        db = _store()
+        with db:
+            db.executemany("INSERT OR REPLACE INTO assessments VALUES (?, ?, ?)", rows)
+    return len(rows)
+
+
+def stored(symbols: list[str], max_age_minutes: int = NEWS_RISK_MAX_AGE_MINUTES) -> dict:
+    """Fresh stored assessments for `symbols`, as {SYMBOL: entry with "as_of"}."""
+    if not symbols:
+        return {}
+    cutoff = time.time() - max_age_minutes * 60
+    keys = [s.upper() for s in symbols]
+    with _lock:
+        rows = _store().execute(
+            f"SELECT symbol, entry, computed_at FROM assessments WHERE computed_at >= ? "
+            f"AND symbol IN ({','.join('?' * len(keys))})", [cutoff, *keys]
+        ).fetchall()
+    return {symbol: {**json.loads(entry), "as_of": datetime.fromtimestamp(at, MARKET_TZ).isoformat(timespec="seconds")}
+            for symbol, entry, at in rows}
+
+
+def _key(symbol) -> str:
+    # "tcs", "TCS" and "TCS.NS" are the same company to the model
+    return str(symbol or "").strip().upper().split(".")[0]
+
+
+def _match(symbols: list[str], entries) -> dict:
+    """
+    {SYMBOL: entry} for the requested `symbols`, from whatever the LLM
+    returned. Entries are matched by symbol ignoring case and exchange
+    suffix; when the model returned exactly one entry per symbol, entries
+    with an unrecognised symbol are matched by position. Each matched entry
+    carries the symbol as requested. A single object, or an object keyed by
+    symbol, is accepted too; anything else matches nothing.
+    """
+    if isinstance(entries, dict):
+        entries = [entries] if "symbol" in entries else [
+            {**entry, "symbol": symbol} for symbol, entry in entries.items() if isinstance(entry, dict)]
+    if not isinstance(entries, list):
+        return {}
+    requested = {_key(s) for s in symbols}
+    by_key = {}
+    for entry in entries:
+        if isinstance(entry, dict) and _key(entry.get("symbol")):
+            by_key.setdefault(_key(entry.get("symbol")), entry)
+    matched = {}
+    for i, symbol in enumerate(symbols):
+        entry = by_key.get(_key(symbol))
+        if entry is None and len(entries) == len(symbols):
+            candidate = entries[i]
+            if isinstance(candidate, dict) and _key(candidate.get("symbol")) not in requested:
+                entry = candidate
+        if entry is not None:
+            matched[symbol.upper()] = {**entry, "symbol": symbol}
+    return matched
+
+
+def _unavailable(symbol: str) -> dict:
+    return {
+        "symbol": symbol,
+        "company_name": symbol_to_name.get(symbol.upper(), symbol),
+        "news": [],
+        "price_trend": [],
+        "risks": [],
+        "action": "unavailable",
+        "prediction": "unavailable",
+        "probability": 0,
+        "summary": "No assessment was returned for this symbol.",
+        "gpt_suggestion": "Please try again later.",
+    }
+
+
+def precompute(symbols: list[str] = None) -> int:
+    """Assess `symbols` (default: the watchlist) in batches and store the results; returns how many were stored."""
+    symbols = symbols or NEWS_RISK_WATCHLIST
+    count = 0
+    for i in range(0, len(symbols), NEWS_RISK_BATCH):
+        batch = symbols[i:i + NEWS_RISK_BATCH]
+        try:
+            entries = analyze_portfolio_risk(batch)
+        except Exception as e:
+            print(f"[news-risk] precompute failed for {', '.join(batch)}:", e)
+            continue
+        count += _save(list(_match(batch, entries).values()), time.time())
+    return count
+
+
+def portfolio_risk_report(symbols: list[str]) -> list[dict]:
+    """
+    One entry per symbol, in order: fresh precomputed assessments where
+    available, the rest computed live in one call (and stored for the next
+    request). Entries carry "as_of", when they were computed; symbols the
+    live call returned nothing for get an "unavailable" entry.
+    """
+    ready = stored(symbols)
+    missing = list(dict.fromkeys(s for s in symbols if s.upper() not in ready))
+    if missing:
+        computed_at = time.time()
+        live = analyze_portfolio_risk(missing)
+        if isinstance(live, list) and any(isinstance(e, dict) and e.get("action") == "error" for e in live):
+            return live  # keep the existing error shape when the live call could not be parsed
+        matched = _match(missing, live)
+        _save(list(matched.values()), computed_at)
+        as_of = datetime.fromtimestamp(computed_at, MARKET_TZ).isoformat(timespec="seconds")
+        for symbol in missing:
+            entry = matched.get(symbol.upper())
+            ready[symbol.upper()] = {**entry, "as_of": as_of} if entry else _unavailable(symbol)
+    return [ready[s.upper()] for s in symbols]
+
+
+def _at(day: datetime, hh_mm: str) -> datetime:
+    hour, minute = map(int, hh_mm.split(":"))
+    return day.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+
+def is_trading_day(day: date) -> bool:
+    return day.weekday() < 5 and day.isoformat() not in NSE_HOLIDAYS
+
+
+def next_run(now: datetime, last_run: datetime = None) -> datetime:
+    """
+    When the scheduler should run next: right away after start-up, then the
+    next pre-market run or, during today's session, `last_run` plus the
+    refresh interval, whichever comes first. Weekends and NSE_HOLIDAYS are
+    skipped, including for the start-up run.
+    """
+    trading = is_trading_day(now.date())
+    if last_run is None and trading:
+        return now
+    premarket = _at(now, NEWS_RISK_PREMARKET)
+    if premarket <= now or not trading:
+        premarket += timedelta(days=1)
+        while not is_trading_day(premarket.date()):
+            premarket += timedelta(days=1)
+    if NEWS_RISK_REFRESH_MINUTES and trading and last_run is not None:
+        refresh = max(now, last_run + timedelta(minutes=NEWS_RISK_REFRESH_MINUTES))
+        if _at(now, NEWS_RISK_PREMARKET) <= refresh <= _at(now, NEWS_RISK_CLOSE):
+            return min(refresh, premarket)
+    return premarket
+
+
+_scheduler = None
+
+
+def start_risk_scheduler():
+    """Background thread that precomputes the watchlist at start-up, pre-market and then on the refresh cadence."""
+    global _scheduler
+
+    def loop():
+        last_run = None
+        while True:
+            now = datetime.now(MARKET_TZ)
+            due = next_run(now, last_run)
+            time.sleep(max(0.0, (due - now).total_seconds()))
+            # After a restart, entries that are still fresh are kept
+            symbols = NEWS_RISK_WATCHLIST
+            if last_run is None:
+                fresh = stored(symbols)
+                symbols = [s for s in symbols if s not in fresh]
+            last_run = datetime.now(MARKET_TZ)
+            try:
+                print(f"[news-risk] precomputed {precompute(symbols) if symbols else 0} of {len(NEWS_RISK_WATCHLIST)} watchlist symbols")
+            except Exception as e:
+                print("[news-risk] precompute pass failed:", e)
+
+    if _scheduler is None:
+        _scheduler = threading.Thread(target=loop, name="news-risk-precompute", daemon=True)
+        _scheduler.start()
+    return _scheduler
@@ -0,0 +1,37 @@
+# tools/singleflight.py
+
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one: the first caller
+    runs the function, callers arriving while it runs wait for and share its
+    result (or exception). Nothing is kept once the call finishes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> Future of the call in flight
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            future.set_result(func(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return future.result()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
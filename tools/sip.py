@@ -1,47 +1,21 @@
-from langchain.tools import tool
-import plotly.graph_objs as go
-import pandas as pd
+import numpy as np
+from utils.chart_utils import downsample
 
-@tool
-def run_sip_tool(amount: float, years: int, rate: float) -> str:
-    """Calculate SIP projected value based on monthly investment amount, years, and annual interest rate."""
-    r = rate / 100 / 12
-    months = years * 12
-    future_value = 0
-
-    for i in range(1, months + 1):
-        future_value = future_value * (1 + r) + amount
 
-    invested = amount * months
-    gain = future_value - invested
-
-    return f"""📈 **SIP Projection**
-- Monthly Investment: ₹{amount}
-- Years: {years}
-- Annual Return: {rate}%
-
-💰 Total Invested: ₹{int(invested):,}
-📈 Projected Value: ₹{int(future_value):,}
-📊 Estimated Gain: ₹{int(gain):,}
-"""
-
-# For UI: Return Plotly chart
-def sip_projection(amount: float, years: int, rate: float):
+def sip_values(amount: float, years: int, rate: float) -> np.ndarray:
+    """Value of the SIP at the end of each month (investment made at month end)."""
     r = rate / 100 / 12
-    months = years * 12
-    values = []
-    future_value = 0
-
-    for i in range(1, months + 1):
-        future_value = future_value * (1 + r) + amount
-        values.append(future_value)
-
-    df = pd.DataFrame({"Month": list(range(1, months + 1)), "Value": values})
+    months = np.arange(1, years * 12 + 1)
+    if r == 0:
+        return amount * months.astype(float)
+    return amount * ((1 + r) ** months - 1) / r
 
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=df["Month"], y=df["Value"], mode="lines", name="SIP Growth"))
-    fig.update_layout(title="📈 SIP Growth Over Time", xaxis_title="Month", yaxis_title="Value (₹)")
 
+def sip_result(amount: float, years: int, rate: float) -> dict:
+    """Numbers and text summary for an SIP, without building a chart."""
+    months = years * 12
+    values = sip_values(amount, years, rate)
+    future_value = float(values[-1]) if months else 0
     invested = amount * months
     gain = future_value - invested
 
@@ -55,7 +29,7 @@ def sip_projection(amount: float, years: int, rate: float):
 📊 Estimated Gain: ₹{int(gain):,}
 """
 
-    result = {
+    return {
         "monthly_investment": amount,
         "years": years,
         "rate": rate,
@@ -65,4 +39,24 @@ def sip_projection(amount: float, years: int, rate: float):
         "summary": summary
     }
 
-    return result, fig
+
+def run_sip_tool(amount: float, years: int, rate: float) -> str:
+    """Calculate SIP projected value based on monthly investment amount, years, and annual interest rate."""
+    return sip_result(amount, years, rate)["summary"]
+
+
+def sip_figure(amount: float, years: int, rate: float):
+    """Plotly growth chart for the UI. Plotly is only imported when a chart is requested."""
+    import plotly.graph_objs as go
+
+    values = sip_values(amount, years, rate)
+    months, values = downsample(np.arange(1, len(values) + 1), values)
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=months, y=values, mode="lines", name="SIP Growth"))
+    fig.update_layout(title="📈 SIP Growth Over Time", xaxis_title="Month", yaxis_title="Value (₹)")
+    return fig
+
+
+# For UI: Return Plotly chart
+def sip_projection(amount: float, years: int, rate: float):
+    return sip_result(amount, years, rate), sip_figure(amount, years, rate)
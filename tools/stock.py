@@ -1,16 +1,33 @@
 # tools/stock.py
-import yfinance as yf
-import plotly.graph_objs as go
-from langchain.tools import tool
+import hashlib
+import json
+import os
+import threading
+import time
+from tools.metrics import stage
+from tools.price_store import get_closes
+from tools.registry import trim_to_tokens
+from tools.singleflight import SingleFlight
+from utils.chart_utils import downsample
 
-def stock_summary_and_chart(symbol="AAPL"):
+# Seconds a fetched quote is served from memory (and may be cached by clients).
+STOCK_CACHE_TTL = float(os.getenv("STOCK_CACHE_TTL", "15"))
+_CACHE_SIZE = 512
+
+_cache_lock = threading.Lock()
+_cache = {}  # symbol -> (expires_at, payload, etag)
+_flight = SingleFlight()
+
+def stock_summary(symbol="AAPL"):
     """
-    Fetch real-time stock data, basic metrics, and show 6-month chart.
-    Returns: dict with structured fields, Plotly chart
+    Fetch real-time stock data and basic metrics.
+    Returns: dict with structured fields (only "summary" on failure)
     """
     try:
-        stock = yf.Ticker(symbol)
-        info = stock.info
+        import yfinance as yf  # slow to import; loaded on first use
+
+        with stage("yfinance.info"):
+            info = yf.Ticker(symbol).info
 
         current_price = info.get("regularMarketPrice", 0)
         previous_close = info.get("previousClose", 0)
@@ -32,19 +49,65 @@ def stock_summary_and_chart(symbol="AAPL"):
         # For legacy fallback
         result["summary"] = f"""\n📈 **{result['name']} ({result['symbol']})**\n\n- 💰 Current Price: ₹{current_price:.2f}\n- 🔻 Change: ₹{diff:.2f} ({pct:.2f}%)\n- 🏷️ Market Cap: ₹{info.get('marketCap', 0):,}\n- 📊 PE Ratio: {info.get('trailingPE', 'N/A')}\n- 🧾 Sector: {info.get('sector', 'N/A')}\n"""
 
-        # Get historical data
-        hist = stock.history(period="6mo")
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=hist.index, y=hist["Close"], mode="lines", name="Close Price"))
-        fig.update_layout(title=f"{symbol.upper()} - 6 Month Performance", xaxis_title="Date", yaxis_title="Price (₹)")
-
-        return result, fig
+        return result
 
     except Exception as e:
-        return {"summary": f"❌ Failed to fetch stock data: {e}"}, None
+        return {"summary": f"❌ Failed to fetch stock data: {e}"}
+
+def _fetch_cached(symbol: str):
+    result = stock_summary(symbol)
+    body = json.dumps(result, sort_keys=True, default=str).encode()
+    entry = (time.monotonic() + STOCK_CACHE_TTL, result, f'"{hashlib.sha1(body).hexdigest()[:20]}"')
+    if "symbol" in result:  # failures are retried on the next request
+        with _cache_lock:
+            if len(_cache) >= _CACHE_SIZE:
+                now = time.monotonic()
+                for key in [k for k, (expires, _, _) in _cache.items() if expires <= now] or list(_cache)[:1]:
+                    del _cache[key]
+            _cache[symbol] = entry
+    return entry
+
+def cached_stock_summary(symbol="AAPL"):
+    """
+    stock_summary() served from a STOCK_CACHE_TTL-second cache; concurrent
+    misses for the same symbol share one upstream fetch.
+    Returns (payload, etag, seconds it stays fresh).
+    """
+    symbol = symbol.strip().upper()
+    with _cache_lock:
+        entry = _cache.get(symbol)
+    if entry is None or entry[0] <= time.monotonic():
+        entry = _flight.do(symbol, _fetch_cached, symbol)
+    expires_at, payload, etag = entry
+    return dict(payload), etag, max(0, int(expires_at - time.monotonic()))
+
+def stock_figure(symbol="AAPL"):
+    """6-month closing price chart for the UI. Plotly is only imported when a chart is requested."""
+    import plotly.graph_objs as go
+
+    closes = get_closes(symbol)
+    dates, prices = downsample(closes.index, closes.values)
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=dates, y=prices, mode="lines", name="Close Price"))
+    fig.update_layout(title=f"{symbol.upper()} - 6 Month Performance", xaxis_title="Date", yaxis_title="Price (₹)")
+    return fig
+
+def stock_summary_and_chart(symbol="AAPL"):
+    """
+    Fetch real-time stock data, basic metrics, and show 6-month chart.
+    Returns: dict with structured fields, Plotly chart (None on failure)
+    """
+    result, _, _ = cached_stock_summary(symbol)
+    if "symbol" not in result:
+        return result, None
+    return result, stock_figure(symbol)
+
+# The agent only needs a line or two about the business, not Yahoo's full profile.
+DESCRIPTION_MAX_TOKENS = 60
 
-@tool
 def run_stock_tool(symbol: str = "AAPL") -> dict:
     """Fetch real-time stock data, basic metrics, and 6-month performance for a given symbol (default: AAPL)."""
-    result, _ = stock_summary_and_chart(symbol)
+    result, _, _ = cached_stock_summary(symbol)
+    if result.get("description"):
+        result["description"] = trim_to_tokens(result["description"], DESCRIPTION_MAX_TOKENS)
     return result
@@ -0,0 +1,143 @@
+# tools/stress_test.py
+
+import numpy as np
+import pandas as pd
+from tools.metrics import timed
+from tools.portfolio import fetch_close_frame
+from tools.portfolio_analytics import BENCHMARK
+
+# Historical shock windows (start, end): peak-to-trough of the Nifty 50.
+SCENARIOS = {
+    "2008 Global Financial Crisis": ("2008-09-01", "2008-10-27"),
+    "2013 Taper Tantrum": ("2013-05-20", "2013-08-28"),
+    "2016 Demonetisation": ("2016-11-08", "2016-12-26"),
+    "2020 COVID Crash": ("2020-02-19", "2020-03-23"),
+    "2022 Russia-Ukraine": ("2022-02-10", "2022-03-07"),
+}
+HISTORY_START = "2008-01-01"
+LOOKBACK_DAYS = 500  # ~2 trading years of daily moves for historical VaR
+
+
+def window_shocks(prices: pd.DataFrame, windows: dict) -> np.ndarray:
+    """
+    K x N matrix of returns for each (start, end) window and each column of
+    `prices`, using the last close on or before each date. NaN where a symbol
+    has no price at either end. One fancy-indexing step for all windows.
+    """
+    filled = prices.ffill()
+    starts = pd.to_datetime([start for start, _ in windows.values()])
+    ends = pd.to_datetime([end for _, end in windows.values()])
+    start_rows = filled.index.searchsorted(starts, side="right") - 1
+    end_rows = filled.index.searchsorted(ends, side="right") - 1
+    values = filled.to_numpy(dtype=np.float64)
+    valid = (start_rows >= 0) & (end_rows >= 0)
+    start_rows, end_rows = np.clip(start_rows, 0, None), np.clip(end_rows, 0, None)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shocks = values[end_rows] / values[start_rows] - 1
+    shocks[~valid] = np.nan
+    return shocks
+
+
+def betas(returns: np.ndarray, market: np.ndarray) -> np.ndarray:
+    """Beta of every column of `returns` (T x N) against `market` (T), ignoring NaN rows per column."""
+    mask = ~np.isnan(returns) & ~np.isnan(market)[:, None]
+    r = np.where(mask, returns, 0.0)
+    m = np.where(mask, market[:, None], 0.0)
+    n = mask.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = (r * m).sum(axis=0) / n - r.sum(axis=0) / n * (m.sum(axis=0) / n)
+        var = (m * m).sum(axis=0) / n - (m.sum(axis=0) / n) ** 2
+        beta = cov / var
+    return np.where(np.isfinite(beta), beta, 1.0)
+
+
+def var_cvar(pnl: np.ndarray, confidence) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Historical-simulation VaR and CVaR (expected shortfall) at several
+    confidence levels at once. `pnl` is one value per scenario; losses are
+    reported as positive numbers. Both use the same tail, the worst
+    ceil((1 - c) x n) scenarios: VaR is its best outcome and CVaR its mean,
+    so CVaR >= VaR always holds.
+    """
+    confidence = np.atleast_1d(np.asarray(confidence, dtype=float))
+    ordered = np.sort(pnl)
+    tail = np.clip(np.ceil((1 - confidence) * len(ordered)).astype(int), 1, len(ordered))
+    var = -ordered[tail - 1]
+    cvar = -np.cumsum(ordered)[tail - 1] / tail
+    return var, cvar
+
+
+@timed("portfolio.stress")
+def stress_test(holdings: list[dict], confidence=(0.95, 0.99), horizon_days: int = 1,
+                market_shocks=None, prices: pd.DataFrame = None) -> dict:
+    """
+    Stress test a list of {symbol, quantity, buy_price} holdings.
+
+    - VaR/CVaR: every overlapping `horizon_days` window in the last
+      LOOKBACK_DAYS is a scenario; portfolio P&L for all of them is a single
+      (scenarios x holdings) @ exposures product.
+    - Historical shocks: the SCENARIOS windows replayed on today's positions.
+      Holdings that did not trade then are proxied by beta x the index move.
+    - `market_shocks`: optional list of index moves (e.g. np.linspace(-0.4, 0, 1000))
+      applied through each holding's beta.
+
+    Closes come from the local price store (only missing days are
+    downloaded); `prices` (date x symbol closes, including BENCHMARK) can be
+    passed instead.
+    """
+    if not holdings:
+        return {"error": "No holdings to stress test."}
+    symbols = [h["symbol"] for h in holdings]
+    columns = list(dict.fromkeys(symbols + [BENCHMARK]))
+    if prices is None:
+        prices = fetch_close_frame(columns, HISTORY_START)
+    # fetch_close_frame returns an empty frame when nothing could be fetched or stored
+    prices = prices.reindex(columns=columns).sort_index().dropna(how="all")
+    if prices.empty:
+        return {"error": "No price history available for these holdings."}
+
+    quantities = pd.Series([h["quantity"] for h in holdings], index=symbols, dtype=float).groupby(level=0).sum()
+    held = list(quantities.index)
+    last = prices.ffill().iloc[-1]
+    exposure = (quantities * last.reindex(held)).fillna(0).to_numpy(dtype=np.float64)
+    total = float(exposure.sum())
+
+    recent = prices.iloc[-(LOOKBACK_DAYS + horizon_days):]
+    window_returns = (recent / recent.shift(horizon_days) - 1).iloc[horizon_days:]
+    daily = (recent / recent.shift(1) - 1).iloc[1:]
+    beta = betas(daily[held].to_numpy(dtype=np.float64), daily[BENCHMARK].to_numpy(dtype=np.float64))
+
+    # Missing moves (not yet listed) fall back to beta x benchmark move
+    scenario_returns = window_returns[held].to_numpy(dtype=np.float64)
+    market = window_returns[BENCHMARK].to_numpy(dtype=np.float64)
+    scenario_returns = np.where(np.isnan(scenario_returns), market[:, None] * beta, scenario_returns)
+    scenario_returns = scenario_returns[~np.isnan(scenario_returns).any(axis=1)]
+    pnl = scenario_returns @ exposure
+
+    result = {"portfolio_value": round(total, 2), "horizon_days": horizon_days, "scenarios_evaluated": int(len(pnl))}
+    if len(pnl):
+        var, cvar = var_cvar(pnl, confidence)
+        result["var"] = [
+            {"confidence": float(c), "var": round(float(v), 2), "cvar": round(float(cv), 2),
+             "var_pct": round(float(v) / total * 100, 2) if total else 0.0}
+            for c, v, cv in zip(np.atleast_1d(confidence), var, cvar)
+        ]
+
+    shocks = window_shocks(prices, SCENARIOS)
+    held_idx = [columns.index(s) for s in held]
+    bench_shock = shocks[:, columns.index(BENCHMARK)]
+    held_shocks = shocks[:, held_idx]
+    held_shocks = np.where(np.isnan(held_shocks), bench_shock[:, None] * beta, held_shocks)
+    shock_pnl = np.nan_to_num(held_shocks) @ exposure
+    result["historical_scenarios"] = [
+        {"name": name, "start": start, "end": end, "market_move_pct": round(float(m) * 100, 2),
+         "pnl": round(float(p), 2), "pnl_pct": round(float(p) / total * 100, 2) if total else 0.0}
+        for (name, (start, end)), m, p in zip(SCENARIOS.items(), np.nan_to_num(bench_shock), shock_pnl)
+    ]
+
+    if market_shocks is not None:
+        moves = np.asarray(market_shocks, dtype=np.float64)
+        # beta-weighted exposure turns every index move into P&L at once
+        shock_grid_pnl = moves * float(beta @ exposure)
+        result["market_shocks"] = {"moves": moves.round(4).tolist(), "pnl": shock_grid_pnl.round(2).tolist()}
+    return result
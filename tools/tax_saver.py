@@ -1,6 +1,6 @@
 import pandas as pd
 import os
-from agent import run_gpt_agent  # Import your agent function
+from tools.llm_usage import tagged
 
 def calc_tax_old_regime(
     salary, rent, deductions_80c, deductions_80d, hra_received, basic_salary,
@@ -118,7 +118,10 @@ Suggest in a friendly, conversational tone:
 - Keep it concise and actionable.
 """
     # Use your agent for GPT suggestions (no chat history needed here)
-    return run_gpt_agent(prompt, [])
+    from agent import run_gpt_agent  # deferred: keeps LangChain out of import time
+
+    with tagged("tax"):
+        return run_gpt_agent(prompt, [])
 
 def tax_summary_gpt(
     salary, rent, deductions_80c, deductions_80d, hra_received, basic_salary,
@@ -0,0 +1,71 @@
+# utils/chart_utils.py
+
+import os
+import numpy as np
+
+# Upper bound on points per plotted or returned series; longer series are downsampled.
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "500"))
+
+
+def _as_float(x) -> np.ndarray:
+    """x-axis values as floats: dates become nanoseconds, labels become positions."""
+    x = np.asarray(x)
+    if x.dtype.kind == "M":
+        return x.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    if x.dtype.kind not in "iuf":
+        return np.arange(len(x), dtype=np.float64)
+    return x.astype(np.float64)
+
+
+def lttb_indices(x, y, points: int = CHART_MAX_POINTS) -> np.ndarray:
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; the rest are split into
+    points - 2 equal buckets and from each the point forming the largest
+    triangle with the previously kept point and the next bucket's average is
+    chosen. Bucket averages and triangle areas are whole-array NumPy
+    operations; only the choice of one point per bucket is sequential.
+    Returns all indices when the series already has `points` or fewer.
+    """
+    n = len(y)
+    if not points or points >= n or n < 3:
+        return np.arange(n)
+    if points < 3:
+        return np.array([0, n - 1])
+    x = _as_float(x)
+    y = np.asarray(y, dtype=np.float64)
+
+    edges = np.linspace(1, n - 1, points - 1).astype(int)
+    starts, ends = edges[:-1], edges[1:]
+    csx = np.concatenate([[0.0], np.cumsum(x)])
+    csy = np.concatenate([[0.0], np.cumsum(y)])
+    width = ends - starts
+    # For bucket i the third triangle vertex is the mean of bucket i + 1 (the last point for the final bucket)
+    avg_x = np.append(((csx[ends] - csx[starts]) / width)[1:], x[-1])
+    avg_y = np.append(((csy[ends] - csy[starts]) / width)[1:], y[-1])
+
+    selected = np.empty(points, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i, (s, e) in enumerate(zip(starts, ends)):
+        area = np.abs((x[a] - avg_x[i]) * (y[s:e] - y[a]) - (x[a] - x[s:e]) * (avg_y[i] - y[a]))
+        a = s + int(np.nanargmax(area)) if np.isfinite(area).any() else s
+        selected[i + 1] = a
+    return selected
+
+
+def _take(values, idx):
+    if hasattr(values, "iloc"):
+        return values.iloc[idx]
+    if isinstance(values, (list, tuple)):
+        return [values[i] for i in idx]
+    return values[idx]  # ndarray, pd.Index
+
+
+def downsample(x, y, points: int = CHART_MAX_POINTS):
+    """(x, y) reduced to at most `points` points with LTTB, keeping the input types."""
+    idx = lttb_indices(x, y, points)
+    if len(idx) == len(y):
+        return x, y
+    return _take(x, idx), _take(y, idx)